@@ -0,0 +1,148 @@
+"""
+Benchmarks M4B assembly of the same synthetic book three ways: one FFmpeg
+pass over WAV files at the end (--assembly single), chapters encoded in
+FFmpeg processes and joined with a stream copy (parallel), and PyAV
+encoding the NumPy buffers inside this process (inprocess). Times include
+writing the WAV files the subprocess paths need. Each output's chapter
+marks are compared with the PCM written ("Mark drift"); parallel assembly
+drifts by design, as every chapter keeps its own encoder delay and padding.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import soundfile as sf
+from mutagen.mp4 import MP4
+
+from src.core.audio_builder import ChapterEncoder, M4BBuilder
+from src.core.av_builder import AV_AVAILABLE, AvM4BWriter
+
+if AV_AVAILABLE:
+    import av
+
+SAMPLE_RATE = 24000
+
+
+def synthetic_book(minutes, chapters, segment_seconds, seed):
+    """[(title, [segment, ...]), ...] of noisy tones, like sentences of speech."""
+    rng = np.random.default_rng(seed)
+    segments_per_chapter = max(1, int(minutes * 60 / segment_seconds / chapters))
+    book = []
+    for c in range(chapters):
+        segments = []
+        for _ in range(segments_per_chapter):
+            length = int(SAMPLE_RATE * segment_seconds * rng.uniform(0.5, 1.5))
+            t = np.arange(length) / SAMPLE_RATE
+            tone = 0.3 * np.sin(2 * np.pi * rng.uniform(100, 300) * t)
+            segments.append((tone + 0.05 * rng.standard_normal(length)).astype(np.float32))
+        book.append((f"Chapter {c + 1}", segments))
+    return book
+
+
+def expected_chapters(book):
+    chapters = []
+    start = 0
+    for title, segments in book:
+        end = start + sum(len(segment) for segment in segments)
+        chapters.append((title, start / SAMPLE_RATE, end / SAMPLE_RATE))
+        start = end
+    return chapters
+
+
+def write_wavs(chapter, segments, work_dir):
+    """Writes a chapter's segments to WAV files, as the subprocess paths need."""
+    paths = []
+    for s, segment in enumerate(segments):
+        path = os.path.join(work_dir, f"ch{chapter}_seg{s:04d}.wav")
+        sf.write(path, segment, SAMPLE_RATE)
+        paths.append(path)
+    return paths
+
+
+def assemble_single(book, output_path, work_dir, ffmpeg):
+    files = [path for c, (_, segments) in enumerate(book) for path in write_wavs(c, segments, work_dir)]
+    chapters = expected_chapters(book)
+    M4BBuilder(ffmpeg).combine_audio_chunks(
+        files, output_path, chapters=chapters,
+        total_duration=chapters[-1][2], title="Benchmark", author="OpenNarrator"
+    )
+
+
+def assemble_parallel(book, output_path, work_dir, ffmpeg, processes):
+    encoder = ChapterEncoder(work_dir, ffmpeg, processes=processes)
+    try:
+        # Submitted as each chapter is ready, as during synthesis
+        for c, (title, segments) in enumerate(book):
+            paths = write_wavs(c, segments, work_dir)
+            encoder.submit(title, paths, sum(len(segment) for segment in segments) / SAMPLE_RATE)
+        encoder.finish(output_path, title="Benchmark", author="OpenNarrator")
+    finally:
+        encoder.close()
+
+
+def assemble_inprocess(book, output_path):
+    with AvM4BWriter(output_path, SAMPLE_RATE, title="Benchmark", author="OpenNarrator") as writer:
+        for title, segments in book:
+            writer.start_chapter(title)
+            for segment in segments:
+                writer.write(segment)
+
+
+def chapter_error(path, expected):
+    """Largest difference in seconds between the file's chapter marks and the PCM written."""
+    with av.open(path) as container:
+        marks = [(chapter["start"] * chapter["time_base"], chapter["end"] * chapter["time_base"])
+                 for chapter in container.chapters()]
+    if len(marks) != len(expected):
+        return float("inf")
+    return max(max(abs(float(start) - s), abs(float(end) - e)) for (start, end), (_, s, e) in zip(marks, expected))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark M4B assembly backends")
+    parser.add_argument("--minutes", type=float, default=10, help="Length of the synthetic book")
+    parser.add_argument("--chapters", type=int, default=10, help="Chapters in the book")
+    parser.add_argument("--segment-seconds", type=float, default=4, help="Mean length of a synthesized segment")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="FFmpeg binary for the subprocess paths")
+    parser.add_argument("--processes", type=int, help="FFmpeg processes for parallel assembly (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if not AV_AVAILABLE:
+        raise SystemExit("PyAV is not installed (pip install av)")
+
+    book = synthetic_book(args.minutes, args.chapters, args.segment_seconds, args.seed)
+    expected = expected_chapters(book)
+    segments = sum(len(segments) for _, segments in book)
+    print(f"Book: {expected[-1][2] / 60:.1f} min in {len(book)} chapters, {segments} segments at {SAMPLE_RATE} Hz")
+
+    backends = [
+        ("single", lambda out, work: assemble_single(book, out, work, args.ffmpeg)),
+        ("parallel", lambda out, work: assemble_parallel(book, out, work, args.ffmpeg, args.processes)),
+        ("inprocess", lambda out, work: assemble_inprocess(book, out)),
+    ]
+    print(f"{'Backend':<10} {'Time':>9} {'Speed':>8} {'Size':>9} {'Mark drift':>11}")
+    for name, assemble in backends:
+        work_dir = tempfile.mkdtemp()
+        try:
+            output_path = os.path.join(work_dir, "book.m4b")
+            start = time.perf_counter()
+            assemble(output_path, work_dir)
+            elapsed = time.perf_counter() - start
+
+            tags = MP4(output_path).tags
+            assert tags["\xa9nam"] == ["Benchmark"], name
+            print(f"{name:<10} {elapsed:8.2f}s {expected[-1][2] / elapsed:7.0f}x "
+                  f"{os.path.getsize(output_path) / 1024:7.0f}KB {chapter_error(output_path, expected) * 1000:8.1f} ms")
+        finally:
+            shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmarks clean_text against the original one-re.sub-per-rule
+implementation (tests/cleaner_reference.py) and checks the outputs match.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.cleaner import clean_text
+from tests.cleaner_reference import clean_text as reference_clean_text
+from tests.test_cleaner import random_corpus
+
+
+def load_text(path, size):
+    """Builds roughly `size` characters of text from a book, or a synthetic corpus."""
+    if path:
+        from src.core.extractor import extract_chapters_from_pdf, extract_chapters_from_epub
+        if path.lower().endswith('.pdf'):
+            chapters, _ = extract_chapters_from_pdf(path)
+        else:
+            chapters, _ = extract_chapters_from_epub(path)
+        source = "\n\n".join(chapter.content for chapter in chapters)
+    else:
+        source = "\n\n".join(random_corpus(seed=42, count=2000, length=60))
+
+    if not source:
+        raise SystemExit("No text to benchmark")
+    repeats = max(1, size // len(source) + 1)
+    return (source * repeats)[:size]
+
+
+def best_of(func, text, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    samples = glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples", "*.epub"))
+
+    parser = argparse.ArgumentParser(description="Benchmark the text normalizer")
+    parser.add_argument("book", nargs="?", default=samples[0] if samples else None,
+                        help="EPUB or PDF to take text from (default: first sample book, else synthetic text)")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Characters of text to clean")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    text = load_text(args.book, args.size)
+    print(f"Text: {len(text):,} characters from {args.book or 'synthetic corpus'}")
+
+    reference_time, reference_output = best_of(reference_clean_text, text, args.repeat)
+    compiled_time, compiled_output = best_of(clean_text, text, args.repeat)
+
+    print(f"Reference clean_text: {reference_time * 1000:8.1f} ms")
+    print(f"Compiled clean_text:  {compiled_time * 1000:8.1f} ms")
+    print(f"Speedup:              {reference_time / compiled_time:8.2f}x")
+    print(f"Identical output:     {compiled_output == reference_output}")
+
+    if compiled_output != reference_output:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
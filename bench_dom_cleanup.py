@@ -0,0 +1,64 @@
+"""
+Benchmarks per-document EPUB text extraction: the single-pass walk in
+extract_document_text against the original multi-pass cleanup
+(tests/extractor_reference.py). Parsing is timed on its own too, since
+both share it. Checks that every document comes out the same.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+
+from src.core.extractor import HTML_PARSER, extract_document_text
+from tests.extractor_reference import extract_document_text as reference_extract_document_text
+from tests.test_extractor import book_documents
+
+
+def best_of(func, documents, repeat):
+    times = []
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(*document) for document in documents]
+        times.append(time.perf_counter() - start)
+    return min(times), results
+
+
+def main():
+    samples = glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples", "*.epub"))
+
+    parser = argparse.ArgumentParser(description="Benchmark single-pass EPUB document cleanup")
+    parser.add_argument("book", nargs="?", default=samples[0] if samples else None, help="EPUB file (default: first sample book)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation; the fastest is reported")
+    args = parser.parse_args()
+
+    if not args.book:
+        parser.error("no book given and no sample EPUB found")
+
+    documents = book_documents(args.book)
+    total_bytes = sum(len(body) for body, _, _ in documents)
+    print(f"{len(documents)} documents, {total_bytes:,} bytes of HTML ({HTML_PARSER})")
+
+    parse_time, _ = best_of(lambda body, *_: BeautifulSoup(body, HTML_PARSER), documents, args.repeat)
+    reference_time, reference_output = best_of(reference_extract_document_text, documents, args.repeat)
+    walk_time, walk_output = best_of(extract_document_text, documents, args.repeat)
+
+    print("=" * 60)
+    print(f"Parse only:          {parse_time * 1000:8.0f} ms")
+    print(f"Multi-pass cleanup:  {reference_time * 1000:8.0f} ms  ({(reference_time - parse_time) * 1000:.0f} ms after parsing)")
+    print(f"Single-pass walk:    {walk_time * 1000:8.0f} ms  ({(walk_time - parse_time) * 1000:.0f} ms after parsing)")
+    print(f"Speedup:             {reference_time / walk_time:8.2f}x")
+    print(f"Identical output:    {walk_output == reference_output}")
+    print("=" * 60)
+
+    if walk_output != reference_output:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmarks EPUB chapter extraction: the original sequential html.parser
+path against the lxml parser, serially and across a process pool. Checks
+that every variant produces the same chapters.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core import extractor
+from src.core.extractor import extract_chapters_from_epub
+
+
+def run(book, parser, processes, force_pool=False):
+    saved = extractor.HTML_PARSER, extractor.PARALLEL_MIN_BYTES
+    extractor.HTML_PARSER = parser
+    if force_pool:
+        extractor.PARALLEL_MIN_BYTES = 0
+    try:
+        start = time.perf_counter()
+        chapters, _ = extract_chapters_from_epub(book, processes=processes)
+        return chapters, time.perf_counter() - start
+    finally:
+        extractor.HTML_PARSER, extractor.PARALLEL_MIN_BYTES = saved
+
+
+def main():
+    samples = glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples", "*.epub"))
+
+    parser = argparse.ArgumentParser(description="Benchmark EPUB chapter extraction")
+    parser.add_argument("book", nargs="?", default=samples[0] if samples else None, help="EPUB file (default: first sample book)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes for the pooled run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; the fastest is reported")
+    args = parser.parse_args()
+
+    if not args.book:
+        parser.error("no book given and no sample EPUB found")
+
+    variants = [
+        ("html.parser, sequential", "html.parser", 1, False),
+        (f"{extractor.HTML_PARSER}, sequential", extractor.HTML_PARSER, 1, False),
+        (f"{extractor.HTML_PARSER}, {args.processes} processes", extractor.HTML_PARSER, args.processes, True),
+    ]
+
+    reference = None
+    baseline = None
+    print("=" * 60)
+    for name, html_parser, processes, force_pool in variants:
+        best = None
+        for _ in range(args.repeat):
+            chapters, elapsed = run(args.book, html_parser, processes, force_pool)
+            best = elapsed if best is None else min(best, elapsed)
+        if reference is None:
+            reference, baseline = chapters, best
+        identical = chapters == reference
+        print(f"{name:<30}{best * 1000:>9.0f} ms{baseline / best:>7.2f}x  {'identical' if identical else 'DIFFERENT'}")
+    print("=" * 60)
+    print(f"{len(reference)} chapters, {sum(len(c.content) for c in reference):,} chars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares the fast sentence segmenter against pysbd on a book: speed, and how
+often the two agree on sentence boundaries.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.cleaner import clean_text
+from src.core.segmenter import segment_sentences, get_pysbd_segmenter
+
+
+def boundaries(sentences):
+    """Offsets where sentences end, counted in non-whitespace characters."""
+    offsets = set()
+    position = 0
+    for sentence in sentences:
+        position += len("".join(sentence.split()))
+        offsets.add(position)
+    return offsets
+
+
+def compare(reference, candidate):
+    ref = boundaries(reference)
+    cand = boundaries(candidate)
+    agreed = len(ref & cand)
+    identical = len({s.strip() for s in reference} & {s.strip() for s in candidate})
+    return agreed, len(ref), len(cand), identical
+
+
+def main():
+    samples = glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples", "*.epub"))
+
+    parser = argparse.ArgumentParser(description="Benchmark the sentence segmenter against pysbd")
+    parser.add_argument("book", nargs="?", default=samples[0] if samples else None, help="EPUB or PDF (default: first sample book)")
+    parser.add_argument("--raw", action="store_true", help="Segment extracted text as-is instead of cleaned text")
+    parser.add_argument("--show", type=int, default=5, help="Number of disagreements to print")
+    args = parser.parse_args()
+
+    if not args.book:
+        parser.error("no book given and no sample EPUB found")
+
+    from src.core.extractor import extract_chapters_from_pdf, extract_chapters_from_epub
+    if args.book.lower().endswith('.pdf'):
+        chapters, _ = extract_chapters_from_pdf(args.book)
+    else:
+        chapters, _ = extract_chapters_from_epub(args.book)
+    texts = [chapter.content if args.raw else clean_text(chapter.content) for chapter in chapters]
+    texts = [text for text in texts if text.strip()]
+
+    pysbd_segmenter = get_pysbd_segmenter('en')
+
+    start = time.perf_counter()
+    reference = [pysbd_segmenter.segment(text) for text in texts]
+    pysbd_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    candidate = [segment_sentences(text) for text in texts]
+    fast_time = time.perf_counter() - start
+
+    agreed = ref_total = cand_total = identical = 0
+    shown = 0
+    for ref_sentences, cand_sentences in zip(reference, candidate):
+        a, r, c, i = compare(ref_sentences, cand_sentences)
+        agreed += a
+        ref_total += r
+        cand_total += c
+        identical += i
+        if shown < args.show and (a != r or a != c):
+            missing = {s.strip() for s in ref_sentences} - {s.strip() for s in cand_sentences}
+            for sentence in list(missing)[:args.show - shown]:
+                print(f"  pysbd only: {sentence[:120]!r}")
+                shown += 1
+
+    chars = sum(len(text) for text in texts)
+    print("=" * 60)
+    print(f"Text:               {chars:,} characters in {len(texts)} chapters")
+    print(f"pysbd:              {pysbd_time:8.2f} s  ({ref_total} sentences)")
+    print(f"Fast segmenter:     {fast_time:8.2f} s  ({cand_total} sentences)")
+    print(f"Speedup:            {pysbd_time / fast_time:8.1f}x")
+    print(f"Boundary recall:    {agreed / max(ref_total, 1):8.2%}")
+    print(f"Boundary precision: {agreed / max(cand_total, 1):8.2%}")
+    print(f"Identical sentences:{identical / max(ref_total, 1):8.2%}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,532 @@
+"""
+Generates synthetic EPUB and PDF books for load testing extraction,
+cleaning, segmentation and assembly.
+
+Books are built from a seed and come out byte-for-byte the same every time,
+so benchmarks can be rerun and compared. Their size is given as a multiple
+of a normal-length book (NORMAL_BOOK_WORDS), and the text mixes in what the
+cleaner and segmenter have to deal with: dialogue, abbreviations, large
+numbers, percentages, dates, currency and footnote markers, with images,
+running heads and a notes section per chapter around it. The same seed gives
+the same text in both formats.
+
+    python generate_corpus.py --scale 10 --format both
+    python bench_extractor.py corpus/synthetic-s1-x10.epub
+"""
+import argparse
+import math
+import os
+import random
+import struct
+import sys
+import uuid
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from html import escape
+from typing import List, Union
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.cleaner import ABBREVIATIONS, MONTH_NAMES, TRANSITION_WORDS
+
+# A typical novel
+NORMAL_BOOK_WORDS = 90_000
+CHAPTERS_PER_BOOK = 24
+
+# Zip entries and PDF metadata carry this date instead of the current time
+FIXED_DATE = (2000, 1, 1, 0, 0, 0)
+FIXED_PDF_DATE = "D:20000101000000Z"
+
+WORDS = """
+the of and to a in that it was he for on are as with his they at be this from have or by one had not
+but what all were when we there can an your which their said if do will each about how up out them then
+she many some so these would other into has more her two like him see time could no make than first
+been its who now people my made over did down only way find use may water long little very after words
+called just where most know get through back much go good new write our me man too any day same right
+look think also around another came come work three word must because does part even place well such
+here take why things help put years different away again off went old number great tell men say small
+every found still between name should home big give air line set own under read last never us left end
+along while might next sound below saw something thought both few those always looked show large often
+together asked house world going want school important until form food keep children feet land side
+without boy once animals life enough took sometimes four head above kind began almost live page got
+earth need far hand high year mother light parts country father let night following picture being study
+second eyes soon times story boys since white days ever paper hard near sentence better best across
+during today others however sure means knew try told young miles sun ways thing whole hear example
+heard several change answer room sea against top turned learn point city play toward five using himself
+usually river harbour mountain valley garden window letter silence morning evening winter summer storm
+road bridge village market station ship voyage engine signal lantern mirror promise secret journey
+""".split()
+
+NAMES = [
+    "Ada", "Bram", "Celia", "Dorian", "Edith", "Felix", "Greta", "Hugo", "Iris", "Jonas", "Klara", "Leon",
+    "Mira", "Nils", "Odile", "Piet", "Rosa", "Silas", "Tamsin", "Ulric", "Vera", "Wendel", "Yara", "Zeno",
+]
+PLACES = [
+    "Aldermoor", "Brackwater", "Corriston", "Dunmere", "Eastholm", "Fennick", "Greyhaven", "Hollowby",
+    "Islington", "Kestrel Bay", "Lowmarsh", "Marrowgate", "Northwick", "Oakhurst", "Pellworth", "Quarry End",
+]
+# Abbreviations that read naturally before a name
+TITLES = [abbr for abbr in ABBREVIATIONS if abbr[0].isupper() and abbr not in ("No.", "Vol.")]
+SPEECH_VERBS = ["said", "asked", "replied", "whispered", "called", "answered"]
+
+
+@dataclass
+class CorpusSpec:
+    """What to generate. Every count is per book unless noted."""
+    seed: int = 1
+    # Size as a multiple of NORMAL_BOOK_WORDS
+    scale: float = 1.0
+    # Defaults to CHAPTERS_PER_BOOK per normal book
+    chapters: int = 0
+    # Words per sentence: log-normal with this mean and standard deviation
+    sentence_mean: float = 16.0
+    sentence_sd: float = 9.0
+    # Sentences per paragraph: uniform in this range
+    paragraph_sentences: tuple = (2, 8)
+    # Chance of each feature per sentence
+    footnote_rate: float = 0.02
+    number_rate: float = 0.06
+    date_rate: float = 0.03
+    currency_rate: float = 0.03
+    dialogue_rate: float = 0.15
+    # Per chapter
+    images: int = 1
+    image_size: int = 256
+    # PDFs only: include an outline, or leave chapters to font-size detection
+    outline: bool = True
+
+    @property
+    def chapter_count(self):
+        return self.chapters or max(1, round(CHAPTERS_PER_BOOK * self.scale))
+
+    @property
+    def chapter_words(self):
+        return max(50, round(NORMAL_BOOK_WORDS * self.scale / self.chapter_count))
+
+    @property
+    def name(self):
+        return f"synthetic-s{self.seed}-x{self.scale:g}"
+
+
+@dataclass
+class Image:
+    name: str
+    caption: str
+    data: bytes
+
+
+@dataclass
+class GeneratedChapter:
+    number: int
+    title: str
+    # A paragraph is a list of text pieces and footnote numbers
+    blocks: List[Union[List[Union[str, int]], Image]] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+
+
+def png_bytes(rng, width, height):
+    """An RGB PNG of noise, which compresses about as badly as a photo."""
+    raw = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _number(rng):
+    kind = rng.random()
+    if kind < 0.4:
+        return f"{rng.randint(1_000, 9_999_999):,}"
+    if kind < 0.7:
+        return f"{rng.randint(1, 99)}{rng.choice(['', '.5', '.25'])}%"
+    return str(rng.randint(2, 999))
+
+
+def _date(rng):
+    if rng.random() < 0.7:
+        return f"{rng.choice(MONTH_NAMES)} {rng.randint(1, 28)}, {rng.randint(1850, 2030)}"
+    return f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(1850, 2030)}"
+
+
+def _currency(rng):
+    cents = f".{rng.randint(0, 99):02d}" if rng.random() < 0.5 else ""
+    return f"{rng.choice('$£€')}{rng.randint(1, 5_000)}{cents}"
+
+
+def _sentence_length(rng, spec):
+    # Log-normal parameters for the requested mean and standard deviation
+    variance = math.log(1 + (spec.sentence_sd / spec.sentence_mean) ** 2)
+    mu = math.log(spec.sentence_mean) - variance / 2
+    return max(2, min(120, round(rng.lognormvariate(mu, math.sqrt(variance)))))
+
+
+def sentence(rng, spec):
+    """One sentence of the requested length, with numbers, dates and the like mixed in."""
+    words = rng.choices(WORDS, k=_sentence_length(rng, spec))
+    for rate, make in ((spec.number_rate, _number), (spec.date_rate, _date), (spec.currency_rate, _currency)):
+        if rng.random() < rate:
+            words.insert(rng.randrange(len(words) + 1), make(rng))
+    if rng.random() < 0.2:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(PLACES))
+    if rng.random() < 0.1:
+        words.insert(0, f"{rng.choice(TITLES)} {rng.choice(NAMES)}")
+    elif rng.random() < 0.1:
+        words.insert(0, rng.choice(TRANSITION_WORDS) + ",")
+
+    text = " ".join(words)
+    text = text[0].upper() + text[1:] + rng.choices(".?!", weights=(8, 1, 1))[0]
+    if rng.random() < spec.dialogue_rate:
+        text = f"“{text}” {rng.choice(SPEECH_VERBS)} {rng.choice(NAMES)}."
+    return text
+
+
+def chapter_titles(spec):
+    rng = random.Random(f"{spec.seed}:titles")
+    return [
+        f"Chapter {n}: The {rng.choice(WORDS).capitalize()} of {rng.choice(PLACES)}"
+        for n in range(1, spec.chapter_count + 1)
+    ]
+
+
+def generate_chapters(spec):
+    """
+    Yields the book's chapters one at a time, so even a very large book is
+    never held in memory at once. Each chapter has its own random stream,
+    seeded from the book's seed and its number.
+    """
+    for number, title in enumerate(chapter_titles(spec), start=1):
+        rng = random.Random(f"{spec.seed}:chapter:{number}")
+        chapter = GeneratedChapter(number=number, title=title)
+
+        words = 0
+        paragraphs = []
+        while words < spec.chapter_words:
+            paragraph = []
+            for _ in range(rng.randint(*spec.paragraph_sentences)):
+                text = sentence(rng, spec)
+                words += text.count(" ") + 1
+                paragraph.append(text)
+                if rng.random() < spec.footnote_rate:
+                    chapter.notes.append(sentence(rng, spec))
+                    paragraph.append(len(chapter.notes))
+                paragraph.append(" ")
+            paragraphs.append(paragraph[:-1])
+
+        # Images go between paragraphs, never first
+        positions = sorted(rng.sample(range(1, len(paragraphs) + 1), min(spec.images, len(paragraphs))))
+        for i, position in enumerate(reversed(positions)):
+            index = len(positions) - i
+            paragraphs.insert(position, Image(
+                name=f"ch{number:04d}-{index}.png",
+                caption=f"Figure {number}.{index}: {sentence(rng, spec)}",
+                data=png_bytes(rng, spec.image_size, spec.image_size * 3 // 4),
+            ))
+        chapter.blocks = paragraphs
+        yield chapter
+
+
+def plain_text(paragraph):
+    """A paragraph as it appears in a PDF, with footnotes as [n] markers."""
+    return "".join(piece if isinstance(piece, str) else f"[{piece}]" for piece in paragraph)
+
+
+# --- EPUB -------------------------------------------------------------------
+
+_XHTML = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" lang="en">
+<head><title>{title}</title><link rel="stylesheet" type="text/css" href="../style.css"/></head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+_CONTAINER = """<?xml version="1.0" encoding="utf-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>
+</container>
+"""
+
+_STYLE = "body { font-family: serif; } .running-head { font-size: 0.8em; } sup { font-size: 0.7em; }\n"
+
+
+def _epub_paragraph(paragraph, number):
+    parts = []
+    for piece in paragraph:
+        if isinstance(piece, str):
+            parts.append(escape(piece, quote=False))
+        else:
+            parts.append(
+                f'<sup><a epub:type="noteref" href="#ch{number}-note{piece}" '
+                f'id="ch{number}-ref{piece}">{piece}</a></sup>'
+            )
+    return f"<p>{''.join(parts)}</p>"
+
+
+def _epub_chapter(chapter, book_title):
+    body = [f'<p class="running-head">{escape(book_title)}</p>', f"<h1>{escape(chapter.title)}</h1>"]
+    for block in chapter.blocks:
+        if isinstance(block, Image):
+            body.append(
+                f'<figure><img src="../images/{block.name}" alt=""/>'
+                f"<figcaption>{escape(block.caption)}</figcaption></figure>"
+            )
+        else:
+            body.append(_epub_paragraph(block, chapter.number))
+    if chapter.notes:
+        body.append('<section epub:type="footnotes"><h2>Notes</h2>')
+        for n, note in enumerate(chapter.notes, start=1):
+            body.append(
+                f'<aside epub:type="footnote" id="ch{chapter.number}-note{n}">'
+                f"<p>{n}. {escape(note)}</p></aside>"
+            )
+        body.append("</section>")
+    return _XHTML.format(title=escape(chapter.title), body="\n".join(body))
+
+
+def _write_entry(archive, name, data, compress=True):
+    info = zipfile.ZipInfo(name, date_time=FIXED_DATE)
+    info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    archive.writestr(info, data)
+
+
+def write_epub(spec, path):
+    """Writes the book as an EPUB 3 with a nav document and an NCX."""
+    book_title = f"Synthetic Book {spec.seed} ({spec.scale:g}x)"
+    identifier = f"urn:uuid:{uuid.UUID(int=random.Random(f'{spec.seed}:id').getrandbits(128))}"
+    titles = chapter_titles(spec)
+
+    manifest = [
+        '<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>',
+        '<item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>',
+        '<item id="style" href="style.css" media-type="text/css"/>',
+        '<item id="title" href="text/title.xhtml" media-type="application/xhtml+xml"/>',
+    ]
+    spine = ['<itemref idref="title"/>', '<itemref idref="nav"/>']
+
+    with zipfile.ZipFile(path, "w") as archive:
+        # The mimetype must come first, uncompressed
+        _write_entry(archive, "mimetype", "application/epub+zip", compress=False)
+        _write_entry(archive, "META-INF/container.xml", _CONTAINER)
+        _write_entry(archive, "OEBPS/style.css", _STYLE)
+
+        rng = random.Random(f"{spec.seed}:front")
+        _write_entry(archive, "OEBPS/text/title.xhtml", _XHTML.format(title=escape(book_title), body=(
+            f"<h1>{escape(book_title)}</h1><p>Generated from seed {spec.seed}.</p>"
+            f"<p>First published {_date(rng)}. Printed for {_currency(rng)}.</p>"
+        )))
+
+        for chapter in generate_chapters(spec):
+            item = f"ch{chapter.number:04d}"
+            _write_entry(archive, f"OEBPS/text/{item}.xhtml", _epub_chapter(chapter, book_title))
+            manifest.append(f'<item id="{item}" href="text/{item}.xhtml" media-type="application/xhtml+xml"/>')
+            spine.append(f'<itemref idref="{item}"/>')
+            for block in chapter.blocks:
+                if isinstance(block, Image):
+                    _write_entry(archive, f"OEBPS/images/{block.name}", block.data, compress=False)
+                    manifest.append(
+                        f'<item id="img-{block.name[:-4]}" href="images/{block.name}" media-type="image/png"/>'
+                    )
+
+        nav = "\n".join(
+            f'<li><a href="text/ch{n:04d}.xhtml">{escape(title)}</a></li>'
+            for n, title in enumerate(titles, start=1)
+        )
+        _write_entry(archive, "OEBPS/nav.xhtml", _XHTML.format(title="Contents", body=(
+            f'<nav epub:type="toc" id="toc"><h1>Contents</h1><ol>\n{nav}\n</ol></nav>'
+        )).replace('href="../style.css"', 'href="style.css"'))
+
+        points = "\n".join(
+            f'<navPoint id="p{n}" playOrder="{n}"><navLabel><text>{escape(title)}</text></navLabel>'
+            f'<content src="text/ch{n:04d}.xhtml"/></navPoint>'
+            for n, title in enumerate(titles, start=1)
+        )
+        _write_entry(archive, "OEBPS/toc.ncx", (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">\n'
+            f'<head><meta name="dtb:uid" content="{identifier}"/></head>\n'
+            f"<docTitle><text>{escape(book_title)}</text></docTitle>\n"
+            f"<navMap>\n{points}\n</navMap>\n</ncx>\n"
+        ))
+
+        _write_entry(archive, "OEBPS/content.opf", (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="id">\n'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+            f'<dc:identifier id="id">{identifier}</dc:identifier>\n'
+            f"<dc:title>{escape(book_title)}</dc:title>\n"
+            "<dc:creator>Open Narrator Corpus</dc:creator>\n"
+            "<dc:language>en</dc:language>\n"
+            '<meta property="dcterms:modified">2000-01-01T00:00:00Z</meta>\n'
+            "</metadata>\n"
+            "<manifest>\n" + "\n".join(manifest) + "\n</manifest>\n"
+            '<spine toc="ncx">\n' + "\n".join(spine) + "\n</spine>\n"
+            "</package>\n"
+        ))
+
+
+# --- PDF --------------------------------------------------------------------
+
+class _PdfLayout:
+    """
+    Flows text blocks down pages, starting a new page when one is full.
+    Lines are wrapped here from cached glyph widths, which is far quicker
+    than pymupdf's text boxes for books of this size. Text is set in an
+    embedded copy of Helvetica, so quotes and currency signs survive.
+    """
+    MARGIN = 72
+    FONT = "body"
+    LINE_HEIGHT = 1.2
+
+    def __init__(self, doc, fitz):
+        self.doc = doc
+        self.fitz = fitz
+        self.page = None
+        self.y = 0
+        self.font = fitz.Font("helv")
+        # Character -> width at font size 1
+        self.widths = {}
+
+    def new_page(self):
+        self.page = self.doc.new_page()
+        self.page.insert_font(fontname=self.FONT, fontbuffer=self.font.buffer)
+        self.y = self.MARGIN
+
+    def _width(self, word):
+        widths = self.widths
+        total = 0.0
+        for char in word:
+            width = widths.get(char)
+            if width is None:
+                width = widths[char] = self.font.text_length(char, fontsize=1)
+            total += width
+        return total
+
+    def wrap(self, text, fontsize):
+        limit = (self.page.rect.width - 2 * self.MARGIN) / fontsize
+        space = self._width(" ")
+        lines, line, used = [], [], 0.0
+        for word in text.split():
+            width = self._width(word)
+            if line and used + space + width > limit:
+                lines.append(" ".join(line))
+                line, used = [], 0.0
+            used += (space if line else 0.0) + width
+            line.append(word)
+        if line:
+            lines.append(" ".join(line))
+        return lines
+
+    def text(self, text, fontsize, gap=6):
+        line_height = fontsize * self.LINE_HEIGHT
+        bottom = self.page.rect.height - self.MARGIN
+        lines = self.wrap(text, fontsize)
+        while lines:
+            room = int((bottom - self.y) // line_height)
+            if room < 1:
+                self.new_page()
+                continue
+            chunk, lines = lines[:room], lines[room:]
+            self.page.insert_text((self.MARGIN, self.y + fontsize), chunk,
+                                  fontsize=fontsize, fontname=self.FONT, lineheight=self.LINE_HEIGHT)
+            self.y += len(chunk) * line_height
+        self.y += gap
+
+    def image(self, data, caption, size):
+        width = self.page.rect.width - 2 * self.MARGIN
+        height = width * 3 / 4 * min(1, size / width)
+        if self.y + height + 30 > self.page.rect.height - self.MARGIN:
+            self.new_page()
+        self.page.insert_image(self.fitz.Rect(self.MARGIN, self.y, self.MARGIN + width, self.y + height), stream=data)
+        self.y += height + 6
+        self.text(caption, 9, gap=12)
+
+
+def write_pdf(spec, path):
+    """
+    Writes the book as a PDF: one heading per chapter, a running head and
+    page number on every page, and an outline unless spec.outline is off.
+    """
+    import fitz  # pymupdf
+
+    book_title = f"Synthetic Book {spec.seed} ({spec.scale:g}x)"
+    doc = fitz.open()
+    layout = _PdfLayout(doc, fitz)
+
+    layout.new_page()
+    layout.y = 200
+    layout.text(book_title, 28, gap=24)
+    layout.text(f"Generated from seed {spec.seed}.", 12)
+
+    toc = []
+    for chapter in generate_chapters(spec):
+        layout.new_page()
+        toc.append([1, chapter.title, doc.page_count])
+        layout.text(chapter.title, 20, gap=18)
+        for block in chapter.blocks:
+            if isinstance(block, Image):
+                layout.image(block.data, block.caption, spec.image_size)
+            else:
+                layout.text(plain_text(block), 11)
+        if chapter.notes:
+            layout.text("Notes", 14, gap=8)
+            for n, note in enumerate(chapter.notes, start=1):
+                layout.text(f"{n}. {note}", 9, gap=3)
+
+    if spec.outline:
+        doc.set_toc(toc)
+    for page in list(doc)[1:]:
+        page.insert_text((250, 40), book_title.upper(), fontsize=9)
+        page.insert_text((300, page.rect.height - 30), str(page.number + 1), fontsize=9)
+
+    doc.set_metadata({
+        "title": book_title, "author": "Open Narrator Corpus", "producer": "generate_corpus.py",
+        "creator": "generate_corpus.py", "creationDate": FIXED_PDF_DATE, "modDate": FIXED_PDF_DATE,
+    })
+    # A fixed file ID keeps the bytes the same from run to run
+    doc.save(path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic books for load testing")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help=f"Book size as a multiple of a normal book ({NORMAL_BOOK_WORDS:,} words)")
+    parser.add_argument("--chapters", type=int, default=0,
+                        help=f"Number of chapters (default: {CHAPTERS_PER_BOOK} per normal book)")
+    parser.add_argument("--sentence-mean", type=float, default=16.0, help="Mean words per sentence")
+    parser.add_argument("--sentence-sd", type=float, default=9.0, help="Standard deviation of words per sentence")
+    parser.add_argument("--footnote-rate", type=float, default=0.02, help="Chance of a footnote after each sentence")
+    parser.add_argument("--images", type=int, default=1, help="Images per chapter")
+    parser.add_argument("--image-size", type=int, default=256, help="Image width in pixels")
+    parser.add_argument("--no-outline", action="store_true", help="Leave PDF chapters to heading detection")
+    parser.add_argument("--format", choices=["epub", "pdf", "both"], default="epub")
+    parser.add_argument("-o", "--output", default="corpus", help="Output directory")
+    args = parser.parse_args()
+
+    spec = CorpusSpec(
+        seed=args.seed, scale=args.scale, chapters=args.chapters,
+        sentence_mean=args.sentence_mean, sentence_sd=args.sentence_sd, footnote_rate=args.footnote_rate,
+        images=args.images, image_size=args.image_size, outline=not args.no_outline,
+    )
+    os.makedirs(args.output, exist_ok=True)
+    print(f"{spec.chapter_count} chapters of ~{spec.chapter_words:,} words (seed {spec.seed})")
+
+    formats = ["epub", "pdf"] if args.format == "both" else [args.format]
+    for extension in formats:
+        path = os.path.join(args.output, f"{spec.name}.{extension}")
+        (write_epub if extension == "epub" else write_pdf)(spec, path)
+        print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
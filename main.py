@@ -1,13 +1,16 @@
+import multiprocessing
 import sys
 import os
 
 # Add project root to sys.path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from PySide6.QtWidgets import QApplication
-from src.gui.main_window import MainWindow
-
 def main():
+    # Imported here rather than at the top: worker processes spawned for
+    # text preparation re-import this module, and must not load Qt or torch
+    from PySide6.QtWidgets import QApplication
+    from src.gui.main_window import MainWindow
+
     app = QApplication(sys.argv)
     app.setStyle("Fusion") # Good base style for custom themes
     
@@ -17,4 +20,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Needed for the text-preparation process pool in frozen builds
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,91 @@
+"""
+Measures the memory a book's chapter text takes: one Python string per
+chapter against the shared UTF-8 BookText behind Chapter. Also measures
+the peak while joining the whole book for word detection, which used to
+hold every chapter's string and the joined copy at once.
+"""
+import argparse
+import gc
+import glob
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.extractor import Chapter, joined_text, pack_chapters
+
+
+def load_texts(path, copies):
+    """Chapter titles and UTF-8 text, repeated to stand in for a larger book."""
+    if path.lower().endswith('.pdf'):
+        from src.core.extractor import extract_chapters_from_pdf
+        chapters, _ = extract_chapters_from_pdf(path)
+    else:
+        from src.core.extractor import extract_chapters_from_epub
+        chapters, _ = extract_chapters_from_epub(path)
+    rows = [(chapter.title, chapter.content.encode('utf-8')) for chapter in chapters]
+    return rows * copies
+
+
+def traced(func):
+    """Returns (result, bytes still allocated afterwards, peak bytes)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current, peak
+
+
+def build_chapters(rows, packed):
+    chapters = [
+        Chapter(title=title, content=data.decode('utf-8'), order=i + 1)
+        for i, (title, data) in enumerate(rows)
+    ]
+    if packed:
+        pack_chapters(chapters)
+    return chapters
+
+
+def mb(value):
+    return f"{value / (1024 * 1024):8.1f} MB"
+
+
+def main():
+    samples = glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples", "*.epub"))
+
+    parser = argparse.ArgumentParser(description="Measure memory used by chapter text")
+    parser.add_argument("book", nargs="?", default=samples[0] if samples else None, help="EPUB or PDF file (default: first sample book)")
+    parser.add_argument("--copies", type=int, default=10, help="Repeat the book's chapters to simulate a larger title")
+    args = parser.parse_args()
+
+    if not args.book:
+        parser.error("no book given and no sample EPUB found")
+
+    rows = load_texts(args.book, args.copies)
+    chars = sum(len(data.decode('utf-8')) for _, data in rows)
+    print(f"{len(rows)} chapters, {chars:,} characters ({args.copies} copies of {os.path.basename(args.book)})")
+
+    # Referenced from the start so its allocation isn't charged to the join
+    separator = "\n\n"
+
+    print("=" * 67)
+    print(f"{'':<22}{'retained':>11}{'build peak':>12}{'join peak':>11}{'total':>11}")
+    for name, packed in [("String per chapter", False), ("Shared BookText", True)]:
+        chapters, retained, build_peak = traced(lambda: build_chapters(rows, packed))
+        if packed:
+            join = lambda: joined_text(chapters, separator)
+        else:
+            join = lambda: separator.join([chapter.content for chapter in chapters])
+        text, _, join_peak = traced(join)
+        # Total: what the process holds at the height of the join
+        print(f"{name:<22}{mb(retained):>11}{mb(build_peak):>12}{mb(join_peak):>11}{mb(retained + join_peak):>11}")
+        del chapters, text
+    print("=" * 67)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Measures per-worker memory of the shared-weight synthesis pool.
+Reports each worker's unique set size (USS): memory that belongs to that
+process alone. With shared weights USS should stay far below the model size.
+"""
+import argparse
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core.synthesizer import AudioSynthesizer
+from src.core.synthesis_pool import SynthesisProcessPool
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+    psutil = None
+
+
+def read_memory(pid):
+    """
+    Returns (uss, pss, rss) in bytes for a process, or None if unavailable.
+    Uses psutil when installed, otherwise /proc/<pid>/smaps_rollup (Linux).
+    """
+    if PSUTIL_AVAILABLE:
+        info = psutil.Process(pid).memory_full_info()
+        return info.uss, getattr(info, 'pss', 0), info.rss
+
+    try:
+        fields = {}
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) * 1024
+        uss = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+        return uss, fields.get('Pss', 0), fields.get('Rss', 0)
+    except OSError:
+        return None
+
+
+def mb(value):
+    return f"{value / (1024 * 1024):8.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-worker memory of the synthesis pool")
+    parser.add_argument("--processes", "-p", type=int, default=4, help="Number of worker processes")
+    parser.add_argument("--voice", "-v", default="af_sarah", help="Voice to preload and share")
+    parser.add_argument("--start-method", choices=["fork", "spawn"], help="Process start method (default: fork where available)")
+    args = parser.parse_args()
+
+    print("Loading model in parent process...")
+    synth = AudioSynthesizer(device='cpu')
+
+    model_bytes = sum(p.numel() * p.element_size() for p in synth.pipeline.model.parameters())
+    print(f"Model weights: {mb(model_bytes)}")
+
+    with SynthesisProcessPool(synth, processes=args.processes, voices=[args.voice],
+                              start_method=args.start_method) as pool:
+        print(f"Started {args.processes} workers ({pool.start_method})")
+
+        # Run a few sentences through every worker so each one has
+        # touched the weights before measuring
+        sentences = ["This sentence warms up one of the synthesis workers."] * (args.processes * 2)
+        for _ in pool.synthesize_segments(sentences, voice_name=args.voice):
+            pass
+
+        print("=" * 60)
+        print(f"{'Process':<16}{'USS':>14}{'PSS':>14}{'RSS':>14}")
+        print("=" * 60)
+
+        parent = read_memory(os.getpid())
+        if parent:
+            print(f"{'parent':<16}{mb(parent[0]):>14}{mb(parent[1]):>14}{mb(parent[2]):>14}")
+
+        total_uss = 0
+        for pid in pool.worker_pids():
+            usage = read_memory(pid)
+            if usage is None:
+                print(f"worker {pid:<9} unavailable (install psutil on this platform)")
+                continue
+            total_uss += usage[0]
+            print(f"{'worker ' + str(pid):<16}{mb(usage[0]):>14}{mb(usage[1]):>14}{mb(usage[2]):>14}")
+
+        print("=" * 60)
+        print(f"Total worker USS: {mb(total_uss)} across {args.processes} workers")
+        print(f"Private copies would need about {mb(model_bytes * args.processes)} of weights alone")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import argparse
+import multiprocessing
 import sys
 import os
 import shutil
@@ -7,25 +8,73 @@ import tempfile
 # Add project root to sys.path to allow running script directly
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.core.extractor import extract_chapters_from_pdf, extract_chapters_from_epub
-from src.core.cleaner import clean_text, segment_text
-from src.core.synthesizer import AudioSynthesizer
-from src.core.audio_builder import M4BBuilder
+from src.core.extractor import chapter_size_label
+from src.core.readers import SUPPORTED_EXTENSIONS, is_supported, list_chapters
+from src.core.text_prep import load_chapters, prepare_chapters
+from src.core.extraction_cache import ExtractionCache
+from src.utils.config import M4B_ASSEMBLY_MODE
+from src.utils.host_profile import load_host_profile, save_host_profile
+
+def autotune(voice):
+    from src.core.autotune import run_autotune
+    
+    print("Autotuning synthesis settings for this machine...")
+    profile, results = run_autotune(voice=voice)
+    path = save_host_profile(profile)
+    
+    print(f"\nBest: {profile['sessions']} session(s) x {profile['threads']} thread(s), "
+          f"max_chars={profile['max_chars']}, RTF {profile['rtf']:.3f}")
+    print(f"Saved profile to {path}")
+
+def profile_cleaner(chapters, output_format, output_path=None):
+    from src.core.cleaner_profiler import CleanerProfiler
+    
+    profiler = CleanerProfiler()
+    for chapter in chapters:
+        profiler.clean(chapter.content, label=chapter.title)
+    
+    report = profiler.to_json() if output_format == "json" else profiler.report()
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"Cleaner profile saved to {output_path}")
+    else:
+        print(report)
 
 def main():
+    profile = load_host_profile()
+    
     parser = argparse.ArgumentParser(description="OpenNarrator CLI")
-    parser.add_argument("input_file", help="Path to PDF or EPUB file")
+    parser.add_argument("input_file", nargs="?", help="Path to an EPUB, PDF, text, Markdown or HTML file")
     parser.add_argument("--output", "-o", help="Output M4B file path", default="output.m4b")
     parser.add_argument("--voice", "-v", help="Voice name", default="af_sarah")
     parser.add_argument("--speed", "-s", type=float, help="Speed", default=1.0)
     parser.add_argument("--skip-toc", action="store_true", help="Skip Table of Contents chapters")
     parser.add_argument("--list-chapters", action="store_true", help="List chapters and exit")
+    parser.add_argument("--no-cache", action="store_true", help="Always extract the book again, without reading or writing the extraction cache")
     parser.add_argument("--start-chapter", type=int, help="Start from chapter number (1-based)")
     parser.add_argument("--end-chapter", type=int, help="End at chapter number (1-based)")
     parser.add_argument("--preview", action="store_true", help="Preview mode: synthesize only first 3 sentences per chapter")
+    parallel = parser.add_mutually_exclusive_group()
+    parallel.add_argument("--processes", type=int, default=1, help="Synthesis worker processes sharing one copy of the model (CPU only)")
+    parallel.add_argument("--sessions", type=int, default=profile["sessions"], help="In-process inference sessions fed from one segment queue (default: host profile)")
+    parser.add_argument("--session-threads", type=int, default=profile["threads"], help="Intra-op threads per inference session (default: host profile, else split CPUs evenly)")
+    parser.add_argument("--max-chars", type=int, default=profile["max_chars"], help="Maximum characters per synthesized segment (default: host profile)")
+    parser.add_argument("--assembly", choices=["parallel", "single", "inprocess"], default=M4B_ASSEMBLY_MODE, help="Encode chapters to AAC in parallel as they finish and join them with a stream copy, encode the whole book in one pass at the end, or encode it in this process with PyAV as it is synthesized")
+    parser.add_argument("--encode-processes", type=int, help="FFmpeg processes for parallel assembly (default: one per CPU)")
+    parser.add_argument("--autotune", action="store_true", help="Measure the fastest threads/sessions/segment size on this machine and save it as the host profile")
+    parser.add_argument("--profile-cleaner", nargs="?", const="text", choices=["text", "json"], help="Profile each text-cleaning rule over the selected chapters, print a report (text or json) and exit")
+    parser.add_argument("--profile-output", help="Write the --profile-cleaner report to this file instead of printing it")
 
     args = parser.parse_args()
 
+    if args.autotune:
+        autotune(args.voice)
+        return
+
+    if not args.input_file:
+        parser.error("input_file is required unless --autotune is given")
+
     if not os.path.exists(args.input_file):
         print(f"Error: File {args.input_file} not found.")
         return
@@ -33,14 +82,22 @@ def main():
     print(f"Processing {args.input_file}...")
 
     # 1. Extraction
+    cache = None if args.no_cache else ExtractionCache()
+    cached = None
     try:
-        if args.input_file.lower().endswith(".pdf"):
-            # PDF support is basic for now
-            chapters = extract_chapters_from_pdf(args.input_file)
-        elif args.input_file.lower().endswith(".epub"):
-            chapters = extract_chapters_from_epub(args.input_file, skip_toc=args.skip_toc)
+        if cache is not None:
+            cache_key = ExtractionCache.key(args.input_file, f"raw:skip_toc={args.skip_toc}")
+            cached = cache.load(cache_key)
+
+        if cached is not None:
+            chapters, metadata = cached
+            print("Loaded chapters from the extraction cache.")
+        elif is_supported(args.input_file):
+            # EPUB and PDF chapter bodies are only extracted when their
+            # content is needed; text formats are read in one streaming pass
+            chapters, metadata = list_chapters(args.input_file, skip_toc=args.skip_toc)
         else:
-            print("Unsupported file format.")
+            print(f"Unsupported file format. Supported: {', '.join(SUPPORTED_EXTENSIONS)}")
             return
     except Exception as e:
         print(f"Extraction failed: {e}")
@@ -52,7 +109,7 @@ def main():
         print("\nChapter List:")
         for ch in chapters:
             toc_mark = " [TOC]" if ch.is_toc else ""
-            print(f"{ch.order}. {ch.title}{toc_mark} ({len(ch.content)} chars)")
+            print(f"{ch.order}. {ch.title}{toc_mark} ({chapter_size_label(ch)})")
         return
 
     # Filter chapters
@@ -70,11 +127,42 @@ def main():
         print("No chapters selected.")
         return
 
+    # Only a whole book is cached; for a range, just the selected chapters
+    # are ever extracted
+    if cache is not None and cached is None and len(selected_chapters) == len(chapters):
+        try:
+            load_chapters(chapters)
+            cache.store(cache_key, chapters, metadata)
+        except Exception as e:
+            print(f"Could not cache extracted book: {e}")
+
     print(f"Processing {len(selected_chapters)} chapters (from {start_idx+1} to {end_idx})...")
 
+    if args.profile_cleaner:
+        profile_cleaner(selected_chapters, args.profile_cleaner, args.profile_output)
+        return
+
+    # Synthesis and audio modules are imported only now: spawned worker
+    # processes re-import this module, and shouldn't load torch for nothing
+    from src.core.synthesizer import AudioSynthesizer
+    from src.core.audio_builder import ChapterEncoder, M4BBuilder
+    from src.core.av_builder import AV_AVAILABLE, AvM4BWriter
+
     # Initialize Synthesizer
     try:
-        synthesizer = AudioSynthesizer()
+        if args.processes > 1:
+            from src.core.synthesis_pool import SynthesisProcessPool
+            synthesizer = AudioSynthesizer(device='cpu')
+            engine = SynthesisProcessPool(synthesizer, processes=args.processes, voices=[args.voice])
+            print(f"Started {args.processes} synthesis processes sharing one model")
+        elif args.sessions > 1:
+            from src.core.session_pool import InferenceSessionPool
+            synthesizer = AudioSynthesizer()
+            engine = InferenceSessionPool(synthesizer, sessions=args.sessions, threads_per_session=args.session_threads)
+            print(f"Started {args.sessions} inference sessions with {engine.threads_per_session} threads each")
+        else:
+            synthesizer = AudioSynthesizer()
+            engine = synthesizer
     except Exception as e:
         print(f"Failed to initialize synthesizer: {e}")
         return
@@ -83,51 +171,72 @@ def main():
     all_audio_files = []
     chapter_metadata = [] # List of (title, start, end)
     current_timestamp = 0.0
+    # Basic metadata, written in the same pass as the audio
+    title = os.path.splitext(os.path.basename(args.input_file))[0]
+    if args.assembly == "inprocess" and not AV_AVAILABLE:
+        print("PyAV is not installed; using parallel assembly")
+        args.assembly = "parallel"
+    # Encodes each chapter while the next ones are synthesized
+    encoder = ChapterEncoder(temp_dir, processes=args.encode_processes) if args.assembly == "parallel" else None
+    # Or encodes the audio in this process as it arrives, without WAV files
+    writer = None
+    writer_path = os.path.join(temp_dir, "book.m4b")
 
     try:
+        # Cleaning & Segmentation, all chapters at once across CPU cores
+        print("Preparing text...")
+        prepared_chapters = prepare_chapters(selected_chapters, max_chars=args.max_chars, strip_titles=False)
+
         for i, chapter in enumerate(selected_chapters):
             print(f"\nProcessing Chapter {chapter.order}: {chapter.title}")
             
-            # Cleaning & Segmentation
-            text = clean_text(chapter.content)
-            sentences = segment_text(text)
+            sentences = prepared_chapters[i].segments
             print(f"  - {len(sentences)} sentences")
 
             if not sentences:
                 continue
 
             chapter_start_time = current_timestamp
+            chapter_first_file = len(all_audio_files)
             
             # Synthesis
-            count = 0
-            for j, sentence in enumerate(sentences):
-                if not sentence.strip():
+            to_render = [sentence for sentence in sentences if sentence.strip()]
+            if args.preview:
+                to_render = to_render[:3]
+
+            results = engine.synthesize_segments(to_render, voice_name=args.voice, speed=args.speed)
+            chapter_marked = False
+            for j, (audio, sample_rate) in enumerate(results):
+                if len(audio) == 0:
+                    print(f"\n    Failed to synthesize sentence {j+1}")
                     continue
-                
-                if args.preview and count >= 3:
-                    break
-
-                try:
-                    # print(f"    Synthesizing sentence {j+1}/{len(sentences)}...", end='\r')
-                    audio, sample_rate = synthesizer.synthesize_segment(sentence, voice_name=args.voice, speed=args.speed)
-                    
-                    # Calculate duration
-                    duration = len(audio) / sample_rate
-                    
-                    output_wav = os.path.join(temp_dir, f"ch{chapter.order}_seg{j:04d}.wav")
-                    synthesizer.save_audio(audio, sample_rate, output_wav)
-                    
-                    all_audio_files.append(output_wav)
+
+                # Calculate duration
+                duration = len(audio) / sample_rate
+
+                if args.assembly == "inprocess":
+                    if writer is None:
+                        writer = AvM4BWriter(writer_path, sample_rate, title=title, author="OpenNarrator")
+                    if not chapter_marked:
+                        writer.start_chapter(chapter.title)
+                        chapter_marked = True
+                    writer.write(audio, sample_rate)
                     current_timestamp += duration
-                    count += 1
-                except Exception as e:
-                    print(f"\n    Failed to synthesize sentence {j+1}: {e}")
+                    continue
+                
+                output_wav = os.path.join(temp_dir, f"ch{chapter.order}_seg{j:04d}.wav")
+                synthesizer.save_audio(audio, sample_rate, output_wav)
+                
+                all_audio_files.append(output_wav)
+                current_timestamp += duration
             
             chapter_end_time = current_timestamp
             chapter_metadata.append((chapter.title, chapter_start_time, chapter_end_time))
+            if encoder is not None:
+                encoder.submit(chapter.title, all_audio_files[chapter_first_file:], chapter_end_time - chapter_start_time)
             print(f"  - Chapter processed. Duration: {chapter_end_time - chapter_start_time:.2f}s")
 
-        if not all_audio_files:
+        if not all_audio_files and writer is None:
             print("No audio generated.")
             return
 
@@ -135,12 +244,26 @@ def main():
         print("\nAssembling M4B...")
         try:
             builder = M4BBuilder()
-            # Pass chapter metadata
-            builder.combine_audio_chunks(all_audio_files, args.output, chapters=chapter_metadata)
-            
-            # Add basic metadata
-            title = os.path.splitext(os.path.basename(args.input_file))[0]
-            builder.add_metadata(args.output, title=title, author="OpenNarrator")
+
+            def show_progress(percent, speed, eta_seconds):
+                eta = f", ETA {eta_seconds // 60}m {eta_seconds % 60}s" if eta_seconds is not None else ""
+                print(f"\r  Encoding: {percent}% ({speed:.1f}x{eta})   ", end="", flush=True)
+
+            if writer is not None:
+                # Only the encoder flush and the index are left to write
+                writer.close()
+                shutil.move(writer_path, args.output)
+            elif encoder is not None:
+                # Chapter marks come from the encoded chapters themselves
+                encoder.finish(args.output, progress_callback=show_progress, title=title, author="OpenNarrator")
+            else:
+                # Pass chapter metadata
+                builder.combine_audio_chunks(
+                    all_audio_files, args.output, chapters=chapter_metadata,
+                    progress_callback=show_progress, total_duration=current_timestamp,
+                    title=title, author="OpenNarrator"
+                )
+            print()
             
             print(f"Done! Saved to {args.output}")
         except Exception as e:
@@ -148,8 +271,15 @@ def main():
             
     finally:
         # Cleanup
+        if encoder is not None:
+            encoder.close()
+        if writer is not None:
+            writer.close()
+        if engine is not synthesizer:
+            engine.close()
         if os.path.exists(temp_dir):
             shutil.rmtree(temp_dir)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
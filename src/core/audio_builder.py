@@ -1,16 +1,160 @@
 import subprocess
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import soundfile as sf
 from mutagen.mp4 import MP4, MP4Cover
 
+# Lines of FFmpeg's stderr kept for the error raised when it fails
+STDERR_TAIL_LINES = 50
+
+# Bitrate for audiobook
+AAC_BITRATE = "64k"
+# Samples in one AAC frame
+AAC_FRAME_SAMPLES = 1024
+# ADTS sampling_frequency_index -> sample rate
+_ADTS_SAMPLE_RATES = [96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350]
+
+
+def read_progress(stream):
+    """
+    Yields a dict for each block of FFmpeg's -progress output: key=value
+    lines, ending with a progress=continue or progress=end line.
+    """
+    block = {}
+    for line in stream:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+        block[key] = value
+        if key == "progress":
+            yield block
+            block = {}
+
+
+def _out_time(block):
+    """Seconds of output encoded so far, or None."""
+    # out_time_ms is in microseconds too, despite its name
+    for key in ("out_time_us", "out_time_ms"):
+        try:
+            return int(block[key]) / 1_000_000
+        except (KeyError, ValueError):
+            continue
+    try:
+        hours, minutes, seconds = block["out_time"].split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except (KeyError, ValueError):
+        return None
+
+
+def progress_report(block, total_duration, elapsed):
+    """
+    Turns one -progress block into (percent, speed, eta_seconds).
+    speed is seconds of audio encoded per second; eta_seconds is None
+    until there is a speed to go by. Returns None if there is nothing
+    to report.
+    """
+    out_time = _out_time(block)
+    if block.get("progress") == "end":
+        speed = out_time / elapsed if out_time and elapsed > 0 else 0.0
+        return 100, speed, 0
+    if out_time is None or not total_duration:
+        return None
+
+    try:
+        speed = float(block.get("speed", "").rstrip("x"))
+    except ValueError:
+        # "N/A" until FFmpeg has measured it
+        speed = out_time / elapsed if elapsed > 0 else 0.0
+
+    remaining = max(0.0, total_duration - out_time)
+    eta = int(remaining / speed) if speed > 0 else None
+    return min(99, int(out_time * 100 / total_duration)), speed, eta
+
+
+def audio_duration(audio_files):
+    """Total length of the audio files in seconds, read from their headers."""
+    try:
+        return sum(sf.info(path).duration for path in audio_files)
+    except Exception as e:
+        print(f"Could not read audio durations: {e}")
+        return None
+
+
+def _escape_metadata(value):
+    """Escapes a value for an FFMETADATA file."""
+    value = str(value)
+    for char in ('\\', '=', ';', '#', '\n'):
+        value = value.replace(char, '\\' + char)
+    return value
+
+
+def mp4_tags(title, author):
+    """FFMETADATA keys for the MP4 title, artist and album tags (as add_metadata() sets them)."""
+    tags = {}
+    if title:
+        tags["title"] = title
+        tags["album"] = title
+    if author:
+        tags["artist"] = author
+    return tags
+
+
+def _cover_args(cover_image_path, input_index):
+    """
+    (input args, output args) that mux a cover image in as attached
+    picture, which FFmpeg writes as the MP4 covr atom.
+    """
+    if not cover_image_path or not os.path.exists(cover_image_path):
+        return [], []
+    return (
+        ["-i", cover_image_path],
+        ["-map", "0:a", "-map", f"{input_index}:v", "-c:v", "copy", "-disposition:v", "attached_pic"]
+    )
+
+
+def adts_samples(path):
+    """
+    (samples, sample_rate) of an ADTS AAC file, counted from its frame
+    headers. This is exactly the audio the file adds when stream-copied
+    into a longer track, encoder delay and padding included.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    pos = 0
+    samples = 0
+    sample_rate = None
+    while pos + 7 <= len(data):
+        # 12-bit sync word, then MPEG version, layer 0 and the CRC flag
+        if data[pos] != 0xFF or data[pos + 1] & 0xF6 != 0xF0:
+            raise ValueError(f"No ADTS frame at byte {pos} of {path}")
+        sample_rate = _ADTS_SAMPLE_RATES[(data[pos + 2] >> 2) & 0xF]
+        frame_length = ((data[pos + 3] & 0x03) << 11) | (data[pos + 4] << 3) | (data[pos + 5] >> 5)
+        if frame_length < 7:
+            raise ValueError(f"Bad ADTS frame length at byte {pos} of {path}")
+        samples += AAC_FRAME_SAMPLES * ((data[pos + 6] & 0x03) + 1)
+        pos += frame_length
+    return samples, sample_rate
+
+
 class M4BBuilder:
     def __init__(self, ffmpeg_path="ffmpeg"):
         self.ffmpeg_path = ffmpeg_path
 
-    def combine_audio_chunks(self, audio_files, output_path, chapters=None, progress_callback=None):
+    def combine_audio_chunks(self, audio_files, output_path, chapters=None, progress_callback=None,
+                             total_duration=None, title=None, author=None, cover_image_path=None):
         """
         Combines multiple audio files into one M4B file using FFmpeg.
+        Chapters, tags and cover art are written in the same pass.
         chapters: List of (title, start_time, end_time) tuples in seconds.
-        progress_callback: Optional callback function(percent) to report progress.
+        progress_callback: Optional callback function(percent, speed, eta_seconds),
+                           called as FFmpeg reports its progress (see progress_report()).
+        total_duration: Length of the audio in seconds; defaults to the end of the
+                        last chapter, or else is read from the files.
         """
         # Create a file list for ffmpeg in the same directory as the audio files
         # This avoids issues with absolute paths and drive letters on Windows
@@ -28,40 +172,46 @@ class M4BBuilder:
                 f.write(f"file '{abs_path}'\n")
         
         metadata_file = None
-        if chapters:
+        tags = mp4_tags(title, author)
+        if chapters or tags:
             metadata_file = output_path + ".metadata.txt"
-            self._create_metadata_file(chapters, metadata_file)
+            self._create_metadata_file(chapters or [], metadata_file, tags=tags)
+
+        if progress_callback and not total_duration:
+            total_duration = chapters[-1][2] if chapters else audio_duration(audio_files)
 
         cmd = [
             self.ffmpeg_path,
+            # Only warnings and errors on stderr, progress as key=value lines on stdout
+            "-hide_banner", "-nostats", "-loglevel", "warning",
+            "-progress", "pipe:1",
             "-f", "concat",
             "-safe", "0",
             "-i", list_file
         ]
 
         if metadata_file:
-            cmd.extend(["-i", metadata_file, "-map_metadata", "1"])
+            cmd.extend(["-i", metadata_file])
+
+        cover_inputs, cover_outputs = _cover_args(cover_image_path, 2 if metadata_file else 1)
+        cmd.extend(cover_inputs)
+
+        if metadata_file:
+            cmd.extend(["-map_metadata", "1"])
+        cmd.extend(cover_outputs)
 
         cmd.extend([
             "-c:a", "aac",
-            "-b:a", "64k", # Bitrate for audiobook
+            "-b:a", AAC_BITRATE,
             "-f", "mp4",  # M4B files are MP4 containers
             "-y",
             output_path
         ])
         
         try:
-            if progress_callback:
-                # Emit progress during FFmpeg processing
-                # Since we can't easily track FFmpeg progress, emit incremental updates
-                progress_callback(10)  # Starting
-                
-            subprocess.run(cmd, check=True, capture_output=True)
-            
-            if progress_callback:
-                progress_callback(90)  # FFmpeg complete
+            self._run_ffmpeg(cmd, total_duration, progress_callback)
         except subprocess.CalledProcessError as e:
-            print(f"FFmpeg failed: {e.stderr.decode()}")
+            print(f"FFmpeg failed: {e.stderr}")
             raise e
         finally:
             if os.path.exists(list_file):
@@ -69,17 +219,72 @@ class M4BBuilder:
             if metadata_file and os.path.exists(metadata_file):
                 os.remove(metadata_file)
 
-    def _create_metadata_file(self, chapters, output_path):
+    def _run_ffmpeg(self, cmd, total_duration=None, progress_callback=None):
+        """
+        Runs FFmpeg, passing its progress to progress_callback while its
+        stderr is printed as it arrives. Raises CalledProcessError with the
+        tail of stderr if FFmpeg fails.
+        """
+        process = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, encoding="utf-8", errors="replace"
+        )
+
+        # stderr is drained on its own thread so neither pipe can fill up and block FFmpeg
+        stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+
+        def drain_stderr():
+            for line in process.stderr:
+                line = line.rstrip()
+                if line:
+                    print(f"FFmpeg: {line}")
+                    stderr_tail.append(line)
+
+        stderr_thread = threading.Thread(target=drain_stderr, daemon=True)
+        stderr_thread.start()
+
+        start_time = time.monotonic()
+        try:
+            for block in read_progress(process.stdout):
+                if progress_callback:
+                    report = progress_report(block, total_duration, time.monotonic() - start_time)
+                    if report:
+                        progress_callback(*report)
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            returncode = process.wait()
+            stderr_thread.join()
+
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd, stderr="\n".join(stderr_tail))
+
+    def _create_metadata_file(self, chapters, output_path, timebase=1000, tags=None):
+        """
+        chapters: (title, start, end) in seconds, written in ticks of 1/timebase.
+        tags: Global tags, e.g. {"title": ..., "artist": ...}.
+        """
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(";FFMETADATA1\n")
+            for key, value in (tags or {}).items():
+                f.write(f"{key}={_escape_metadata(value)}\n")
             for title, start, end in chapters:
                 f.write("[CHAPTER]\n")
-                f.write("TIMEBASE=1/1000\n")
-                f.write(f"START={int(start * 1000)}\n")
-                f.write(f"END={int(end * 1000)}\n")
-                f.write(f"title={title}\n")
+                f.write(f"TIMEBASE=1/{timebase}\n")
+                # Rounded first so a boundary of exactly n ticks never truncates to n - 1
+                f.write(f"START={int(round(start * timebase, 6))}\n")
+                f.write(f"END={int(round(end * timebase, 6))}\n")
+                f.write(f"title={_escape_metadata(title)}\n")
 
     def add_metadata(self, file_path, title, author, cover_image_path=None):
+        """
+        Updates the tags (and optionally the cover) of an existing M4B, for
+        metadata edits after it was built. New files get their tags in the
+        FFmpeg pass instead. Only the header atoms are rewritten: FFmpeg
+        puts the moov atom after the audio, so resizing it leaves the audio
+        data where it is.
+        """
         try:
             audio = MP4(file_path)
             audio["\xa9nam"] = title
@@ -88,9 +293,164 @@ class M4BBuilder:
             
             if cover_image_path and os.path.exists(cover_image_path):
                 with open(cover_image_path, "rb") as f:
-                    audio["covr"] = [MP4Cover(f.read(), imageformat=MP4Cover.FORMAT_JPEG)]
+                    data = f.read()
+                image_format = MP4Cover.FORMAT_PNG if data.startswith(b"\x89PNG") else MP4Cover.FORMAT_JPEG
+                audio["covr"] = [MP4Cover(data, imageformat=image_format)]
             
             audio.save()
         except Exception as e:
             print(f"Failed to add metadata: {e}")
             # Don't raise, metadata is optional-ish
+
+
+class ChapterEncoder:
+    """
+    Parallel M4B assembly. Each chapter is encoded to AAC in its own FFmpeg
+    process, as soon as its audio is submitted, so encoding runs alongside
+    synthesis of the chapters after it and across all cores. finish() then
+    joins the encoded chapters into the M4B with a stream copy, without a
+    second encode. Chapter marks are set from the exact number of AAC
+    samples in each encoded chapter.
+    work_dir: Where the per-chapter AAC files are written.
+    processes: FFmpeg processes run at once (default: one per CPU).
+    """
+    def __init__(self, work_dir, ffmpeg_path="ffmpeg", processes=None):
+        self.builder = M4BBuilder(ffmpeg_path)
+        self.work_dir = work_dir
+        self.executor = ThreadPoolExecutor(max_workers=processes or os.cpu_count() or 1)
+        # (title, future) per submitted segment, in book order
+        self.segments = []
+
+        # Encode progress, reported once finish() is waiting
+        self._lock = threading.Lock()
+        self._durations = []
+        self._encoded = []
+        self._progress_callback = None
+        self._progress_start = None
+
+    def submit(self, title, audio_files, duration=None):
+        """
+        Starts encoding one chapter's audio files. A segment with no title
+        (e.g. an intro) is part of the book but gets no chapter mark.
+        duration: Length of the audio in seconds, for progress; read from
+                  the files if not given.
+        """
+        if not audio_files:
+            return
+        index = len(self.segments)
+        self._durations.append(duration or audio_duration(audio_files) or 0.0)
+        self._encoded.append(0.0)
+        self.segments.append((title, self.executor.submit(self._encode, index, list(audio_files))))
+
+    def _encode(self, index, audio_files):
+        list_file = os.path.join(self.work_dir, f"segment{index:04d}.txt")
+        output_path = os.path.join(self.work_dir, f"segment{index:04d}.aac")
+        with open(list_file, 'w', encoding='utf-8') as f:
+            for audio_file in audio_files:
+                abs_path = os.path.abspath(audio_file).replace('\\', '/')
+                f.write(f"file '{abs_path}'\n")
+
+        cmd = [
+            self.builder.ffmpeg_path,
+            "-hide_banner", "-nostats", "-loglevel", "warning",
+            "-progress", "pipe:1",
+            "-f", "concat", "-safe", "0", "-i", list_file,
+            "-c:a", "aac", "-b:a", AAC_BITRATE,
+            # Raw ADTS frames: no container to trim priming samples, so
+            # every frame counted is a frame played
+            "-f", "adts",
+            "-y", output_path
+        ]
+
+        def on_progress(percent, speed, eta_seconds):
+            self._report(index, self._durations[index] * percent / 100)
+
+        try:
+            self.builder._run_ffmpeg(cmd, self._durations[index], on_progress)
+        finally:
+            os.remove(list_file)
+        samples, sample_rate = adts_samples(output_path)
+        self._report(index, self._durations[index])
+        return output_path, samples, sample_rate
+
+    def _report(self, index, encoded):
+        with self._lock:
+            self._encoded[index] = encoded
+            if self._progress_callback is None:
+                return
+            total = sum(self._durations)
+            done = sum(self._encoded)
+            elapsed = time.monotonic() - self._progress_start[0]
+            speed = (done - self._progress_start[1]) / elapsed if elapsed > 0 else 0.0
+            eta = int((total - done) / speed) if speed > 0 else None
+            percent = min(99, int(done * 100 / total)) if total else 0
+            self._progress_callback(percent, speed, eta)
+
+    def finish(self, output_path, progress_callback=None, title=None, author=None, cover_image_path=None):
+        """
+        Waits for every chapter's encode, then joins them into output_path,
+        writing chapters, tags and cover art in the same pass.
+        progress_callback: Optional callback function(percent, speed, eta_seconds).
+        Returns the chapter marks as (title, start_time, end_time) in seconds.
+        """
+        if not self.segments:
+            raise ValueError("No audio files to combine")
+
+        with self._lock:
+            self._progress_callback = progress_callback
+            self._progress_start = (time.monotonic(), sum(self._encoded))
+
+        encoded = [(segment_title, future.result()) for segment_title, future in self.segments]
+        sample_rates = {sample_rate for _, (_, _, sample_rate) in encoded}
+        if len(sample_rates) != 1:
+            raise ValueError(f"Chapters were encoded at different sample rates: {sorted(sample_rates)}")
+        sample_rate = sample_rates.pop()
+
+        list_file = os.path.join(self.work_dir, "chapters.txt")
+        metadata_file = output_path + ".metadata.txt"
+        chapters = []
+        position = 0
+        with open(list_file, 'w', encoding='utf-8') as f:
+            for segment_title, (path, samples, _) in encoded:
+                abs_path = os.path.abspath(path).replace('\\', '/')
+                # Exact durations, so FFmpeg doesn't estimate them from the bitrate
+                f.write(f"file '{abs_path}'\nduration {samples / sample_rate}\n")
+                if segment_title is not None:
+                    chapters.append((segment_title, position / sample_rate, (position + samples) / sample_rate))
+                position += samples
+        self.builder._create_metadata_file(chapters, metadata_file, timebase=sample_rate, tags=mp4_tags(title, author))
+        cover_inputs, cover_outputs = _cover_args(cover_image_path, 2)
+
+        cmd = [
+            self.builder.ffmpeg_path,
+            "-hide_banner", "-nostats", "-loglevel", "error",
+            "-progress", "pipe:1",
+            "-f", "concat", "-safe", "0", "-i", list_file,
+            "-i", metadata_file
+        ]
+        cmd.extend(cover_inputs)
+        cmd.extend(["-map_metadata", "1"])
+        cmd.extend(cover_outputs or ["-map", "0:a"])
+        cmd.extend([
+            "-c", "copy", "-bsf:a", "aac_adtstoasc",
+            "-f", "mp4",
+            "-y", output_path
+        ])
+        try:
+            self.builder._run_ffmpeg(cmd)
+        except subprocess.CalledProcessError as e:
+            print(f"FFmpeg failed: {e.stderr}")
+            raise e
+        finally:
+            for path in [list_file, metadata_file] + [path for _, (path, _, _) in encoded]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        if progress_callback:
+            elapsed = time.monotonic() - self._progress_start[0]
+            progress_callback(100, position / sample_rate / elapsed if elapsed > 0 else 0.0, 0)
+        return chapters
+
+    def close(self):
+        """Drops encodes that haven't started and waits for running ones."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
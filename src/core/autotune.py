@@ -0,0 +1,126 @@
+"""
+Hardware autotuner.
+Sweeps intra-op threads, inference sessions and segment length over a
+built-in text sample on the current machine, measuring real-time factor
+(processing time / audio duration, lower is better) and memory.
+"""
+
+import os
+import time
+
+import torch
+
+from src.core.cleaner import clean_text, segment_text
+from src.core.synthesizer import AudioSynthesizer
+from src.core.session_pool import InferenceSessionPool
+from src.utils.config import AUTOTUNE_SAMPLE_TEXT
+
+MAX_CHARS_OPTIONS = (150, 250, 400)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+    psutil = None
+
+
+def current_rss_mb():
+    """Resident memory of this process in MB, or None if unavailable."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def candidate_configs(cpu_count):
+    """
+    Returns (sessions, threads_per_session) pairs to try: one session with
+    a growing thread count, then the CPUs split across more sessions.
+    """
+    configs = []
+    threads = 1
+    while threads < cpu_count:
+        configs.append((1, threads))
+        threads *= 2
+    configs.append((1, cpu_count))
+
+    sessions = 2
+    while sessions <= cpu_count:
+        configs.append((sessions, cpu_count // sessions))
+        sessions *= 2
+    return configs
+
+
+def run_autotune(voice='af_sarah', configs=None, max_chars_options=MAX_CHARS_OPTIONS, log=print):
+    """
+    Runs the sweep and returns (best_profile, results).
+    results is a list of dicts with sessions, threads, max_chars, rtf and rss_mb.
+    """
+    synthesizer = AudioSynthesizer()
+    if configs is None:
+        configs = candidate_configs(os.cpu_count() or 1)
+
+    text = clean_text(AUTOTUNE_SAMPLE_TEXT)
+
+    # Warm up so model loading and first-call overhead aren't measured
+    for _ in synthesizer.synthesize_segments(segment_text(text)[:1], voice_name=voice):
+        pass
+
+    results = []
+    for sessions, threads in configs:
+        if sessions == 1:
+            torch.set_num_threads(threads)
+            engine = synthesizer
+        else:
+            engine = InferenceSessionPool(synthesizer, sessions=sessions, threads_per_session=threads)
+
+        try:
+            for max_chars in max_chars_options:
+                segments = segment_text(text, max_chars=max_chars)
+
+                start = time.perf_counter()
+                audio_seconds = 0.0
+                for audio, sample_rate in engine.synthesize_segments(segments, voice_name=voice):
+                    audio_seconds += len(audio) / sample_rate
+                elapsed = time.perf_counter() - start
+
+                if audio_seconds <= 0:
+                    log(f"  sessions={sessions} threads={threads} max_chars={max_chars}: no audio produced")
+                    continue
+
+                result = {
+                    "sessions": sessions,
+                    "threads": threads,
+                    "max_chars": max_chars,
+                    "rtf": elapsed / audio_seconds,
+                    "rss_mb": current_rss_mb(),
+                }
+                results.append(result)
+
+                rss = f"{result['rss_mb']:.0f} MB" if result['rss_mb'] is not None else "n/a"
+                log(f"  sessions={sessions} threads={threads} max_chars={max_chars}: "
+                    f"RTF {result['rtf']:.3f}, RSS {rss}")
+        finally:
+            if engine is not synthesizer:
+                engine.close()
+
+    if not results:
+        raise RuntimeError("Autotune produced no measurements")
+
+    # Fastest wins; memory breaks ties
+    best = min(results, key=lambda r: (round(r["rtf"], 3), r["rss_mb"] or 0))
+    profile = {
+        "threads": best["threads"],
+        "sessions": best["sessions"],
+        "max_chars": best["max_chars"],
+        "rtf": best["rtf"],
+        "rss_mb": best["rss_mb"],
+        "device": synthesizer.device,
+        "tuned_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return profile, results
@@ -0,0 +1,125 @@
+"""
+In-process M4B assembly on PyAV (the libav bindings).
+Audio goes from NumPy buffers straight into libav's AAC encoder and MP4
+muxer inside this process, while the book is synthesized: no FFmpeg
+binary, no WAV files and no concat list on disk. Chapters, tags and cover
+art end up in the file just as audio_builder writes them.
+PyAV is optional; AV_AVAILABLE says whether this backend can be used.
+"""
+
+import os
+from fractions import Fraction
+
+import numpy as np
+
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+from src.core.audio_builder import AAC_BITRATE, mp4_tags
+
+
+def _bit_rate(bitrate):
+    """"64k" -> 64000"""
+    bitrate = str(bitrate)
+    return int(float(bitrate[:-1]) * 1000) if bitrate[-1:].lower() == "k" else int(bitrate)
+
+
+class AvM4BWriter:
+    """
+    Encodes mono PCM to AAC and muxes it into an M4B as it is written.
+    Audio written before the first start_chapter() (e.g. an intro) is part
+    of the book but of no chapter (players show it as part of the first, as
+    with ChapterEncoder). The encoder's priming samples are
+    trimmed by the MP4 edit list, so chapter marks are exact sample
+    positions of the PCM written.
+    """
+    def __init__(self, output_path, sample_rate, title=None, author=None, cover_image_path=None,
+                 bitrate=AAC_BITRATE):
+        if not AV_AVAILABLE:
+            raise RuntimeError("PyAV is not installed (pip install av)")
+
+        self.output_path = output_path
+        self.sample_rate = sample_rate
+        self.container = av.open(output_path, mode="w", format="mp4")
+        for key, value in mp4_tags(title, author).items():
+            self.container.metadata[key] = value
+
+        self.stream = self.container.add_stream("aac", rate=sample_rate, layout="mono")
+        self.stream.bit_rate = _bit_rate(bitrate)
+        self._add_cover(cover_image_path)
+
+        # Samples written so far, and (title, start sample) per chapter
+        self.position = 0
+        self.marks = []
+
+    def _add_cover(self, cover_image_path):
+        """Muxes the cover image as an attached picture (the MP4 covr atom)."""
+        if not cover_image_path or not os.path.exists(cover_image_path):
+            return
+        try:
+            with av.open(cover_image_path) as image:
+                template = image.streams.video[0]
+                cover = self.container.add_stream_from_template(template)
+                cover.disposition = av.stream.Disposition.attached_pic
+                packet = next(image.demux(template))
+                packet.stream = cover
+                self.container.mux(packet)
+        except (av.FFmpegError, IndexError, StopIteration) as e:
+            print(f"Failed to add cover art: {e}")
+
+    @property
+    def duration(self):
+        """Seconds of audio written so far."""
+        return self.position / self.sample_rate
+
+    def start_chapter(self, title):
+        """Starts a chapter at the current position; it runs to the next one."""
+        self.marks.append((title, self.position))
+
+    def write(self, audio, sample_rate=None):
+        """Encodes a buffer of mono samples (floats in -1..1)."""
+        if sample_rate is not None and sample_rate != self.sample_rate:
+            raise ValueError(f"Audio at {sample_rate} Hz written to a {self.sample_rate} Hz book")
+        samples = np.ascontiguousarray(audio, dtype=np.float32).reshape(1, -1)
+        if samples.shape[1] == 0:
+            return
+
+        frame = av.AudioFrame.from_ndarray(samples, format="flt", layout="mono")
+        frame.sample_rate = self.sample_rate
+        frame.pts = self.position
+        frame.time_base = Fraction(1, self.sample_rate)
+        for packet in self.stream.encode(frame):
+            self.container.mux(packet)
+        self.position += samples.shape[1]
+
+    def chapters(self):
+        """(title, start_time, end_time) in seconds for each chapter so far."""
+        ends = [start for _, start in self.marks[1:]] + [self.position]
+        return [(title, start / self.sample_rate, end / self.sample_rate)
+                for (title, start), end in zip(self.marks, ends)]
+
+    def close(self):
+        """Flushes the encoder and writes the chapters and index. Returns chapters()."""
+        if self.container is None:
+            return self.chapters()
+        for packet in self.stream.encode(None):
+            self.container.mux(packet)
+
+        time_base = Fraction(1, self.sample_rate)
+        ends = [start for _, start in self.marks[1:]] + [self.position]
+        self.container.set_chapters([
+            {"id": i + 1, "start": start, "end": end, "time_base": time_base, "metadata": {"title": title}}
+            for i, ((title, start), end) in enumerate(zip(self.marks, ends))
+        ])
+        self.container.close()
+        self.container = None
+        return self.chapters()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,224 +1,427 @@
-import pysbd
 import re
+from functools import lru_cache
 from num2words import num2words
 
-def clean_text(text):
-    """
-    Normalizes punctuation, removes artifacts, and prepares text for TTS.
+from src.core.segmenter import segment_sentences
+
+# Text normalization engine for TTS.
+#
+# Every rule's regex is compiled once at import time, and related rules are
+# merged into a single pattern with a dispatch table (abbreviations,
+# transition words, pause punctuation) so a chapter is scanned a handful of
+# times instead of ~80. Rules still run in the same order as the original
+# one-re.sub-per-rule implementation and produce byte-identical output
+# (see tests/test_cleaner.py).
+
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June",
+               "July", "August", "September", "October", "November", "December"]
+
+# Pattern: Month DD, YYYY or Month DD
+_MONTH_DATE_RE = re.compile(rf'({"|".join(MONTH_NAMES)})\s+(\d{{1,2}}),?\s*(\d{{4}})?')
+# Numeric dates like 12/25/2024
+_NUMERIC_DATE_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+
+# Common abbreviations expanded for natural reading.
+# Order matters: it is the order the rules were historically applied in.
+ABBREVIATIONS = {
+    'Dr.': 'Doctor',
+    'Mr.': 'Mister',
+    'Mrs.': 'Missus',
+    'Ms.': 'Miss',
+    'Prof.': 'Professor',
+    'Gen.': 'General',
+    'Sgt.': 'Sergeant',
+    'Lt.': 'Lieutenant',
+    'Col.': 'Colonel',
+    'Cpt.': 'Captain',
+    'St.': 'Saint',
+    'vs.': 'versus',
+    'etc.': 'etcetera',
+    'e.g.': 'for example',
+    'i.e.': 'that is',
+    'no.': 'number',
+    'No.': 'Number',
+    'vol.': 'volume',
+    'Vol.': 'Volume',
+    'p.': 'page',
+    'pp.': 'pages',
+}
+_ABBREVIATION_ALTERNATION = '|'.join(re.escape(abbr) for abbr in ABBREVIATIONS)
+# Zero-width scan so overlapping candidates (e.g. "i.e.g.") are all seen
+_ABBREVIATION_SCAN_RE = re.compile(rf'(?=\b({_ABBREVIATION_ALTERNATION}))')
+# One pattern per rule, only used when candidates touch (see _expand_abbreviations)
+_ABBREVIATION_RULES = [(re.compile(r'\b' + re.escape(abbr)), expansion)
+                       for abbr, expansion in ABBREVIATIONS.items()]
+
+# Words that benefit from a brief pause after them for emphasis
+TRANSITION_WORDS = [
+    'However', 'Therefore', 'Meanwhile', 'Suddenly',
+    'Finally', 'Unfortunately', 'Fortunately', 'Moreover',
+    'Nevertheless', 'Consequently', 'Furthermore', 'Indeed',
+    'Still', 'Thus', 'Hence', 'Otherwise',
+]
+_TRANSITION_RE = re.compile(
+    r'\b(' + '|'.join(TRANSITION_WORDS + [w.lower() for w in TRANSITION_WORDS]) + r')\b(?![,\.!?;:])'
+)
+
+_CURRENCY_RE = re.compile(r'([$£€])(\d+)(?:\.(\d{2}))?')
+_LARGE_NUMBER_RE = re.compile(r'\b\d{1,3}(?:,\d{3})+\b')
+_PERCENT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+
+# Footnote patterns, applied in order
+_FOOTNOTE_BRACKET_RE = re.compile(r'\[\d+\]')           # [1], [12], [123]
+_FOOTNOTE_PAREN_RE = re.compile(r'\(\d+\)')             # (1), (12)
+_FOOTNOTE_INLINE_RE = re.compile(r'\s+\d{1,3}(?=\s+[A-Z])')  # ". 8 It" or ", 9 A"
+_FOOTNOTE_END_RE = re.compile(r'\s+\d{1,3}\s*$')        # Standalone number at end of text
+_FOOTNOTE_SUPERSCRIPT_RE = re.compile(r'(?<=[a-zA-Z"\'])\d{1,3}(?=[\s.,;:!?]|$)')  # "word1"
+
+# Em/en dashes and colons become comma pauses, semicolons sentence pauses
+_PAUSE_REPLACEMENTS = [('—', ','), ('–', ','), (':', ','), (';', '.')]
+
+# Repeated decorative punctuation: (guard substring, pattern, replacement)
+_REPEATED_PUNCTUATION = [
+    ('..', re.compile(r'\.{2,}'), '.'),  # Multiple periods → single period
+    ('--', re.compile(r'-{2,}'), ''),    # Multiple hyphens → remove
+    ('__', re.compile(r'_{2,}'), ''),    # Multiple underscores → remove
+    ('**', re.compile(r'\*{2,}'), ''),   # Multiple asterisks → remove
+    ('##', re.compile(r'#{2,}'), ''),    # Multiple hashes → remove
+    ('~~', re.compile(r'~{2,}'), ''),    # Multiple tildes → remove
+    ('==', re.compile(r'={2,}'), ''),    # Multiple equals → remove
+]
+
+# Allowed: letters (including Unicode/accented), digits, spaces, . , ? ! - ' "
+# Use explicit character class instead of \w to preserve Unicode letters
+_DISALLOWED_RE = re.compile(r"[^\w\s.,?!'\"À-ɏ()-]", flags=re.UNICODE)
+_SPACED_HYPHEN_RE = re.compile(r'\s+-\s+')
+_ORPHAN_QUOTE_RE = re.compile(r'(?<!\w)["\'](?!\w)')
+_WHITESPACE_RE = re.compile(r'\s+')
+_MULTI_PUNCT_RE = re.compile(r'[.,]{2,}')
+_SPACE_BEFORE_PUNCT_RE = re.compile(r'\s+([.,?!])')
+
+
+@lru_cache(maxsize=4096)
+def _num2words(number):
+    return num2words(number)
+
+
+def _ordinal_suffix(day):
+    if 11 <= day <= 13:
+        return "th"
+    elif day % 10 == 1:
+        return "st"
+    elif day % 10 == 2:
+        return "nd"
+    elif day % 10 == 3:
+        return "rd"
+    return "th"
+
+
+def _add_ordinal(match):
+    # Convert "June 21, 2015" to "June 21st 2015"
+    month = match.group(1)
+    day = int(match.group(2))
+    year = match.group(3)
     
-    Allowed punctuation: . , ? ! : ; -
-    Pause groupings:
-      - Sentence pause (. ? ! ; -): treated as sentence breaks
-      - Comma pause (, :): treated as phrase pauses
-    """
-    # Normalize smart quotes to standard quotes
-    text = text.replace('"', '"').replace('"', '"').replace(''', "'").replace(''', "'")
+    # Remove comma before year for more natural reading
+    if year:
+        return f"{month} {day}{_ordinal_suffix(day)} {year}"
+    return f"{month} {day}{_ordinal_suffix(day)}"
+
+
+def _convert_numeric_date(match):
+    # 12/25/2024 → December 25th 2024
+    month_num = int(match.group(1))
+    day = int(match.group(2))
     
-    # Normalize dates for better TTS reading
-    # Convert "June 21, 2015" to "June 21st, 2015" 
-    # Day ordinals: 1st, 2nd, 3rd, 4th-20th, 21st, 22nd, 23rd, 24th-30th, 31st
-    def add_ordinal(match):
-        day = int(match.group(2))
-        month = match.group(1)
-        year = match.group(3) if match.group(3) else ""
-        
-        if 11 <= day <= 13:
-            suffix = "th"
-        elif day % 10 == 1:
-            suffix = "st"
-        elif day % 10 == 2:
-            suffix = "nd"
-        elif day % 10 == 3:
-            suffix = "rd"
-        else:
-            suffix = "th"
-        
-        # Remove comma before year for more natural reading
-        if year:
-            return f"{month} {day}{suffix} {year}"
-        return f"{month} {day}{suffix}"
+    if 1 <= month_num <= 12:
+        return f"{MONTH_NAMES[month_num - 1]} {day}{_ordinal_suffix(day)} {match.group(3)}"
+    return match.group(0)
+
+
+def _currency_to_words(match):
+    # $5.99 → five dollars and ninety-nine cents
+    symbol = match.group(1)
+    dollars = int(match.group(2))
+    cents = int(match.group(3)) if match.group(3) else 0
     
-    # Pattern: Month DD, YYYY or Month DD
-    months = r"(January|February|March|April|May|June|July|August|September|October|November|December)"
-    text = re.sub(rf'{months}\s+(\d{{1,2}}),?\s*(\d{{4}})?', add_ordinal, text)
+    currency_name = "dollars" if symbol == "$" else "pounds" if symbol == "£" else "euros"
     
-    # Also handle numeric dates like 12/25/2024 → December 25th 2024
-    month_names = ["January", "February", "March", "April", "May", "June", 
-                   "July", "August", "September", "October", "November", "December"]
-    def convert_numeric_date(match):
-        month_num = int(match.group(1))
-        day = int(match.group(2))
-        year = match.group(3)
-        
-        if 1 <= month_num <= 12:
-            month = month_names[month_num - 1]
-            if 11 <= day <= 13:
-                suffix = "th"
-            elif day % 10 == 1:
-                suffix = "st"
-            elif day % 10 == 2:
-                suffix = "nd"
-            elif day % 10 == 3:
-                suffix = "rd"
-            else:
-                suffix = "th"
-            return f"{month} {day}{suffix} {year}"
+    try:
+        if cents > 0:
+            return f"{_num2words(dollars)} {currency_name} and {_num2words(cents)} cents"
+        return f"{_num2words(dollars)} {currency_name}"
+    except Exception:
         return match.group(0)
+
+
+def _large_number_to_words(match):
+    # 1,234,567 → one million two hundred...
+    try:
+        return _num2words(int(match.group(0).replace(',', '')))
+    except Exception:
+        return match.group(0)
+
+
+def _percent_to_words(match):
+    # 75% → seventy-five percent
+    num = match.group(1)
+    try:
+        if '.' in num:
+            return f"{_num2words(float(num))} percent"
+        return f"{_num2words(int(num))} percent"
+    except Exception:
+        return match.group(0)
+
+
+# Each rule takes the text and returns (text, matches), where matches is the
+# number of replacements made, or None where that isn't counted. Rules are
+# listed in CLEANING_RULES in the order they run.
+
+def _normalize_quotes(text):
+    # Normalize smart quotes to standard quotes
+    text = text.replace('"', '"').replace('"', '"').replace(''', "'").replace(''', "'")
+    return text, None
+
+
+def _normalize_month_dates(text):
+    return _MONTH_DATE_RE.subn(_add_ordinal, text)
+
+
+def _normalize_numeric_dates(text):
+    if '/' not in text:
+        return text, 0
+    return _NUMERIC_DATE_RE.subn(_convert_numeric_date, text)
+
+
+def _expand_abbreviations(text):
+    """
+    Expands every abbreviation in one scan. Expansions end in a letter, so
+    rewriting one abbreviation can only affect another that touches it
+    (it removes the word boundary in front of it). In that rare case the
+    rules are applied one by one, in order, to stay exact.
+    """
+    spans = [(m.start(), m.group(1)) for m in _ABBREVIATION_SCAN_RE.finditer(text)]
+    if not spans:
+        return text, 0
     
-    text = re.sub(r'(\d{1,2})/(\d{1,2})/(\d{4})', convert_numeric_date, text)
-    
-    # Expand common abbreviations for natural reading
-    abbreviations = {
-        r'\bDr\.': 'Doctor',
-        r'\bMr\.': 'Mister',
-        r'\bMrs\.': 'Missus',
-        r'\bMs\.': 'Miss',
-        r'\bProf\.': 'Professor',
-        r'\bGen\.': 'General',
-        r'\bSgt\.': 'Sergeant',
-        r'\bLt\.': 'Lieutenant',
-        r'\bCol\.': 'Colonel',
-        r'\bCpt\.': 'Captain',
-        r'\bSt\.': 'Saint',
-        r'\bvs\.': 'versus',
-        r'\betc\.': 'etcetera',
-        r'\be\.g\.': 'for example',
-        r'\bi\.e\.': 'that is',
-        r'\bno\.': 'number',
-        r'\bNo\.': 'Number',
-        r'\bvol\.': 'volume',
-        r'\bVol\.': 'Volume',
-        r'\bp\.': 'page',
-        r'\bpp\.': 'pages',
-    }
-    for abbr, expansion in abbreviations.items():
-        text = re.sub(abbr, expansion, text)
-    
-    # Expand currency amounts (e.g., $5.99 → five dollars and ninety-nine cents)
-    def expand_currency(match):
-        symbol = match.group(1)
-        dollars = int(match.group(2))
-        cents = int(match.group(3)) if match.group(3) else 0
-        
-        currency_name = "dollars" if symbol == "$" else "pounds" if symbol == "£" else "euros"
-        
-        try:
-            if cents > 0:
-                return f"{num2words(dollars)} {currency_name} and {num2words(cents)} cents"
-            else:
-                return f"{num2words(dollars)} {currency_name}"
-        except:
-            return match.group(0)
-    
-    text = re.sub(r'([$£€])(\d+)(?:\.(\d{2}))?', expand_currency, text)
-    
-    # Expand large numbers with commas (e.g., 1,234,567 → one million two hundred...)
-    def expand_large_number(match):
-        num_str = match.group(0).replace(',', '')
-        try:
-            return num2words(int(num_str))
-        except:
-            return match.group(0)
-    
-    text = re.sub(r'\b\d{1,3}(?:,\d{3})+\b', expand_large_number, text)
+    for (start, abbr), (next_start, _) in zip(spans, spans[1:]):
+        if next_start <= start + len(abbr):
+            matches = 0
+            for pattern, expansion in _ABBREVIATION_RULES:
+                text, count = pattern.subn(expansion, text)
+                matches += count
+            return text, matches
     
-    # Expand standalone years in context (e.g., "in 1984" stays as is, but "between 1984 and 1990")
+    pieces = []
+    last = 0
+    for start, abbr in spans:
+        pieces.append(text[last:start])
+        pieces.append(ABBREVIATIONS[abbr])
+        last = start + len(abbr)
+    pieces.append(text[last:])
+    return ''.join(pieces), len(spans)
+
+
+def _expand_currency(text):
+    if '$' not in text and '£' not in text and '€' not in text:
+        return text, 0
+    return _CURRENCY_RE.subn(_currency_to_words, text)
+
+
+def _expand_large_numbers(text):
+    if ',' not in text:
+        return text, 0
+    return _LARGE_NUMBER_RE.subn(_large_number_to_words, text)
+
+
+def _expand_percentages(text):
     # Keep 4-digit years as-is since TTS handles them well
-    
-    # Expand percentages (e.g., 75% → seventy-five percent)
-    def expand_percent(match):
-        num = match.group(1)
-        try:
-            if '.' in num:
-                return f"{num2words(float(num))} percent"
-            else:
-                return f"{num2words(int(num))} percent"
-        except:
-            return match.group(0)
-    
-    text = re.sub(r'(\d+(?:\.\d+)?)\s*%', expand_percent, text)
-    
-    # Add strategic pauses after transition words for better TTS prosody
-    # These words benefit from a brief pause after them for emphasis
-    transition_words = [
-        r'\bHowever\b', r'\bTherefore\b', r'\bMeanwhile\b', r'\bSuddenly\b',
-        r'\bFinally\b', r'\bUnfortunately\b', r'\bFortunately\b', r'\bMoreover\b',
-        r'\bNevertheless\b', r'\bConsequently\b', r'\bFurthermore\b', r'\bIndeed\b',
-        r'\bStill\b', r'\bThus\b', r'\bHence\b', r'\bOtherwise\b',
-        r'\bhowever\b', r'\btherefore\b', r'\bmeanwhile\b', r'\bsuddenly\b',
-        r'\bfinally\b', r'\bunfortunately\b', r'\bfortunately\b', r'\bmoreover\b',
-        r'\bnevertheless\b', r'\bconsequently\b', r'\bfurthermore\b', r'\bindeed\b',
-        r'\bstill\b', r'\bthus\b', r'\bhence\b', r'\botherwise\b',
-    ]
-    for word in transition_words:
-        # Add comma after transition word if not already followed by punctuation
-        text = re.sub(rf'({word})(?![,\.!?;:])', r'\1,', text)
-    
-    # Remove footnote patterns
-    # Pattern 1: Bracketed numbers like [1], [12], [123]
-    text = re.sub(r'\[\d+\]', '', text)
-    # Pattern 2: Numbers in parentheses like (1), (12)
-    text = re.sub(r'\(\d+\)', '', text)
-    # Pattern 3: Inline footnotes after punctuation (e.g., ". 8 It" or ", 9 A")
-    # Match space + 1-3 digit number + space before next capital letter
-    text = re.sub(r'\s+\d{1,3}(?=\s+[A-Z])', '', text)
-    # Pattern 4: Standalone footnote numbers at end of text
-    text = re.sub(r'\s+\d{1,3}\s*$', '', text)
-    # Pattern 5: Superscript-style numbers immediately after words (e.g., "word1")
-    text = re.sub(r'(?<=[a-zA-Z"\'])\d{1,3}(?=[\s.,;:!?]|$)', '', text)
-    
-    # Normalize em dashes, en dashes to comma (phrase pause)
-    text = text.replace('—', ',')  # Em dash → comma pause
-    text = text.replace('–', ',')  # En dash → comma pause
-    
-    # Normalize colons to commas (same pause group)
-    text = text.replace(':', ',')
-    
-    # Normalize semicolons to periods (sentence pause)
-    text = text.replace(';', '.')
-    
+    if '%' not in text:
+        return text, 0
+    return _PERCENT_RE.subn(_percent_to_words, text)
+
+
+def _add_transition_pauses(text):
+    # Add comma after transition word if not already followed by punctuation
+    return _TRANSITION_RE.subn(r'\1,', text)
+
+
+def _remove_footnotes(text):
+    matches = 0
+    if '[' in text:
+        text, count = _FOOTNOTE_BRACKET_RE.subn('', text)
+        matches += count
+    if '(' in text:
+        text, count = _FOOTNOTE_PAREN_RE.subn('', text)
+        matches += count
+    for pattern in (_FOOTNOTE_INLINE_RE, _FOOTNOTE_END_RE, _FOOTNOTE_SUPERSCRIPT_RE):
+        text, count = pattern.subn('', text)
+        matches += count
+    return text, matches
+
+
+def _replace_pause_punctuation(text):
+    # str.replace is a plain substring scan, much cheaper than a regex pass
+    matches = 0
+    for old, new in _PAUSE_REPLACEMENTS:
+        count = text.count(old)
+        if count:
+            text = text.replace(old, new)
+            matches += count
+    return text, matches
+
+
+def _remove_repeated_punctuation(text):
     # Remove decorative/non-standard punctuation
-    # Remove repeated punctuation (e.g., "...", "---", "***")
-    text = re.sub(r'\.{2,}', '.', text)  # Multiple periods → single period
-    text = re.sub(r'-{2,}', '', text)    # Multiple hyphens → remove
-    text = re.sub(r'_{2,}', '', text)    # Multiple underscores → remove
-    text = re.sub(r'\*{2,}', '', text)   # Multiple asterisks → remove
-    text = re.sub(r'#{2,}', '', text)    # Multiple hashes → remove
-    text = re.sub(r'~{2,}', '', text)    # Multiple tildes → remove
-    text = re.sub(r'={2,}', '', text)    # Multiple equals → remove
-    
+    matches = 0
+    for guard, pattern, replacement in _REPEATED_PUNCTUATION:
+        if guard in text:
+            text, count = pattern.subn(replacement, text)
+            matches += count
+    return text, matches
+
+
+def _remove_disallowed_characters(text):
     # Remove remaining non-allowed punctuation (keep only . , ? ! - and alphanumerics/spaces)
-    # Allowed: letters (including Unicode/accented), digits, spaces, . , ? ! - ' "
-    # Use explicit character class instead of \w to preserve Unicode letters
-    text = re.sub(r"[^\w\s.,?!'\"\u00C0-\u024F()-]", '', text, flags=re.UNICODE)
-    
+    return _DISALLOWED_RE.subn('', text)
+
+
+def _replace_spaced_hyphens(text):
     # Clean up hyphen usage: hyphen with space on either side becomes period
-    text = re.sub(r'\s+-\s+', '. ', text)
-    
-    # Remove orphaned quotes
-    text = re.sub(r'(?<!\w)"(?!\w)', '', text)
-    text = re.sub(r"(?<!\w)'(?!\w)", '', text)
-    
-    # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    
+    if '-' not in text:
+        return text, 0
+    return _SPACED_HYPHEN_RE.subn('. ', text)
+
+
+def _remove_orphan_quotes(text):
+    return _ORPHAN_QUOTE_RE.subn('', text)
+
+
+def _collapse_whitespace(text):
+    text, matches = _WHITESPACE_RE.subn(' ', text)
+    return text.strip(), matches
+
+
+def _collapse_punctuation_runs(text):
     # Clean up multiple consecutive punctuation after processing
-    text = re.sub(r'[.,]{2,}', '.', text)  # Multiple comma/period → period
-    text = re.sub(r'\s+([.,?!])', r'\1', text)  # Remove space before punctuation
+    return _MULTI_PUNCT_RE.subn('.', text)  # Multiple comma/period → period
+
+
+def _remove_space_before_punctuation(text):
+    return _SPACE_BEFORE_PUNCT_RE.subn(r'\1', text)
+
+
+# The normalization pipeline, in order
+CLEANING_RULES = [
+    ("quotes", _normalize_quotes),
+    ("month_dates", _normalize_month_dates),
+    ("numeric_dates", _normalize_numeric_dates),
+    ("abbreviations", _expand_abbreviations),
+    ("currency", _expand_currency),
+    ("large_numbers", _expand_large_numbers),
+    ("percentages", _expand_percentages),
+    ("transition_words", _add_transition_pauses),
+    ("footnotes", _remove_footnotes),
+    ("pause_punctuation", _replace_pause_punctuation),
+    ("repeated_punctuation", _remove_repeated_punctuation),
+    ("disallowed_characters", _remove_disallowed_characters),
+    ("spaced_hyphens", _replace_spaced_hyphens),
+    ("orphan_quotes", _remove_orphan_quotes),
+    ("whitespace", _collapse_whitespace),
+    ("punctuation_runs", _collapse_punctuation_runs),
+    ("space_before_punctuation", _remove_space_before_punctuation),
+]
+
+
+def clean_text(text):
+    """
+    Normalizes punctuation, removes artifacts, and prepares text for TTS.
     
+    Allowed punctuation: . , ? ! : ; -
+    Pause groupings:
+      - Sentence pause (. ? ! ; -): treated as sentence breaks
+      - Comma pause (, :): treated as phrase pauses
+    """
+    for _, rule in CLEANING_RULES:
+        text, _ = rule(text)
     return text
 
-def segment_text(text, language='en', max_chars=400):
+
+# Characters a chunk may end on. A whitespace run between one of these and a
+# letter can't be crossed by any cleaning rule (the date, percent and footnote
+# patterns that span whitespace all need a digit or symbol next to it).
+_SAFE_CHUNK_END = '.!?"\''
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _find_safe_split(text, lo=0, separator='\n'):
+    """
+    Returns (start, end) of the last whitespace run containing separator in
+    text[lo:] that is safe to clean on either side independently, or None.
     """
-    Segments text into sentences using pysbd, then ensures no segment exceeds max_chars.
+    hi = len(text)
+    while True:
+        position = text.rfind(separator, lo, hi)
+        if position == -1:
+            return None
+        start = position
+        while start > 0 and text[start - 1].isspace():
+            start -= 1
+        end = position + 1
+        while end < len(text) and text[end].isspace():
+            end += 1
+        hi = start
+        if start == 0 or end == len(text):
+            continue
+        prev_char = text[start - 1]
+        if (prev_char.isalpha() or prev_char in _SAFE_CHUNK_END) and text[end].isalpha():
+            return start, end
+
+
+def clean_text_stream(source, chunk_size=STREAM_CHUNK_SIZE):
     """
-    seg = pysbd.Segmenter(language=language, clean=False)
-    initial_segments = seg.segment(text)
+    Cleans text in paragraph-aligned chunks of roughly chunk_size characters,
+    yielding cleaned chunks. source can be a string or an iterable of strings
+    (e.g. PDF pages). ' '.join() of the output equals clean_text() of the
+    whole text, but only one chunk is held in memory at a time.
+    """
+    if isinstance(source, str):
+        pieces = (source[i:i + chunk_size] for i in range(0, len(source), chunk_size))
+    else:
+        pieces = source
+    
+    buffer = ""
+    scan_from = 0
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) < chunk_size:
+            continue
+        
+        # Prefer paragraph breaks; EPUB text has none, so fall back to spaces
+        split = _find_safe_split(buffer, scan_from) or _find_safe_split(buffer, scan_from, ' ')
+        if split is None:
+            # Keep reading; only rescan from the trailing whitespace onwards
+            scan_from = len(buffer.rstrip())
+            continue
+        
+        start, end = split
+        cleaned = clean_text(buffer[:start])
+        buffer = buffer[end:]
+        scan_from = 0
+        if cleaned:
+            yield cleaned
     
-    final_segments = []
-    for segment in initial_segments:
+    cleaned = clean_text(buffer)
+    if cleaned:
+        yield cleaned
+
+
+def _limit_length(segments, max_chars):
+    # Split segments longer than max_chars at word boundaries
+    for segment in segments:
         if len(segment) <= max_chars:
-            final_segments.append(segment)
+            yield segment
         else:
             # Split long segments
             current_chunk = ""
@@ -229,10 +432,37 @@ def segment_text(text, language='en', max_chars=400):
                     current_chunk += (word + " ")
                 else:
                     if current_chunk:
-                        final_segments.append(current_chunk.strip())
+                        yield current_chunk.strip()
                     current_chunk = word + " "
             
             if current_chunk:
-                final_segments.append(current_chunk.strip())
-                
-    return final_segments
+                yield current_chunk.strip()
+
+
+def segment_text(text, language='en', max_chars=400):
+    """
+    Segments text into sentences, then ensures no segment exceeds max_chars.
+    """
+    return list(_limit_length(segment_sentences(text, language), max_chars))
+
+
+def segment_text_stream(chunks, language='en', max_chars=400):
+    """
+    Segments cleaned chunks (e.g. from clean_text_stream) as they arrive.
+    The last sentence of each chunk is held back and re-segmented with the
+    next chunk, since it may continue past the chunk boundary.
+    """
+    carry = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        text = f"{carry} {chunk}" if carry else chunk
+        sentences = segment_sentences(text, language)
+        if not sentences:
+            carry = ""
+            continue
+        carry = sentences.pop().strip()
+        yield from _limit_length(sentences, max_chars)
+    
+    if carry:
+        yield from _limit_length([carry], max_chars)
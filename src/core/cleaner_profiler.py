@@ -0,0 +1,105 @@
+"""
+Per-rule profiler for the text normalization pipeline.
+Runs the same rules as clean_text() but records, for each rule, the time
+spent, the replacements made and the net change in UTF-8 size it made to
+each text (a rule that swaps equal-sized strings shows none), accumulated
+across every text it is given (e.g. all chapters of a book).
+"""
+
+import json
+import time
+
+from src.core.cleaner import CLEANING_RULES
+
+
+class CleanerProfiler:
+    """
+    Accumulates per-rule statistics over many clean() calls.
+    report() and to_dict() list rules slowest first.
+    """
+    def __init__(self):
+        self.texts = 0
+        self.bytes_in = 0
+        self.stats = {
+            name: {
+                "seconds": 0.0,
+                "calls": 0,
+                "matches": 0,
+                "net_bytes_added": 0,
+                "net_bytes_removed": 0,
+                "slowest_seconds": 0.0,
+                "slowest_label": None,
+            }
+            for name, _ in CLEANING_RULES
+        }
+
+    def clean(self, text, label=None):
+        """
+        Cleans text exactly like clean_text(), recording statistics.
+        label: Name for this input (e.g. chapter title) to report the
+               slowest input per rule.
+        """
+        size = len(text.encode('utf-8'))
+        self.texts += 1
+        self.bytes_in += size
+
+        for name, rule in CLEANING_RULES:
+            start = time.perf_counter()
+            text, matches = rule(text)
+            elapsed = time.perf_counter() - start
+
+            new_size = len(text.encode('utf-8'))
+            stats = self.stats[name]
+            stats["seconds"] += elapsed
+            stats["calls"] += 1
+            if matches is None:
+                stats["matches"] = None
+            elif stats["matches"] is not None:
+                stats["matches"] += matches
+            if new_size > size:
+                stats["net_bytes_added"] += new_size - size
+            else:
+                stats["net_bytes_removed"] += size - new_size
+            if elapsed > stats["slowest_seconds"]:
+                stats["slowest_seconds"] = elapsed
+                stats["slowest_label"] = label
+            size = new_size
+        return text
+
+    def sorted_rules(self):
+        return sorted(self.stats.items(), key=lambda item: item[1]["seconds"], reverse=True)
+
+    def to_dict(self):
+        total = sum(stats["seconds"] for stats in self.stats.values())
+        return {
+            "texts": self.texts,
+            "bytes_in": self.bytes_in,
+            "total_seconds": total,
+            "rules": [dict(rule=name, **stats) for name, stats in self.sorted_rules()],
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def report(self):
+        """Returns a plain-text table, slowest rule first."""
+        total = sum(stats["seconds"] for stats in self.stats.values()) or 1e-9
+
+        lines = [
+            f"Cleaner profile: {self.texts} texts, {self.bytes_in / 1024:,.0f} KB in",
+            "=" * 99,
+            f"{'Rule':<26}{'Time (ms)':>11}{'Share':>8}{'Matches':>10}{'Net added':>12}{'Net removed':>13}  Slowest input",
+            "=" * 99,
+        ]
+        for name, stats in self.sorted_rules():
+            matches = "-" if stats["matches"] is None else f"{stats['matches']:,}"
+            slowest = stats["slowest_label"] or ""
+            if slowest:
+                slowest = f"{slowest[:20]} ({stats['slowest_seconds'] * 1000:.1f} ms)"
+            lines.append(
+                f"{name:<26}{stats['seconds'] * 1000:>11.1f}{stats['seconds'] / total:>8.1%}{matches:>10}"
+                f"{stats['net_bytes_added']:>12,}{stats['net_bytes_removed']:>13,}  {slowest}"
+            )
+        lines.append("=" * 99)
+        lines.append(f"{'Total':<26}{total * 1000:>11.1f}")
+        return "\n".join(lines)
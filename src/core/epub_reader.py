@@ -0,0 +1,262 @@
+"""
+Lightweight, streaming EPUB reader.
+Reads the package document (OPF), the navigation document or NCX and the
+spine straight from the zip, then decompresses the XHTML documents it
+needs one at a time. Images, fonts and other payloads are never read, so
+memory use tracks the largest chapter rather than the whole archive.
+list_chapters_from_epub() goes further and only parses a chapter's body
+when its content is first accessed.
+Before any chapter is extracted, a pass over every document finds
+boilerplate blocks repeated across them (see extractor.find_boilerplate()),
+which are then dropped from each chapter. It walks the documents with the
+extractor's own walk, so what it finds is exactly what gets dropped.
+"""
+
+import os
+import posixpath
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Tuple
+from urllib.parse import unquote
+
+from ebooklib import epub
+from ebooklib.epub import NAMESPACES
+from ebooklib.utils import parse_html_string, parse_string
+
+from src.core.extractor import LazyChapter, extract_document, find_boilerplate, is_skippable, walk_document
+
+def _opf(tag):
+    return f"{{{NAMESPACES['OPF']}}}{tag}"
+
+
+def _ncx(tag):
+    return f"{{{NAMESPACES['DAISY']}}}{tag}"
+
+
+def _read(archive, name):
+    # Same path normalization as ebooklib, so the same files resolve
+    return archive.read(posixpath.normpath(name))
+
+
+def _parse_ncx(data):
+    """Yields (href, title) for every navPoint in document order."""
+    nav_map = parse_string(data).getroot().find(_ncx('navMap'))
+    if nav_map is None:
+        return
+    for point in nav_map.iter(_ncx('navPoint')):
+        label, href = "", ""
+        for child in point:
+            if child.tag == _ncx('navLabel') and len(child):
+                label = child[0].text
+            elif child.tag == _ncx('content'):
+                href = child.get('src', '')
+        yield href, label
+
+
+def _parse_nav(data, base_path):
+    """Yields (href, title) for every entry of the nav document's TOC."""
+    nav_nodes = parse_html_string(data).xpath("//nav[@*='toc']")
+    if not nav_nodes:
+        return
+
+    def parse_list(list_node):
+        if list_node is None:
+            return
+        for item_node in list_node.findall('li'):
+            sublist_node = item_node.find('ol')
+            link_node = item_node.find('a')
+            href = ""
+            if link_node is not None and link_node.get('href'):
+                href = posixpath.normpath(posixpath.join(base_path, link_node.get('href')))
+
+            if sublist_node is not None:
+                yield href, item_node[0].text_content()
+                yield from parse_list(sublist_node)
+            elif href:
+                yield href, link_node.text_content()
+
+    yield from parse_list(nav_nodes[0].find('ol'))
+
+
+def _summarize(data, toc_title, item_name):
+    """DocumentSummary of a document, from the extractor's own parse and walk."""
+    return walk_document(epub.EpubHtml(content=data).get_body_content(), toc_title, item_name)[1]
+
+
+class EpubDocumentLoader:
+    """
+    Loads the text of one spine document on demand. Picklable, so lazy
+    chapters can be sent to worker processes.
+    boilerplate: Fingerprints of repeated blocks to drop.
+    """
+    def __init__(self, epub_path, zip_name, toc_title, item_name, boilerplate=frozenset()):
+        self.epub_path = epub_path
+        self.zip_name = zip_name
+        self.toc_title = toc_title
+        self.item_name = item_name
+        self.boilerplate = boilerplate
+
+    def extract(self):
+        """Returns (title, text, removed boilerplate characters) for the document."""
+        return extract_document(self._body(), self.toc_title, self.item_name, self.boilerplate)
+
+    def walk(self):
+        """
+        Returns the document's (pieces, DocumentSummary) from
+        extractor.walk_document(), before any boilerplate is dropped.
+        """
+        return walk_document(self._body(), self.toc_title, self.item_name)
+
+    def _body(self):
+        with zipfile.ZipFile(self.epub_path) as archive:
+            data = _read(archive, self.zip_name)
+        return epub.EpubHtml(content=data).get_body_content()
+
+    def __call__(self):
+        return self.extract()[1]
+
+    def __eq__(self, other):
+        return other.__class__ is self.__class__ and vars(other) == vars(self)
+
+
+@dataclass
+class EpubPackage:
+    """What an EPUB's package document and table of contents say about it."""
+    path: str
+    # (spine index, file name relative to the OPF, name in the zip, size)
+    # for each XHTML document in the spine, in reading order
+    documents: List[Tuple[int, str, str, int]]
+    # Document file name -> table of contents title
+    toc_map: Dict[str, str]
+    metadata: Dict[str, str]
+    # Fingerprints of boilerplate blocks, once found
+    boilerplate: FrozenSet[str] = frozenset()
+
+    def loader(self, item_name, zip_name):
+        return EpubDocumentLoader(self.path, zip_name, self.toc_map.get(item_name), item_name, self.boilerplate)
+
+
+def read_package(epub_path):
+    """
+    Reads the container, package document (OPF) and nav document or NCX of
+    an EPUB. Nothing else in the archive is decompressed.
+    """
+    if not os.path.exists(epub_path):
+        raise FileNotFoundError(f"EPUB file not found: {epub_path}")
+
+    try:
+        archive = zipfile.ZipFile(epub_path)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Failed to read EPUB: {e}")
+
+    with archive:
+        try:
+            container = parse_string(_read(archive, "META-INF/container.xml"))
+            opf_file = None
+            for root_file in container.iterfind(
+                ".//{%s}rootfile[@media-type]" % NAMESPACES['CONTAINERNS']
+            ):
+                if root_file.get('media-type') == "application/oebps-package+xml":
+                    opf_file = root_file.get('full-path')
+            opf_dir = posixpath.dirname(opf_file)
+            package = parse_string(_read(archive, opf_file)).getroot()
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Failed to read EPUB: {e}")
+
+        # Manifest: id -> (file name relative to the OPF, media type, properties)
+        manifest = {}
+        nav_name = None
+        for item in package.find(_opf('manifest')):
+            if item.tag != _opf('item'):
+                continue
+            file_name = unquote(item.get('href', ''))
+            properties = item.get('properties', '').split()
+            manifest.setdefault(item.get('id'), (file_name, item.get('media-type'), properties))
+            if nav_name is None and item.get('media-type') == "application/xhtml+xml" and 'nav' in properties:
+                nav_name = file_name
+
+        spine = package.find(_opf('spine'))
+
+        # Map file names to TOC titles. Like ebooklib, prefer the EPUB 3 nav
+        # document and fall back to the NCX.
+        toc_entries = []
+        if nav_name is not None:
+            nav_data = _read(archive, posixpath.join(opf_dir, nav_name))
+            toc_entries = _parse_nav(nav_data, posixpath.dirname(nav_name))
+        elif spine.get('toc') in manifest:
+            ncx_name = manifest[spine.get('toc')][0]
+            toc_entries = _parse_ncx(_read(archive, posixpath.join(opf_dir, ncx_name)))
+
+        toc_map = {}
+        for href, title in toc_entries:
+            toc_map.setdefault(href.split('#')[0], title)
+
+        # Sizes come from the zip directory, without decompressing anything
+        sizes = {info.filename: info.file_size for info in archive.infolist()}
+        documents = []
+        for i, itemref in enumerate(spine):
+            entry = manifest.get(itemref.get('idref'))
+            if entry is None or entry[1] != "application/xhtml+xml":
+                continue
+            zip_name = posixpath.normpath(posixpath.join(opf_dir, entry[0]))
+            if zip_name in sizes:
+                documents.append((i, entry[0], zip_name, sizes[zip_name]))
+
+        # Extract Metadata
+        metadata = {
+            "title": "Unknown Title",
+            "author": "Unknown Author"
+        }
+        opf_metadata = package.find(_opf('metadata'))
+        if opf_metadata is not None:
+            title = opf_metadata.find(f"{{{NAMESPACES['DC']}}}title")
+            if title is not None and title.text:
+                metadata['title'] = title.text
+            author = opf_metadata.find(f"{{{NAMESPACES['DC']}}}creator")
+            if author is not None and author.text:
+                metadata['author'] = author.text
+
+    return EpubPackage(path=epub_path, documents=documents, toc_map=toc_map, metadata=metadata)
+
+
+def list_chapters_from_epub(epub_path, skip_toc=False):
+    """
+    Lists the chapters of an EPUB without extracting their bodies.
+    Returns (chapters, metadata) like extract_chapters_from_epub(); each
+    chapter is a LazyChapter whose content is extracted on first access.
+    """
+    package = read_package(epub_path)
+
+    documents = []
+    with zipfile.ZipFile(epub_path) as archive:
+        # One document decompressed at a time and walked as extraction
+        # would; only its summary is kept, not its text
+        for i, item_name, zip_name, size in package.documents:
+            summary = _summarize(_read(archive, zip_name), package.toc_map.get(item_name), item_name)
+            documents.append((i, item_name, zip_name, size, summary))
+
+    package.boilerplate = find_boilerplate([summary.fingerprints() for *_, summary in documents])
+
+    chapters = []
+    for i, item_name, zip_name, size, summary in documents:
+        # Extraction skips documents with no text left, and so does the listing
+        if summary.is_empty(package.boilerplate):
+            continue
+        title = summary.title
+
+        chapter_is_toc = is_skippable(title)
+
+        if skip_toc and chapter_is_toc:
+            print(f"Skipping TOC chapter: {title}")
+            continue
+
+        chapters.append(LazyChapter(
+            title=title,
+            loader=package.loader(item_name, zip_name),
+            order=i + 1,
+            is_toc=chapter_is_toc,
+            size=size,
+            removed_chars=summary.removed_chars(package.boilerplate)
+        ))
+
+    return chapters, dict(package.metadata)
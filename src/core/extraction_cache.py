@@ -0,0 +1,141 @@
+"""
+On-disk cache of extracted books.
+Entries are keyed by a hash of the input file's contents plus the extractor
+version, so a book is only parsed again when the file or the extraction
+code changes. Each entry is a zlib-compressed pickle of plain tuples and
+loads in milliseconds. The least recently used entries are evicted once the
+cache grows past its size limit.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+
+from src.core.extractor import EXTRACTOR_VERSION, Chapter, pack_chapters
+from src.utils.config import EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES
+
+_MAGIC = b"ONXC1"
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_hash(path):
+    """sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Maps input files to their extracted chapters and metadata.
+    variant: Distinguishes different forms of the same book, e.g. raw text
+             for the CLI and cleaned text for the GUI.
+    """
+    def __init__(self, directory=None, max_bytes=EXTRACTION_CACHE_MAX_BYTES):
+        self.directory = directory or EXTRACTION_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(path, variant):
+        """Returns the cache key for this file's current contents."""
+        parts = [file_hash(path), str(EXTRACTOR_VERSION), variant]
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def load(self, key):
+        """Returns (chapters, metadata) for a cached book, or None."""
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if not data.startswith(_MAGIC):
+                return None
+            rows, metadata = pickle.loads(zlib.decompress(data[len(_MAGIC):]))
+        except (OSError, ValueError, zlib.error, pickle.UnpicklingError, EOFError):
+            return None
+
+        # Mark as recently used for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        chapters = [
+            Chapter(title=title, content=content, order=order, is_toc=is_toc, removed_chars=removed_chars)
+            for title, content, order, is_toc, removed_chars in rows
+        ]
+        del rows
+        pack_chapters(chapters)
+        return chapters, metadata
+
+    def store(self, key, chapters, metadata):
+        """
+        Caches a book's chapters and metadata, then evicts old entries.
+        chapters: Chapter objects, or (title, content, order, is_toc,
+                  removed_chars) tuples.
+        """
+        rows = [
+            chapter if isinstance(chapter, tuple)
+            else (chapter.title, chapter.content, chapter.order, chapter.is_toc, chapter.removed_chars)
+            for chapter in chapters
+        ]
+        data = _MAGIC + zlib.compress(pickle.dumps((rows, dict(metadata)), protocol=pickle.HIGHEST_PROTOCOL))
+
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename, so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path_for(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        """(path, size, last used) for each cached book, oldest first."""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(".bin"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda entry: entry[2])
+        return entries
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            # The newest entry is always kept
+            if total <= self.max_bytes or path == entries[-1][0]:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -1,48 +1,606 @@
-import fitz  # pymupdf
-import ebooklib
-from ebooklib import epub
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 import os
 import re
 import warnings
+from collections import Counter
+
+from src.utils.parallel import map_processes
+
+# BeautifulSoup is much faster with the C-backed lxml parser; both produce
+# the same text for the well-formed markup ebooklib hands us
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# Bump whenever extraction or cleaning output changes, so cached books
+# (see extraction_cache) are extracted again
+EXTRACTOR_VERSION = 2
+
+# Below this much HTML, pool startup costs more than parsing saves
+PARALLEL_MIN_BYTES = 2_000_000
 
 # Suppress ebooklib warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="ebooklib")
 warnings.filterwarnings("ignore", category=FutureWarning, module="ebooklib")
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 @dataclass
+class PreparedText:
+    """Cleaned and segmented form of a chapter, ready for synthesis."""
+    text: str
+    segments: List[str]
+    char_counts: List[int]
+    # Chapter.source_key of what it was prepared from, to tell when it has
+    # gone stale
+    source: object = field(repr=False)
+    title: Optional[str] = None
+    max_chars: int = 400
+
+class BookText:
+    """
+    The text of a book's chapters, UTF-8 encoded in one contiguous buffer.
+    English prose is about one byte per character in UTF-8, where a str
+    with a single curly quote or dash in it takes two bytes per character.
+    Chapters are separated by SEPARATOR, so a run of adjacent chapters
+    decodes as one string.
+    """
+    SEPARATOR = "\n\n"
+
+    def __init__(self, texts=()):
+        # (start, end) byte offsets of each chapter's text
+        self.spans = []
+        # Span -> its length in characters, so sizes need no decoding
+        self._lengths = {}
+        self._buffer = bytearray()
+        for text in texts:
+            self.append(text)
+
+    def append(self, text):
+        """Adds a chapter's text to the end of the book; returns its span."""
+        if self.spans:
+            self._buffer += self.SEPARATOR.encode('utf-8')
+        start = len(self._buffer)
+        self._buffer += text.encode('utf-8', 'surrogatepass')
+        self.spans.append((start, len(self._buffer)))
+        self._lengths[self.spans[-1]] = len(text)
+        return self.spans[-1]
+
+    @property
+    def nbytes(self):
+        return len(self._buffer)
+
+    def text(self, start, end):
+        # Decoded from a slice rather than a memoryview: an export held by a
+        # decode in another thread would make a concurrent append() raise
+        # BufferError while a book is still being packed.
+        return self._buffer[start:end].decode('utf-8', 'surrogatepass')
+
+    def length(self, start, end):
+        """Characters in a span, as len(self.text(start, end))."""
+        length = self._lengths.get((start, end))
+        return length if length is not None else len(self.text(start, end))
+
 class Chapter:
-    title: str
-    content: str
-    order: int
-    is_toc: bool = False
+    """
+    One chapter of a book. Its text either lives in a shared BookText (see
+    pack_chapters()) and is decoded on access, or in a string of its own.
+    Assigning content is copy-on-write: the chapter takes its own string
+    and the shared buffer is never modified.
+    """
+    __slots__ = ('title', 'order', 'is_toc', 'removed_chars', 'prepared', '_text', '_store', '_span')
 
-def extract_text_from_pdf(pdf_path):
+    def __init__(self, title, content, order, is_toc=False, removed_chars=0, prepared=None):
+        self.title = title
+        self.order = order
+        self.is_toc = is_toc
+        # Characters of repeated boilerplate dropped from the source
+        self.removed_chars = removed_chars
+        self.prepared = prepared
+        self._text = content
+        self._store = None
+        self._span = None
+
+    @property
+    def content(self):
+        if self._store is not None:
+            return self._store.text(*self._span)
+        if self._text is None:
+            self._text = self._load()
+        return self._text
+
+    @content.setter
+    def content(self, value):
+        self._text = value
+        self._store = None
+        self._span = None
+
+    @property
+    def char_count(self):
+        """len(self.content), without decoding shared text."""
+        if self._store is not None:
+            return self._store.length(*self._span)
+        return len(self.content)
+
+    def _load(self):
+        return None
+
+    def _share(self, store, span):
+        self._store = store
+        self._span = span
+        self._text = None
+
+    @property
+    def source_key(self):
+        """
+        Identifies the current content without decoding it: the chapter's own
+        string, or its place in the shared BookText.
+        """
+        if self._store is not None:
+            return (self._store, self._span)
+        return self.content
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            (self.title, self.content, self.order, self.is_toc)
+            == (other.title, other.content, other.order, other.is_toc)
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(title={self.title!r}, content={self.content!r}, "
+            f"order={self.order!r}, is_toc={self.is_toc!r})"
+        )
+
+    def get_prepared(self, max_chars, strip_title=True) -> Optional[PreparedText]:
+        """
+        Returns the cached prepared text if it was built from the current
+        content with the same settings, otherwise None.
+        """
+        prepared = self.prepared
+        if prepared is None:
+            return None
+        title = self.title if strip_title else None
+        if prepared.max_chars != max_chars or prepared.title != title:
+            return None
+        # Identity check first: unchanged content has the very same key
+        key = self.source_key
+        if prepared.source is not key and prepared.source != key:
+            return None
+        return prepared
+
+class LazyChapter(Chapter):
     """
-    Extracts text from a PDF file.
+    A chapter whose content is only extracted when first accessed.
+    loader: Picklable callable returning the chapter text.
+    size: Uncompressed size of the source document in bytes, for display
+          before the content has been loaded.
+    pages: Number of pages the chapter spans, for page-based sources.
+    """
+    __slots__ = ('loader', 'size', 'pages')
+
+    def __init__(self, title, loader, order, is_toc=False, size=0, pages=None, removed_chars=0):
+        super().__init__(title, None, order, is_toc, removed_chars)
+        self.loader = loader
+        self.size = size
+        self.pages = pages
+
+    def _load(self):
+        return self.loader()
+
+    @property
+    def is_loaded(self):
+        return self._text is not None or self._store is not None
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        if self.is_loaded and other.is_loaded:
+            return super().__eq__(other)
+        # Comparing must not load anything: compare where the text comes from
+        return (
+            (self.title, self.loader, self.order, self.is_toc, self.is_loaded)
+            == (other.title, other.loader, other.order, other.is_toc, other.is_loaded)
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        if self.is_loaded:
+            return super().__repr__()
+        pages = f", pages={self.pages!r}" if self.pages is not None else ""
+        return (
+            f"{self.__class__.__name__}(title={self.title!r}, size={self.size!r}{pages}, "
+            f"order={self.order!r}, is_toc={self.is_toc!r}, loaded=False)"
+        )
+
+def pack_chapters(chapters):
+    """
+    Moves the text of these chapters into one shared BookText, releasing
+    their own strings. Lazy chapters are loaded first. Returns the store.
+    """
+    store = BookText()
+    for chapter in chapters:
+        # Each chapter's own string is released as soon as it is copied in
+        chapter._share(store, store.append(chapter.content))
+    return store
+
+def joined_text(chapters, separator=BookText.SEPARATOR):
+    """
+    Returns separator.join(chapter.content for chapter in chapters).
+    Runs of chapters that sit next to each other in the same BookText are
+    decoded in one go, rather than as one string per chapter.
+    """
+    contiguous = separator == BookText.SEPARATOR
+    gap = len(BookText.SEPARATOR.encode('utf-8'))
+    pieces = []
+    run = None  # (store, start, end) of the current run
+    for chapter in chapters:
+        store, span = chapter._store, chapter._span
+        if run is not None and contiguous and store is run[0] and span[0] == run[2] + gap:
+            run = (store, run[1], span[1])
+            continue
+        if run is not None:
+            pieces.append(run[0].text(run[1], run[2]))
+            run = None
+        if store is not None:
+            run = (store, span[0], span[1])
+        else:
+            pieces.append(chapter.content)
+    if run is not None:
+        pieces.append(run[0].text(run[1], run[2]))
+    return separator.join(pieces)
+
+def chapter_size_label(chapter):
+    """
+    Size of a chapter for listings, without loading lazy chapters, and how
+    much boilerplate was removed from it.
+    """
+    if isinstance(chapter, LazyChapter) and not chapter.is_loaded:
+        if chapter.pages is not None:
+            label = f"{chapter.pages} pages" if chapter.pages != 1 else "1 page"
+        else:
+            label = f"{max(1, round(chapter.size / 1024))} KB"
+    else:
+        label = f"{chapter.char_count} chars"
+    if chapter.removed_chars:
+        label += f" (-{chapter.removed_chars} boilerplate chars)"
+    return label
+
+def extract_text_from_pdf(pdf_path, processes=None):
+    """
+    Extracts text from a PDF file, without running headers and footers.
     """
     if not os.path.exists(pdf_path):
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+    # Imported here: pdf_reader builds on this module
+    from src.core.pdf_reader import extract_pdf_pages
+
+    return "\n".join(extract_pdf_pages(pdf_path, processes))
+
+def extract_chapters_from_pdf(pdf_path) -> List[Chapter]:
+    """
+    Extracts chapters from a PDF file, using its outline or, failing that,
+    its headings. See src.core.pdf_reader.
+    """
+    # Imported here: pdf_reader builds on this module
+    from src.core.pdf_reader import list_chapters_from_pdf
+
+    chapters, metadata = list_chapters_from_pdf(pdf_path)
+    chapters = [
+        Chapter(title=c.title, content=c.content, order=c.order, is_toc=c.is_toc)
+        for c in chapters
+    ]
+    chapters = [c for c in chapters if c.content]
+    pack_chapters(chapters)
+    return chapters, metadata
+
+def is_skippable(title):
+    """True for front/back matter such as contents, copyright and index pages."""
+    if not title:
+        return False
+    t = title.lower().strip()
     
-    doc = fitz.open(pdf_path)
-    text = []
-    for page in doc:
-        # Get text blocks to potentially filter headers/footers later
-        # For now, just get all text
-        text.append(page.get_text())
+    # Explicit inclusions (keep these even if they match exclusion keywords)
+    includes = ['introduction', 'preface', 'foreword', 'prologue', 'chapter']
+    if any(x in t for x in includes):
+        return False
+        
+    # Exact matches for exclusion
+    excludes_exact = {
+        'contents', 'table of contents', 'toc',
+        'table of figures', 'list of figures', 'list of tables',
+        'acknowledgments', 'acknowledgements',
+        'title page', 'copyright', 'copyright page',
+        'index',
+        'notes', 'endnotes', 'bibliography', 'references', 'works cited',
+        'about the author', 'colophon'
+    }
     
-    return "\n".join(text)
+    if t in excludes_exact:
+        return True
+        
+    # Partial matches (be careful here)
+    if 'copyright' in t: return True
+    if 'acknowledgment' in t: return True
+    
+    return False
 
-def extract_chapters_from_pdf(pdf_path) -> List[Chapter]:
+# Elements that won't be present in the audiobook: scripts, styles and
+# anything image-related (figures, captions, or by class or id)
+_DROPPED_TAGS = frozenset(['script', 'style', 'figure', 'figcaption', 'caption', 'img'])
+_IMAGE_ATTR_RE = re.compile(r'(image|figure|caption|illustration|photo|picture)', re.I)
+_TITLE_TAGS = ('h1', 'h2', 'h3')
+
+# Block-level elements. A block with no blocks inside it (a paragraph, a
+# list item, a heading...) is the unit boilerplate is detected in.
+BLOCK_TAGS = frozenset([
+    'p', 'div', 'li', 'dd', 'dt', 'td', 'th', 'pre', 'blockquote', 'address', 'center',
+    'header', 'footer', 'aside', 'section', 'article', 'nav', 'main',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+])
+HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+
+# Boilerplate: short blocks such as running headers, series blurbs and
+# "* * *" ornaments that publishers repeat across spine documents.
+# Longer blocks are never boilerplate
+BOILERPLATE_MAX_CHARS = 200
+# Only blocks this close to the start or end of a document count, unless
+# they have no letters or digits (ornaments)
+BOILERPLATE_EDGE_BLOCKS = 3
+# A block is boilerplate once it repeats in this many documents, and in
+# this share of all of them
+BOILERPLATE_MIN_DOCUMENTS = 3
+BOILERPLATE_MIN_SHARE = 0.25
+
+class _Heading:
+    """A heading found while walking a document, and the text pieces it spans."""
+    __slots__ = ('name', 'parts', 'start', 'end')
+
+    def __init__(self, name, start):
+        self.name = name
+        self.parts = []
+        self.start = start
+        self.end = None
+
+    @property
+    def text(self):
+        return "".join(self.parts).strip()
+
+def is_dropped_element(name, classes, element_id):
+    """True for elements left out of the text, with everything inside them."""
+    if name in _DROPPED_TAGS:
+        return True
+    if classes:
+        if isinstance(classes, str):
+            classes = classes.split()
+        if any(_IMAGE_ATTR_RE.search(c) for c in classes):
+            return True
+    return bool(element_id) and _IMAGE_ATTR_RE.search(element_id) is not None
+
+def boilerplate_fingerprint(text):
+    return " ".join(text.split()).lower()
+
+def boilerplate_candidates(blocks):
+    """
+    Yields (index, fingerprint) for a document's blocks that could be
+    boilerplate.
+    blocks: (text, is_heading) for each leaf block, in document order.
+    Headings never qualify, and blocks with words only do near the start or
+    end of the document, so a line of dialogue that happens to repeat
+    mid-chapter is left alone.
+    """
+    count = len(blocks)
+    for index, (text, is_heading) in enumerate(blocks):
+        if is_heading or not text or len(text) > BOILERPLATE_MAX_CHARS:
+            continue
+        near_edge = index < BOILERPLATE_EDGE_BLOCKS or index >= count - BOILERPLATE_EDGE_BLOCKS
+        if near_edge or not any(c.isalnum() for c in text):
+            yield index, boilerplate_fingerprint(text)
+
+def find_boilerplate(documents):
+    """
+    Returns the fingerprints of blocks repeated across enough documents to
+    be boilerplate.
+    documents: For each spine document, the fingerprints of its candidate
+               blocks (see boilerplate_candidates()).
+    """
+    counts = Counter()
+    for fingerprints in documents:
+        counts.update(set(fingerprints))
+    threshold = max(BOILERPLATE_MIN_DOCUMENTS, BOILERPLATE_MIN_SHARE * len(documents))
+    return frozenset(fingerprint for fingerprint, count in counts.items() if count >= threshold)
+
+def _walk_document(soup):
+    """
+    One pass over a parsed document. Dropped elements are skipped along with
+    everything inside them. Returns the stripped, non-empty text pieces in
+    document order, the h1/h2/h3 headings that remain and the (start, end,
+    is_heading) piece ranges of leaf blocks.
+    """
+    text_types = soup.interesting_string_types
+    pieces = []
+    headings = []
+    open_headings = []
+    blocks = []
+    # Open block elements: [first piece, has blocks inside, is a heading]
+    open_blocks = []
+    # Child iterators of the elements being walked, with their heading and
+    # block if any
+    stack = [(iter(soup.contents), None, None)]
+    while stack:
+        children, heading, block = stack[-1]
+        node = next(children, None)
+        if node is None:
+            stack.pop()
+            if heading is not None:
+                heading.end = len(pieces)
+                open_headings.pop()
+            if block is not None:
+                open_blocks.pop()
+                if not block[1]:
+                    blocks.append((block[0], len(pieces), block[2]))
+        elif isinstance(node, Tag):
+            if is_dropped_element(node.name, node.get('class'), node.get('id')):
+                continue
+            heading = None
+            if node.name in _TITLE_TAGS:
+                heading = _Heading(node.name, len(pieces))
+                headings.append(heading)
+                open_headings.append(heading)
+            block = None
+            if node.name in BLOCK_TAGS:
+                if open_blocks:
+                    open_blocks[-1][1] = True
+                block = [len(pieces), False, node.name in HEADING_TAGS]
+                open_blocks.append(block)
+            stack.append((iter(node.contents), heading, block))
+        elif type(node) in text_types:
+            # Same strings get_text() would return: no comments, doctypes...
+            for open_heading in open_headings:
+                open_heading.parts.append(node)
+            stripped = node.strip()
+            if stripped:
+                pieces.append(stripped)
+    return pieces, headings, blocks
+
+@dataclass
+class DocumentSummary:
+    """
+    What the walk over one spine document found, without its text: enough
+    to tell, once the book's boilerplate is known, what extraction will drop
+    and whether anything is left.
+    """
+    title: str
+    # Number of text pieces in the document
+    pieces: int
+    # Piece range of the heading dropped as the title, if any
+    title_span: Optional[tuple] = None
+    # (fingerprint, characters, start piece, end piece) of each block that
+    # could be boilerplate
+    candidates: List[tuple] = field(default_factory=list)
+
+    def fingerprints(self):
+        return [fingerprint for fingerprint, _, _, _ in self.candidates]
+
+    def dropped_spans(self, boilerplate):
+        """Piece ranges extraction drops: boilerplate blocks and the title."""
+        spans = [(start, end) for fingerprint, _, start, end in self.candidates if fingerprint in boilerplate]
+        if self.title_span is not None:
+            spans.append(self.title_span)
+        return spans
+
+    def removed_chars(self, boilerplate):
+        return sum(chars for fingerprint, chars, _, _ in self.candidates if fingerprint in boilerplate)
+
+    def is_empty(self, boilerplate):
+        """True if no text is left once the title and boilerplate are dropped."""
+        dropped = set()
+        for start, end in self.dropped_spans(boilerplate):
+            dropped.update(range(start, end))
+        return len(dropped) >= self.pieces
+
+def walk_document(body_content, toc_title, item_name):
+    """
+    Parses and walks the body of one EPUB spine document. Returns its text
+    pieces and a DocumentSummary. The title is the TOC title, else the
+    first h1 or h2, else item_name.
+    """
+    soup = BeautifulSoup(body_content, HTML_PARSER)
+
+    # Drop rules, heading candidates and text all come from a single walk
+    pieces, headings, blocks = _walk_document(soup)
+
+    # Try to find a title
+    title = ""
+    title_heading = None
+
+    # 1. Check TOC title first (most reliable)
+    if toc_title is not None:
+        title = toc_title
+        # Find the heading matching this title to remove it, preferring
+        # h1, then h2, then h3
+        wanted = title.lower()
+        for tag in _TITLE_TAGS:
+            title_heading = next(
+                (h for h in headings if h.name == tag and wanted in h.text.lower()), None
+            )
+            if title_heading:
+                break
+
+    # 2. Fallback to HTML headings
+    if not title:
+        for tag in ('h1', 'h2'):
+            heading = next((h for h in headings if h.name == tag), None)
+            if heading:
+                title = heading.text
+                title_heading = heading
+                break
+
+    # 3. Fallback to item name
+    if not title:
+        title = item_name
+
+    block_texts = [(' '.join(pieces[start:end]), is_heading) for start, end, is_heading in blocks]
+    summary = DocumentSummary(
+        title=title,
+        pieces=len(pieces),
+        title_span=(title_heading.start, title_heading.end) if title_heading else None,
+        candidates=[
+            (fingerprint, len(block_texts[i][0]), blocks[i][0], blocks[i][1])
+            for i, fingerprint in boilerplate_candidates(block_texts)
+        ]
+    )
+    return pieces, summary
+
+def document_text(pieces, summary, boilerplate=frozenset()):
+    """
+    Joins a walked document's pieces into its chapter text, dropping the
+    title heading and boilerplate blocks. Returns (text, removed characters).
+    """
+    dropped = summary.dropped_spans(boilerplate)
+    if dropped:
+        dropped_pieces = set()
+        for start, end in dropped:
+            dropped_pieces.update(range(start, end))
+        pieces = [piece for i, piece in enumerate(pieces) if i not in dropped_pieces]
+
+    # Use space separator to avoid breaking words
+    chapter_text = ' '.join(pieces)
+
+    # Normalize excessive whitespace while preserving paragraph breaks
+    # Replace multiple spaces with single space
+    chapter_text = re.sub(r' +', ' ', chapter_text)
+    # Clean up any remaining artifacts
+    chapter_text = chapter_text.strip()
+
+    return chapter_text, summary.removed_chars(boilerplate)
+
+def extract_document_text(body_content, toc_title, item_name, boilerplate=frozenset()):
+    """
+    Extracts (title, text) from the body of one EPUB spine document.
+    toc_title: The document's title in the table of contents, if any.
+    item_name: Fallback title when the document has no heading.
+    boilerplate: Fingerprints of blocks to drop (see find_boilerplate()).
+    """
+    return extract_document(body_content, toc_title, item_name, boilerplate)[:2]
+
+def extract_document(body_content, toc_title, item_name, boilerplate=frozenset()):
     """
-    Extracts chapters from a PDF file.
-    For now, treats the entire PDF as a single chapter.
+    Like extract_document_text(), but returns (title, text, removed) where
+    removed is the number of boilerplate characters dropped.
     """
-    text = extract_text_from_pdf(pdf_path)
-    return [Chapter(title="Full Text", content=text, order=1)], {}
+    pieces, summary = walk_document(body_content, toc_title, item_name)
+    chapter_text, removed = document_text(pieces, summary, boilerplate)
+    return summary.title, chapter_text, removed
 
 def extract_text_from_epub(epub_path):
     """
@@ -51,175 +609,49 @@ def extract_text_from_epub(epub_path):
     chapters = extract_chapters_from_epub(epub_path)
     return "\n".join([c.content for c in chapters])
 
-def extract_chapters_from_epub(epub_path, skip_toc=False) -> List[Chapter]:
+def _walk_spine_document(loader):
+    return loader.walk()
+
+def extract_chapters_from_epub(epub_path, skip_toc=False, processes=None) -> List[Chapter]:
     """
     Extracts chapters from an EPUB file.
+    Spine documents are decompressed and parsed one at a time, across a
+    process pool for large books; chapters keep spine order. Each document
+    is parsed once: boilerplate is found from the walks' summaries, then
+    dropped from the pieces they returned.
+    processes: Worker processes (default: one per CPU).
     """
-    if not os.path.exists(epub_path):
-        raise FileNotFoundError(f"EPUB file not found: {epub_path}")
+    # Imported here: epub_reader builds on this module
+    from src.core.epub_reader import read_package
 
-    try:
-        book = epub.read_epub(epub_path)
-    except Exception as e:
-        raise ValueError(f"Failed to read EPUB: {e}")
+    package = read_package(epub_path)
 
     chapters = []
-    
-    # Helper to check if chapter should be skipped (TOC, Index, etc.)
-    def is_skippable(title):
-        if not title:
-            return False
-        t = title.lower().strip()
-        
-        # Explicit inclusions (keep these even if they match exclusion keywords)
-        includes = ['introduction', 'preface', 'foreword', 'prologue', 'chapter']
-        if any(x in t for x in includes):
-            return False
-            
-        # Exact matches for exclusion
-        excludes_exact = {
-            'contents', 'table of contents', 'toc',
-            'table of figures', 'list of figures', 'list of tables',
-            'acknowledgments', 'acknowledgements',
-            'title page', 'copyright', 'copyright page',
-            'index',
-            'notes', 'endnotes', 'bibliography', 'references', 'works cited',
-            'about the author', 'colophon'
-        }
-        
-        if t in excludes_exact:
-            return True
-            
-        # Partial matches (be careful here)
-        if 'copyright' in t: return True
-        if 'acknowledgment' in t: return True
-        
-        return False
+    loaders = [package.loader(item_name, zip_name) for _, item_name, zip_name, _ in package.documents]
+    total_bytes = sum(size for _, _, _, size in package.documents)
+    walked = map_processes(_walk_spine_document, loaders, total_bytes, PARALLEL_MIN_BYTES, processes)
+    package.boilerplate = find_boilerplate([summary.fingerprints() for _, summary in walked])
 
-    # Map file names to TOC titles
-    toc_map = {}
-    
-    def process_toc_item(item):
-        if isinstance(item, (list, tuple)):
-            # It's a section with children: (Link, [children])
-            if len(item) >= 1:
-                process_toc_item(item[0]) # Process the section link itself
-            if len(item) >= 2 and isinstance(item[1], (list, tuple)):
-                for child in item[1]:
-                    process_toc_item(child)
-        elif hasattr(item, 'href') and hasattr(item, 'title'):
-            # It's a Link object
-            href = item.href.split('#')[0]
-            if href not in toc_map:
-                toc_map[href] = item.title
-
-    for item in book.toc:
-        process_toc_item(item)
-
-    # Get items from spine to ensure correct order
-    for i, item_id in enumerate(book.spine):
-        item = book.get_item_with_id(item_id[0])
-        
-        if item.get_type() == ebooklib.ITEM_DOCUMENT:
-            soup = BeautifulSoup(item.get_body_content(), 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Remove image-related elements (captions, figures, etc.)
-            # These won't be present in the audiobook
-            for element in soup.find_all(['figure', 'figcaption', 'caption', 'img']):
-                element.decompose()
-            
-            # Remove elements with image-related classes
-            for element in soup.find_all(class_=re.compile(r'(image|figure|caption|illustration|photo|picture)', re.I)):
-                element.decompose()
-            
-            # Remove elements with image-related ids
-            for element in soup.find_all(id=re.compile(r'(image|figure|caption|illustration|photo|picture)', re.I)):
-                element.decompose()
-            
-            # Try to find a title
-            title = ""
-            title_element = None
-            
-            # 1. Check TOC map first (most reliable)
-            item_name = item.get_name()
-            if item_name in toc_map:
-                title = toc_map[item_name]
-                # Find the element matching this title to remove it
-                # We look for h1, h2, h3 with matching text
-                for tag in ['h1', 'h2', 'h3']:
-                    for header in soup.find_all(tag):
-                        if title.lower() in header.get_text().strip().lower():
-                            title_element = header
-                            break
-                    if title_element:
-                        break
-            
-            # 2. Fallback to HTML headings
-            if not title:
-                h1 = soup.find('h1')
-                if h1:
-                    title = h1.get_text().strip()
-                    title_element = h1
-                elif soup.find('h2'):
-                    h2 = soup.find('h2')
-                    title = h2.get_text().strip()
-                    title_element = h2
-            
-            # Remove the title element from the body if found
-            if title_element:
-                title_element.decompose()
-            
-            # 3. Fallback to item name
-            if not title:
-                title = item_name
-
-            # Get text with proper spacing
-            # Use space separator to avoid breaking words
-            chapter_text = soup.get_text(separator=' ', strip=True)
-            
-            # Normalize excessive whitespace while preserving paragraph breaks
-            # Replace multiple spaces with single space
-            chapter_text = re.sub(r' +', ' ', chapter_text)
-            # Clean up any remaining artifacts
-            chapter_text = chapter_text.strip()
-            
-            if not chapter_text:
-                continue
+    for (i, _, _, _), (pieces, summary) in zip(package.documents, walked):
+        chapter_text, removed = document_text(pieces, summary, package.boilerplate)
+        if not chapter_text:
+            continue
+        title = summary.title
 
-            chapter_is_toc = is_skippable(title)
-            
-            if skip_toc and chapter_is_toc:
-                print(f"Skipping TOC chapter: {title}")
-                continue
+        chapter_is_toc = is_skippable(title)
+        
+        if skip_toc and chapter_is_toc:
+            print(f"Skipping TOC chapter: {title}")
+            continue
 
-            chapters.append(Chapter(
-                title=title,
-                content=chapter_text,
-                order=i + 1,
-                is_toc=chapter_is_toc
-            ))
-            
-    # Extract Metadata
-    metadata = {
-        "title": "Unknown Title",
-        "author": "Unknown Author"
-    }
-    
-    try:
-        # Get Title
-        titles = book.get_metadata('DC', 'title')
-        if titles:
-            metadata['title'] = titles[0][0]
-            
-        # Get Author
-        authors = book.get_metadata('DC', 'creator')
-        if authors:
-            metadata['author'] = authors[0][0]
-    except Exception as e:
-        print(f"Error extracting metadata: {e}")
+        chapters.append(Chapter(
+            title=title,
+            content=chapter_text,
+            order=i + 1,
+            is_toc=chapter_is_toc,
+            removed_chars=removed
+        ))
 
+    pack_chapters(chapters)
+    metadata = dict(package.metadata)
     return chapters, metadata
@@ -0,0 +1,280 @@
+"""
+Chapter detection for PDFs.
+Chapters come from the PDF outline (bookmarks) when it has one. Otherwise
+headings are found from font sizes: the largest text size, well above the
+body text, that recurs across pages marks chapter starts, with "Chapter N"
+style lines as a last resort. Each chapter covers a range of the document
+from its heading to the next one and is extracted on its own, on first
+access of its content.
+Running headers and footers (margin blocks repeated across pages) are
+dropped as text is extracted.
+"""
+
+import os
+import re
+from collections import Counter
+
+import fitz  # pymupdf
+
+from src.core.extractor import LazyChapter, is_skippable
+from src.utils.parallel import imap_processes
+
+# A heading's font must be at least this much larger than body text
+HEADING_SIZE_RATIO = 1.2
+# Longer lines are body text, whatever their size
+MAX_HEADING_CHARS = 100
+
+# Running headers and footers sit in the top and bottom of the page
+MARGIN_BAND = 0.08
+# A margin block repeated at the same position with the same text (digits
+# aside) on this many pages is a running header or footer
+MIN_REPEATS = 3
+# Headers and footers are detected over at least this many pages
+HEADER_WINDOW = 16
+
+# Pages per worker task, and the smallest document worth a process pool
+PAGES_PER_TASK = 32
+PARALLEL_MIN_PAGES = 64
+# Rough amount of text per page, so load_chapters() can weigh PDF chapters
+PDF_PAGE_BYTES = 3_000
+
+_DIGITS_RE = re.compile(r'\d+')
+
+_CHAPTER_LINE_RE = re.compile(
+    r'^(chapter|part|book)\s+(\d+|[ivxlcdm]+|one|two|three|four|five|six|seven|eight|nine|ten)\b',
+    re.IGNORECASE
+)
+
+
+def _page_blocks(page):
+    """(y0, text, in_margin) for each text block on a page, in reading order."""
+    height = page.rect.height
+    blocks = []
+    for _, y0, _, y1, text, _, block_type in page.get_text("blocks"):
+        if block_type != 0:
+            continue
+        in_margin = y1 <= height * MARGIN_BAND or y0 >= height * (1 - MARGIN_BAND)
+        blocks.append((y0, text, in_margin))
+    return blocks
+
+
+def _margin_key(y0, text):
+    # Page numbers change from page to page, so digits are ignored
+    return round(y0 / 4), _DIGITS_RE.sub('#', " ".join(text.split()).lower())
+
+
+def _running_keys(pages_blocks):
+    """Keys of margin blocks repeated across enough of these pages."""
+    counts = Counter()
+    for blocks in pages_blocks:
+        counts.update({_margin_key(y0, text) for y0, text, in_margin in blocks if in_margin})
+    return {key for key, count in counts.items() if count >= MIN_REPEATS}
+
+
+def _range_blocks(doc, first, last):
+    """
+    Text blocks of pages first..last (inclusive), one list per page, with
+    running headers and footers removed. Detection looks at a window of
+    at least HEADER_WINDOW pages around the range.
+    """
+    extra = max(0, HEADER_WINDOW - (last - first + 1))
+    window_first = max(0, first - extra // 2)
+    window_last = min(doc.page_count - 1, last + extra - (first - window_first))
+
+    window = [_page_blocks(doc[page_number]) for page_number in range(window_first, window_last + 1)]
+    running = _running_keys(window)
+    return [
+        [(y0, text) for y0, text, in_margin in blocks if not (in_margin and _margin_key(y0, text) in running)]
+        for blocks in window[first - window_first:last - window_first + 1]
+    ]
+
+
+def extract_pdf_range(doc, start, end):
+    """
+    Text of the document from start up to (not including) end, without
+    running headers and footers.
+    start, end: (page index, y) positions; end=None runs to the last page.
+    """
+    last_page = doc.page_count - 1 if end is None else end[0]
+    pages = []
+    for page_number, blocks in enumerate(_range_blocks(doc, start[0], last_page), start=start[0]):
+        # Blocks are kept by where they start, so a heading belongs to its chapter
+        pages.append("".join(
+            text for y0, text in blocks
+            if (page_number, y0) >= (start[0], start[1] - 1)
+            and (end is None or (page_number, y0) < (end[0], end[1] - 1))
+        ))
+    return "\n".join(pages)
+
+
+def _extract_pages(task):
+    pdf_path, first, last = task
+    with fitz.open(pdf_path) as doc:
+        return ["".join(text for _, text in blocks) for blocks in _range_blocks(doc, first, last)]
+
+
+def extract_pdf_pages(pdf_path, processes=None):
+    """
+    Yields the text of each page in order, without running headers and
+    footers. Large documents are split into page ranges that worker
+    processes extract in parallel, each with its own document handle.
+    processes: Worker processes (default: one per CPU).
+    """
+    with fitz.open(pdf_path) as doc:
+        page_count = doc.page_count
+
+    tasks = [
+        (pdf_path, first, min(first + PAGES_PER_TASK, page_count) - 1)
+        for first in range(0, page_count, PAGES_PER_TASK)
+    ]
+    for pages in imap_processes(_extract_pages, tasks, page_count, PARALLEL_MIN_PAGES, processes):
+        yield from pages
+
+
+class PdfChapterLoader:
+    """
+    Loads the text of one chapter's range on demand. Picklable, so lazy
+    chapters can be sent to worker processes.
+    """
+    def __init__(self, pdf_path, start, end):
+        self.pdf_path = pdf_path
+        self.start = start
+        self.end = end
+
+    def __call__(self):
+        with fitz.open(self.pdf_path) as doc:
+            return extract_pdf_range(doc, self.start, self.end).strip()
+
+    def __eq__(self, other):
+        return other.__class__ is self.__class__ and vars(other) == vars(self)
+
+
+def _outline_headings(doc):
+    """(page index, y, title) for each chapter in the outline, or []."""
+    toc = [entry for entry in doc.get_toc(simple=True) if entry[2] >= 1 and entry[1].strip()]
+    if not toc:
+        return []
+
+    # Chapters are the shallowest outline level with more than one entry
+    levels = Counter(level for level, _, _ in toc)
+    chapter_level = min((level for level, count in levels.items() if count > 1), default=min(levels))
+
+    headings = []
+    for level, title, page in toc:
+        if level != chapter_level:
+            continue
+        title = " ".join(title.split())
+        page_number = page - 1
+        # Start at the heading itself, so chapters sharing a page split there
+        hits = doc[page_number].search_for(title)
+        headings.append((page_number, hits[0].y0 if hits else 0, title))
+    return headings
+
+
+def _text_lines(doc):
+    """Yields (page index, y, font size, text) for every line of text."""
+    for page_number, page in enumerate(doc):
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                spans = [span for span in line["spans"] if span["text"].strip()]
+                if not spans:
+                    continue
+                text = " ".join("".join(span["text"] for span in spans).split())
+                size = round(max(span["size"] for span in spans) * 2) / 2
+                yield page_number, line["bbox"][1], size, text
+
+
+def _font_headings(doc):
+    """(page index, y, title) for headings found from font sizes, or []."""
+    lines = list(_text_lines(doc))
+    if not lines:
+        return []
+
+    # Body text is whatever size most characters are set in
+    chars_by_size = Counter()
+    for _, _, size, text in lines:
+        chars_by_size[size] += len(text)
+    body_size = chars_by_size.most_common(1)[0][0]
+
+    # Headings: the largest size well above body text that recurs across
+    # pages (a one-off, like the title page, isn't a chapter heading)
+    pages_by_size = {}
+    for page_number, _, size, text in lines:
+        if size >= body_size * HEADING_SIZE_RATIO and len(text) <= MAX_HEADING_CHARS:
+            pages_by_size.setdefault(size, set()).add(page_number)
+    sizes = [size for size, pages in pages_by_size.items() if len(pages) > 1]
+
+    if sizes:
+        heading_size = max(sizes)
+        is_heading = lambda size, text: size == heading_size and len(text) <= MAX_HEADING_CHARS
+    else:
+        is_heading = lambda size, text: size >= body_size and _CHAPTER_LINE_RE.match(text) is not None
+
+    # Consecutive heading lines ("Chapter 1" / "The Storm") form one title
+    headings = []
+    previous = None
+    for index, (page_number, y, size, text) in enumerate(lines):
+        if not is_heading(size, text):
+            continue
+        if previous == index - 1 and headings[-1][0] == page_number:
+            headings[-1] = (page_number, headings[-1][1], f"{headings[-1][2]} {text}")
+        else:
+            headings.append((page_number, y, text))
+        previous = index
+    return headings
+
+
+def list_chapters_from_pdf(pdf_path, skip_toc=False):
+    """
+    Detects the chapters of a PDF without extracting their text.
+    Returns (chapters, metadata) like list_chapters_from_epub(); each chapter
+    is a LazyChapter whose content is extracted on first access.
+    """
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+    with fitz.open(pdf_path) as doc:
+        headings = _outline_headings(doc) or _font_headings(doc)
+        page_count = doc.page_count
+
+        metadata = {}
+        if doc.metadata:
+            if doc.metadata.get('title'):
+                metadata['title'] = doc.metadata['title']
+            if doc.metadata.get('author'):
+                metadata['author'] = doc.metadata['author']
+
+        # Starts must be in reading order and distinct
+        starts = []
+        for page_number, y, title in sorted(headings):
+            if starts and starts[-1][:2] == (page_number, y):
+                continue
+            starts.append((page_number, y, title))
+
+        # Text before the first chapter (title page, copyright...) is kept
+        # as its own chapter, unticked by default, if there is any
+        if not starts:
+            starts = [(0, 0, "Full Text")]
+        elif starts[0][:2] > (0, 1) and extract_pdf_range(doc, (0, 0), starts[0][:2]).strip():
+            starts.insert(0, (0, 0, "Front Matter"))
+
+    chapters = []
+    for i, (page_number, y, title) in enumerate(starts):
+        chapter_is_toc = title == "Front Matter" or is_skippable(title)
+        if skip_toc and chapter_is_toc:
+            print(f"Skipping TOC chapter: {title}")
+            continue
+
+        end = starts[i + 1][:2] if i + 1 < len(starts) else None
+        # Approximate: pages up to the next chapter's first page
+        end_page = page_count if end is None else end[0]
+        chapters.append(LazyChapter(
+            title=title,
+            loader=PdfChapterLoader(pdf_path, (page_number, y), end),
+            order=i + 1,
+            is_toc=chapter_is_toc,
+            size=max(1, end_page - page_number) * PDF_PAGE_BYTES,
+            pages=max(1, end_page - page_number)
+        ))
+
+    return chapters, metadata
@@ -0,0 +1,31 @@
+"""
+Picks the reader for a book file by its extension.
+"""
+
+import os
+
+from src.core.epub_reader import list_chapters_from_epub
+from src.core.pdf_reader import list_chapters_from_pdf
+from src.core.text_reader import HTML_EXTENSIONS, MARKDOWN_EXTENSIONS, TEXT_EXTENSIONS, list_chapters_from_text
+
+SUPPORTED_EXTENSIONS = ('.epub', '.pdf') + TEXT_EXTENSIONS + MARKDOWN_EXTENSIONS + HTML_EXTENSIONS
+
+
+def is_supported(path):
+    return os.path.splitext(path)[1].lower() in SUPPORTED_EXTENSIONS
+
+
+def list_chapters(path, skip_toc=False):
+    """
+    Lists the chapters of any supported book file.
+    Returns (chapters, metadata). EPUB and PDF chapters are LazyChapters,
+    extracted on first access; text formats are read in one streaming pass.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf':
+        return list_chapters_from_pdf(path, skip_toc=skip_toc)
+    if extension == '.epub':
+        return list_chapters_from_epub(path, skip_toc=skip_toc)
+    if extension in SUPPORTED_EXTENSIONS:
+        return list_chapters_from_text(path, skip_toc=skip_toc)
+    raise ValueError("Unsupported file format")
@@ -0,0 +1,102 @@
+"""
+Content-addressed cache of rendered segment audio.
+Each rendered sentence is stored under a hash of everything that affects its
+audio (the text as sent to the model, voice, speed and pause settings). After
+a chapter is edited, only sentences whose key changed need synthesizing
+again; the rest of the book's audio is reused as-is.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+from src.utils.config import RENDER_CACHE_MAX_BYTES
+
+
+class RenderCache:
+    """
+    Maps segment render keys to WAV files in a cache directory.
+    One cache is kept per loaded book and lives until clear() is called.
+    Once its files pass max_bytes, the least recently used are deleted,
+    except those used since reset_stats(): the render in progress needs them.
+    """
+    def __init__(self, directory=None, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.directory = directory or tempfile.mkdtemp(prefix="opennarrator_render_")
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (path, duration, size), oldest first
+        self._in_use = set()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text, voice, speed, sentence_pause=None, comma_pause=None, kind="sentence"):
+        """Returns the cache key for a segment rendered with these settings."""
+        parts = [kind, text, voice, repr(float(speed)), repr(sentence_pause), repr(comma_pause)]
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        """Where the audio for key should be written."""
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def get(self, key):
+        """Returns (path, duration) for a cached render, or None."""
+        entry = self._entries.get(key)
+        if entry is not None and os.path.exists(entry[0]):
+            self.hits += 1
+            self._entries.move_to_end(key)
+            self._in_use.add(key)
+            return entry[:2]
+        self.misses += 1
+        return None
+
+    def add(self, key, path, duration):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[2]
+        self._entries[key] = (path, duration, size)
+        self._in_use.add(key)
+        self.size += size
+        self.evict()
+
+    def evict(self):
+        """Deletes least recently used audio until the cache fits max_bytes."""
+        for key in list(self._entries):
+            if self.size <= self.max_bytes:
+                break
+            if key in self._in_use:
+                continue
+            path, _, size = self._entries.pop(key)
+            self.size -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def reset_stats(self):
+        """Called as a render starts; what the last one used may now be evicted."""
+        self.hits = 0
+        self.misses = 0
+        self._in_use.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Deletes all cached audio."""
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def close(self):
+        """Deletes all cached audio and the cache directory."""
+        self._entries.clear()
+        self._in_use.clear()
+        self.size = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,105 @@
+"""
+Fast English sentence segmenter.
+Most sentence boundaries are unambiguous: a lone '.', '!' or '?' after an
+ordinary word, followed by a space and a letter. Those are found with one
+precompiled regex. Stretches of text containing anything harder
+(abbreviations, initials, numbers, quotes, brackets, ellipses) are handed to
+pysbd, whose rules handle them properly. Boundaries match pysbd's output
+format: each sentence keeps its trailing whitespace.
+"""
+
+import re
+import threading
+
+import pysbd
+
+# Words that are commonly abbreviated with a trailing period. A period after
+# one of these may or may not end the sentence, so pysbd decides.
+ABBREVIATIONS = frozenset([
+    'adj', 'adm', 'adv', 'al', 'approx', 'apr', 'art', 'assn', 'asst', 'aug',
+    'ave', 'bldg', 'blvd', 'bros', 'ca', 'capt', 'cf', 'ch', 'chap', 'cmdr',
+    'co', 'col', 'corp', 'cpl', 'cpt', 'ct', 'dec', 'dept', 'det', 'dist',
+    'div', 'dr', 'ed', 'eds', 'esp', 'est', 'et', 'etc', 'ext', 'feb', 'fig',
+    'figs', 'fr', 'ft', 'gen', 'gov', 'hon', 'hr', 'hrs', 'inc', 'jan', 'jr',
+    'jul', 'jun', 'lt', 'ltd', 'maj', 'mar', 'messrs', 'min', 'misc', 'mr',
+    'mrs', 'ms', 'mt', 'no', 'nos', 'nov', 'oct', 'op', 'p', 'pp', 'ph',
+    'pl', 'prof', 'pt', 'rd', 'rep', 'reps', 'rev', 'sen', 'sens', 'sep',
+    'sept', 'sgt', 'sr', 'st', 'supt', 'trans', 'univ', 'v', 'viz', 'vol',
+    'vols', 'vs',
+])
+
+# A terminator, any closing quotes/brackets, then whitespace
+_BOUNDARY_RE = re.compile(r'([.!?]+)(["\')\]]*)(\s+)')
+# An ordinary word, possibly opened by a quote or bracket
+_PLAIN_WORD_RE = re.compile(r'["\'(\[]?([A-Za-z]+)')
+_TERMINATOR_RE = re.compile(r'[.!?]')
+
+_local = threading.local()
+
+
+def get_pysbd_segmenter(language='en'):
+    """
+    Returns this thread's pysbd segmenter. Building one is expensive, but
+    segment() keeps the text on the instance, so threads can't share one.
+    """
+    segmenters = getattr(_local, 'segmenters', None)
+    if segmenters is None:
+        segmenters = _local.segmenters = {}
+    if language not in segmenters:
+        segmenters[language] = pysbd.Segmenter(language=language, clean=False)
+    return segmenters[language]
+
+
+def _is_clear_boundary(text, match):
+    """True if pysbd would certainly split at this terminator."""
+    terminator, closers, _ = match.groups()
+    if len(terminator) != 1 or closers:
+        return False
+
+    end = match.end()
+    if end >= len(text) or not text[end].isalpha():
+        return False
+    # pysbd reads "Stop! he said" as one sentence
+    if terminator != '.' and not text[end].isupper():
+        return False
+
+    # The word in front of the terminator must be a plain, non-abbreviated word
+    start = match.start()
+    word_start = text.rfind(' ', 0, start) + 1
+    word = _PLAIN_WORD_RE.fullmatch(text, word_start, start)
+    if word is None:
+        return False
+    word = word.group(1)
+    return len(word) > 1 and word.lower() not in ABBREVIATIONS
+
+
+def segment_sentences(text, language='en'):
+    """
+    Splits text into sentences. Returns the same kind of list as
+    pysbd.Segmenter(clean=False).segment(text).
+    """
+    segmenter = get_pysbd_segmenter(language)
+    if language != 'en':
+        return segmenter.segment(text)
+
+    sentences = []
+    span_start = 0
+    for match in _BOUNDARY_RE.finditer(text):
+        if not _is_clear_boundary(text, match):
+            continue
+
+        # Any other terminator in the span is an ambiguous one
+        end = match.end()
+        if _TERMINATOR_RE.search(text, span_start, match.start()):
+            sentences.extend(segmenter.segment(text[span_start:end]))
+        else:
+            sentences.append(text[span_start:end])
+        span_start = end
+
+    rest = text[span_start:]
+    if rest.strip():
+        if _TERMINATOR_RE.search(rest):
+            sentences.extend(segmenter.segment(rest))
+        else:
+            sentences.append(rest)
+    return sentences
@@ -0,0 +1,111 @@
+"""
+In-process pool of inference sessions for parallel synthesis.
+
+Short, latency-bound segments don't keep many intra-op threads busy, so
+instead of one session with all cores we run K sessions with a few threads
+each. Sessions share the loaded model weights (inference only reads them)
+but each has its own pipeline and G2P state, and pulls work from one shared
+queue. Results come back in input order.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.core.synthesizer import AudioSynthesizer
+
+
+def _available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class InferenceSessionPool:
+    """
+    K synthesis sessions served by K threads, each pinned to its own CPUs.
+    Exposes the same synthesize_segments() interface as AudioSynthesizer.
+    """
+    def __init__(self, synthesizer, sessions=2, threads_per_session=None, pin_threads=True):
+        """
+        synthesizer: Loaded AudioSynthesizer; used as the first session and
+                     as the source of model weights for the others.
+        threads_per_session: Intra-op threads per session. Defaults to an
+                             even split of the available CPUs.
+        pin_threads: Pin each session thread to a disjoint set of CPUs
+                     (Linux only; ignored elsewhere).
+        """
+        cpus = _available_cpus()
+        if threads_per_session is None:
+            threads_per_session = max(1, len(cpus) // sessions)
+        self.sessions = sessions
+        self.threads_per_session = threads_per_session
+
+        self._sessions = queue.SimpleQueue()
+        self._sessions.put(synthesizer)
+        for _ in range(sessions - 1):
+            self._sessions.put(AudioSynthesizer(
+                device=synthesizer.device,
+                model=synthesizer.pipeline.model,
+                voices=synthesizer.pipeline.voices,
+                threads=threads_per_session
+            ))
+
+        # Disjoint CPU sets, one per session, while there are enough CPUs
+        self._cpu_sets = queue.SimpleQueue()
+        for i in range(sessions):
+            cpu_set = cpus[i * threads_per_session:(i + 1) * threads_per_session]
+            self._cpu_sets.put(cpu_set if pin_threads else [])
+
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=sessions,
+            thread_name_prefix="tts-session",
+            initializer=self._init_session
+        )
+
+    def _init_session(self):
+        import torch
+
+        # Each thread owns one session for its whole lifetime
+        self._local.synthesizer = self._sessions.get()
+
+        # With OpenMP builds the thread count is per calling thread
+        torch.set_num_threads(self.threads_per_session)
+
+        cpu_set = self._cpu_sets.get()
+        if cpu_set and hasattr(os, 'sched_setaffinity'):
+            try:
+                # pid 0 applies to the calling thread only
+                os.sched_setaffinity(0, cpu_set)
+            except OSError:
+                pass
+
+    def _synthesize(self, task):
+        text, voice_name, speed = task
+        try:
+            return self._local.synthesizer.synthesize_segment(text, voice_name=voice_name, speed=speed)
+        except Exception as e:
+            print(f"Error synthesizing text: {text[:50]}... Error: {e}")
+            return np.array([], dtype=np.float32), 24000
+
+    def synthesize_segments(self, segments, voice_name='af_sarah', speed=1.0):
+        """
+        Synthesizes segments across the sessions, yielding (audio, sample_rate)
+        in input order. Failed segments yield an empty array. Closing the
+        generator early cancels segments that have not started yet.
+        """
+        tasks = [(text, voice_name, speed) for text in segments]
+        yield from self._executor.map(self._synthesize, tasks)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
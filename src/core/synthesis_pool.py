@@ -0,0 +1,99 @@
+"""
+Multi-process synthesis that shares one copy of the Kokoro weights.
+
+The parent process loads the model once. On platforms that can fork, workers
+inherit it copy-on-write; elsewhere the weights are moved into shared memory
+and handed to spawned workers by handle. Either way N workers use about one
+model's worth of resident memory instead of N.
+"""
+
+import gc
+import multiprocessing
+
+import numpy as np
+import torch.multiprocessing as torch_mp
+
+from src.core.synthesizer import AudioSynthesizer
+
+# Synthesizer used inside each worker process
+_worker_synthesizer = None
+
+
+def _init_worker(model, voices, threads):
+    global _worker_synthesizer
+
+    # Keep each worker single-threaded by default so N workers don't
+    # oversubscribe the CPU (and libgomp never runs in a forked child)
+    import torch
+    torch.set_num_threads(threads)
+
+    if model is None:
+        # Forked: the parent's synthesizer was inherited copy-on-write
+        return
+
+    _worker_synthesizer = AudioSynthesizer(device='cpu', model=model, voices=voices, threads=threads)
+
+
+def _synthesize(task):
+    text, voice_name, speed = task
+    try:
+        return _worker_synthesizer.synthesize_segment(text, voice_name=voice_name, speed=speed)
+    except Exception:
+        return np.array([], dtype=np.float32), 24000
+
+
+class SynthesisProcessPool:
+    """
+    Pool of synthesis worker processes backed by a single shared model.
+    Exposes the same synthesize_segments() interface as AudioSynthesizer.
+    """
+    def __init__(self, synthesizer, processes=2, voices=(), threads_per_worker=1, start_method=None):
+        """
+        synthesizer: CPU AudioSynthesizer whose weights the workers will share.
+        voices: Voice names to preload so their packs are shared as well.
+        start_method: 'fork' or 'spawn'. Defaults to fork where available.
+        """
+        global _worker_synthesizer
+
+        model, shared_voices = synthesizer.share_memory(voices)
+
+        if start_method is None:
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.start_method = start_method
+
+        if start_method == 'fork':
+            # Children inherit the loaded synthesizer. Freezing the GC keeps
+            # collections in the children from dirtying the inherited pages.
+            _worker_synthesizer = synthesizer
+            gc.freeze()
+            initargs = (None, None, threads_per_worker)
+        else:
+            # torch.multiprocessing pickles shared-memory tensors by handle
+            initargs = (model, shared_voices, threads_per_worker)
+
+        context = torch_mp.get_context(start_method)
+        self._pool = context.Pool(processes, initializer=_init_worker, initargs=initargs)
+        self.processes = processes
+
+    def synthesize_segments(self, segments, voice_name='af_sarah', speed=1.0):
+        """
+        Synthesizes segments across the workers, yielding (audio, sample_rate)
+        in input order. Failed segments yield an empty array.
+        """
+        tasks = ((text, voice_name, speed) for text in segments)
+        yield from self._pool.imap(_synthesize, tasks)
+
+    def worker_pids(self):
+        return [process.pid for process in self._pool._pool]
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+        if self.start_method == 'fork':
+            gc.unfreeze()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -4,17 +4,36 @@ import os
 import numpy as np
 import torch
 from src.utils.config import KOKORO_MODEL_PATH, VOICES_BIN_PATH
+from src.utils.host_profile import load_host_profile
 
 class AudioSynthesizer:
-    def __init__(self):
+    def __init__(self, device=None, model=None, voices=None, threads=None):
+        """
+        model: Optional already-loaded KModel to reuse instead of loading weights
+               (e.g. one placed in shared memory by another process).
+        voices: Optional dict of preloaded voice packs (name -> tensor).
+        threads: Intra-op CPU threads. Defaults to this host's autotuned profile.
+        """
         # Determine device
-        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
         print(f"Initializing Kokoro TTS on {self.device}...")
         
+        if threads is None:
+            threads = load_host_profile()["threads"]
+        if threads and self.device == 'cpu':
+            torch.set_num_threads(threads)
+        
         try:
             # Initialize pipeline for American English
             # lang_code='a' is for American English in Kokoro
-            self.pipeline = KPipeline(lang_code='a', device=self.device, repo_id='hexgrad/Kokoro-82M')
+            self.pipeline = KPipeline(
+                lang_code='a',
+                device=self.device,
+                repo_id='hexgrad/Kokoro-82M',
+                model=model if model is not None else True
+            )
+            if voices:
+                self.pipeline.voices.update(voices)
             print(f"Kokoro initialized successfully on {self.device}")
         except Exception as e:
             print(f"Failed to initialize Kokoro: {e}")
@@ -62,5 +81,36 @@ class AudioSynthesizer:
             print(f"Error synthesizing text: {text[:50]}... Error: {e}")
             raise e
 
+    def synthesize_segments(self, segments, voice_name='af_sarah', speed=1.0):
+        """
+        Synthesizes segments one after another, yielding (audio, sample_rate)
+        in input order. A segment that fails yields an empty array so callers
+        can skip it and keep going.
+        """
+        for text in segments:
+            try:
+                yield self.synthesize_segment(text, voice_name=voice_name, speed=speed)
+            except Exception:
+                yield np.array([], dtype=np.float32), 24000
+
+    def share_memory(self, voice_names=()):
+        """
+        Moves the model weights and voice packs into shared memory so worker
+        processes can map one copy instead of each loading their own.
+        Voices listed in voice_names are loaded first so they are shared too.
+        Returns (model, voices) to hand to other processes.
+        """
+        if self.device != 'cpu':
+            raise RuntimeError("Shared model weights are only supported on CPU")
+        
+        for name in voice_names:
+            self.pipeline.load_voice(name)
+        
+        self.pipeline.model.share_memory()
+        for pack in self.pipeline.voices.values():
+            pack.share_memory_()
+        
+        return self.pipeline.model, dict(self.pipeline.voices)
+
     def save_audio(self, audio, sample_rate, output_path):
         sf.write(output_path, audio, sample_rate)
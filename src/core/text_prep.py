@@ -0,0 +1,171 @@
+"""
+Text preparation service.
+Cleans and segments chapters in parallel across a process pool. Cleaning and
+sentence segmentation are pure-Python CPU work, so threads don't help; each
+chapter is handled by one worker process and results come back in order.
+"""
+
+import re
+
+from src.core.cleaner import clean_text, clean_text_stream, segment_text_stream
+from src.core.extractor import PARALLEL_MIN_BYTES, LazyChapter, PreparedText, pack_chapters
+from src.utils.parallel import imap_processes, map_processes
+
+# Below this much text, pool startup costs more than it saves
+PARALLEL_MIN_CHARS = 200_000
+
+
+def strip_chapter_heading(content, title):
+    """
+    Removes the chapter heading from the start of cleaned chapter content.
+    Since we narrate "Chapter X. Title." separately, the title shouldn't be
+    read again as the first line of the body.
+    """
+    title_clean = clean_text(title).lower().strip()
+
+    # First, check if it starts with "Chapter X" pattern
+    content = re.sub(r'^Chapter\s+\d+[:.]*\s*', '', content, flags=re.IGNORECASE)
+
+    # Now check if remaining content starts with the chapter title
+    # by comparing first ~150 chars
+    first_chunk = content[:min(len(content), 150)].lower()
+
+    # If the title appears in the first chunk, remove everything up to end of title
+    if title_clean and title_clean in first_chunk:
+        idx = first_chunk.find(title_clean)
+        content = content[idx + len(title_clean):].strip()
+
+    # Clean up leading punctuation and whitespace
+    return re.sub(r'^[.,;:\-\s]+', '', content).strip()
+
+
+def strip_title(chunks, title):
+    """
+    Strips the chapter title from the start of cleaned text chunks, if
+    present, to avoid narrating it twice. Only the first chunk can contain it.
+    """
+    chapter_title_clean = clean_text(title)
+    for i, chunk in enumerate(chunks):
+        if i == 0 and chunk.lower().startswith(chapter_title_clean.lower()):
+            chunk = chunk[len(chapter_title_clean):].strip()
+            # Remove leading punctuation if any
+            chunk = chunk.lstrip('.,;:-').strip()
+        yield chunk
+
+
+def _clean_chapter(task):
+    content, title = task
+    return strip_chapter_heading(clean_text(content), title)
+
+
+class CleanedContentLoader:
+    """
+    Wraps a LazyChapter's loader so its content is cleaned, and its heading
+    stripped, as it is loaded.
+    """
+    def __init__(self, loader, title):
+        self.loader = loader
+        self.title = title
+
+    def __call__(self):
+        return _clean_chapter((self.loader(), self.title))
+
+    def __eq__(self, other):
+        return other.__class__ is self.__class__ and vars(other) == vars(self)
+
+
+def _prepare_chapter(task):
+    content, title, max_chars = task
+    chunks = clean_text_stream(content)
+    if title is not None:
+        chunks = strip_title(chunks, title)
+    chunks = [chunk for chunk in chunks if chunk]
+    segments = list(segment_text_stream(chunks, max_chars=max_chars))
+    return " ".join(chunks), segments
+
+
+def _map(func, tasks, total_chars, processes):
+    return map_processes(func, tasks, total_chars, PARALLEL_MIN_CHARS, processes)
+
+
+def _load_chapter(loader):
+    return loader()
+
+
+def _cancelled(is_cancelled):
+    return is_cancelled is not None and is_cancelled()
+
+
+def load_chapters(chapters, processes=None, is_cancelled=None):
+    """
+    Loads the content of lazy chapters that haven't been loaded yet, parsing
+    their documents across a process pool for large books. Their text is
+    then kept together in one shared BookText.
+    is_cancelled: Optional callable, checked after each chapter; once it
+                  returns True the remaining chapters are left unloaded.
+    """
+    pending = [chapter for chapter in chapters if isinstance(chapter, LazyChapter) and not chapter.is_loaded]
+    loaders = [chapter.loader for chapter in pending]
+    total_bytes = sum(chapter.size for chapter in pending)
+    results = imap_processes(_load_chapter, loaders, total_bytes, PARALLEL_MIN_BYTES, processes)
+    loaded = []
+    try:
+        for chapter, content in zip(pending, results):
+            chapter.content = content
+            loaded.append(chapter)
+            if _cancelled(is_cancelled):
+                break
+    finally:
+        # Stops the pool's remaining work on cancel
+        results.close()
+    if loaded:
+        pack_chapters(loaded)
+
+
+def clean_chapters(chapters, processes=None):
+    """
+    Cleans every chapter and strips its heading. Returns the new content
+    for each chapter, in order.
+    processes: Worker processes (default: one per CPU).
+    """
+    load_chapters(chapters, processes)
+    tasks = [(chapter.content, chapter.title) for chapter in chapters]
+    total_chars = sum(chapter.char_count for chapter in chapters)
+    return _map(_clean_chapter, tasks, total_chars, processes)
+
+
+def prepare_chapters(chapters, max_chars=400, strip_titles=True, processes=None, is_cancelled=None):
+    """
+    Cleans and segments every chapter, returning a PreparedText for each,
+    in order. The result is cached on the chapter, so chapters whose content
+    hasn't changed since they were last prepared are not processed again.
+    strip_titles: Drop the chapter title from the start of the body.
+    processes: Worker processes (default: one per CPU).
+    is_cancelled: Optional callable, checked after each chapter; once it
+                  returns True, None is returned. Chapters prepared so far
+                  keep their cached result.
+    """
+    stale = [chapter for chapter in chapters if chapter.get_prepared(max_chars, strip_titles) is None]
+    load_chapters(stale, processes, is_cancelled)
+    if _cancelled(is_cancelled):
+        return None
+
+    tasks = [(chapter.content, chapter.title if strip_titles else None, max_chars) for chapter in stale]
+    total_chars = sum(chapter.char_count for chapter in stale)
+    results = imap_processes(_prepare_chapter, tasks, total_chars, PARALLEL_MIN_CHARS, processes)
+    try:
+        for chapter, (text, segments) in zip(stale, results):
+            chapter.prepared = PreparedText(
+                text=text,
+                segments=segments,
+                char_counts=[len(segment) for segment in segments],
+                source=chapter.source_key,
+                title=chapter.title if strip_titles else None,
+                max_chars=max_chars
+            )
+            if _cancelled(is_cancelled):
+                return None
+    finally:
+        results.close()
+
+    return [chapter.prepared for chapter in chapters]
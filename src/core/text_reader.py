@@ -0,0 +1,401 @@
+"""
+Streaming readers for plain text, Markdown and standalone HTML books.
+Files are read incrementally and split into chapters on headings: "Chapter
+N" style lines in plain text, level 1-2 headings in Markdown and h1/h2 in
+HTML. Chapters are yielded one at a time, as soon as the next heading (or
+the end of the file) is reached, so memory use tracks the largest chapter
+and downstream stages can start before the whole file has been read.
+"""
+
+import html
+import os
+import re
+from html.parser import HTMLParser
+
+from src.core.extractor import Chapter, is_dropped_element, is_skippable, pack_chapters
+
+TEXT_EXTENSIONS = ('.txt',)
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+HTML_EXTENSIONS = ('.html', '.htm', '.xhtml')
+
+# Characters read per chunk when parsing HTML
+READ_CHUNK_CHARS = 256 * 1024
+# Longer lines are body text, whatever they start with
+MAX_HEADING_CHARS = 100
+# A plain text heading is a paragraph of at most this many lines
+MAX_HEADING_LINES = 3
+
+# The heading must be the whole line, save a subtitle after ":", "." or a dash
+# (roman numerals must be well formed, so words like "mild" don't count)
+_TEXT_HEADING_RE = re.compile(
+    r'^(?:(?:chapter|part|book)\s+(?:\d+'
+    r'|(?=[ivxlcdm])m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})'
+    r'|one|two|three|four|five|six|seven|eight|nine|ten|'
+    r'eleven|twelve|thirteen|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|twenty)'
+    r'|prologue|epilogue|introduction|preface|foreword|afterword|interlude)'
+    r'(?:\s*[:.\u2013\u2014-]\s*(.*))?$',
+    re.IGNORECASE
+)
+# Words after the heading that end like a sentence are prose, not a subtitle
+_SENTENCE_END_RE = re.compile(r'[.!?]["\'\u201d\u2019)]*$')
+
+_MD_ATX_RE = re.compile(r'^\s{0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+_MD_SETEXT_RE = re.compile(r'^\s{0,3}(=+|-+)\s*$')
+_MD_FENCE_RE = re.compile(r'^\s{0,3}(```|~~~)')
+_MD_RULE_RE = re.compile(r'^\s{0,3}([-*_])(?:\s*\1){2,}\s*$')
+_MD_REFERENCE_RE = re.compile(r'^\s{0,3}\[[^\]]+\]:\s')
+_MD_FRONT_MATTER_RE = re.compile(r'^(title|author)\s*:\s*(.+?)\s*$', re.IGNORECASE)
+# Inline markup, in the order it is stripped
+_MD_INLINE = [
+    (re.compile(r'^\s{0,3}(?:>\s?)+'), ''),                      # Blockquote markers
+    (re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+'), ''),               # List markers
+    (re.compile(r'!\[[^\]]*\]\([^)]*\)'), ''),                   # Images
+    (re.compile(r'\[([^\]]*)\]\([^)]*\)'), r'\1'),               # Inline links
+    (re.compile(r'\[([^\]]*)\]\[[^\]]*\]'), r'\1'),              # Reference links
+    (re.compile(r'`([^`]*)`'), r'\1'),                           # Inline code
+    # Emphasis; the opening mark can't follow a word character, as in 2*3*4
+    (re.compile(r'(?<![\w*])(\*\*|__|\*|_)(?=\S)(.+?)(?<=\S)\1'), r'\2'),
+    (re.compile(r'<[^>]+>'), ''),                                # Inline HTML
+    (re.compile(r'\\([\\`*_{}\[\]()#+\-.!])'), r'\1'),           # Escapes
+]
+
+_HTML_VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'
+])
+_HTML_CHAPTER_TAGS = ('h1', 'h2')
+
+
+class _ChapterBuilder:
+    """
+    Collects paragraphs between headings and turns them into Chapters.
+    Text before the first heading becomes "Front Matter" (unticked by
+    default), or "Full Text" if the file has no headings at all.
+    """
+    def __init__(self, skip_toc, separator="\n\n"):
+        self.skip_toc = skip_toc
+        self.separator = separator
+        self.title = None
+        self.parts = []
+        self.order = 0
+        self.seen_heading = False
+
+    def add(self, text):
+        if text:
+            self.parts.append(text)
+
+    def heading(self, title):
+        """Starts a new chapter; returns the finished one, if any, as a list."""
+        finished = self._finish("Front Matter")
+        self.title = title
+        self.seen_heading = True
+        return finished
+
+    def end(self):
+        return self._finish("Front Matter" if self.seen_heading else "Full Text")
+
+    def _finish(self, untitled):
+        content = self.separator.join(self.parts).strip()
+        self.parts = []
+        if self.separator == " ":
+            content = re.sub(r' +', ' ', content)
+        if not content:
+            return []
+
+        self.order += 1
+        title = self.title or untitled
+        chapter_is_toc = title == "Front Matter" or is_skippable(title)
+        if self.skip_toc and chapter_is_toc:
+            print(f"Skipping TOC chapter: {title}")
+            return []
+        return [Chapter(title=title, content=content, order=self.order, is_toc=chapter_is_toc)]
+
+
+def _open_text(path):
+    return open(path, encoding='utf-8-sig', errors='replace')
+
+
+def _paragraphs(lines):
+    """Groups lines into paragraphs, split on blank lines."""
+    paragraph = []
+    for line in lines:
+        line = line.rstrip()
+        if line.strip():
+            paragraph.append(line)
+        elif paragraph:
+            yield paragraph
+            paragraph = []
+    if paragraph:
+        yield paragraph
+
+
+def _is_text_heading(paragraph):
+    """Whether a plain text paragraph is a "Chapter N" style heading."""
+    if len(paragraph) > MAX_HEADING_LINES or any(len(line.strip()) > MAX_HEADING_CHARS for line in paragraph):
+        return False
+    match = _TEXT_HEADING_RE.match(paragraph[0].strip())
+    if match is None:
+        return False
+    extra = [match.group(1) or ""] + [line.strip() for line in paragraph[1:]]
+    return not any(text and _SENTENCE_END_RE.search(text) for text in extra)
+
+
+def stream_chapters_from_text(path, skip_toc=False, metadata=None):
+    """
+    Yields the chapters of a plain text file, split on "Chapter N" style
+    heading paragraphs. Hard-wrapped lines are joined back together.
+    metadata: Optional dict, given the file name as title.
+    """
+    if metadata is not None:
+        metadata.setdefault('title', os.path.splitext(os.path.basename(path))[0])
+
+    builder = _ChapterBuilder(skip_toc)
+    with _open_text(path) as f:
+        for paragraph in _paragraphs(f):
+            text = " ".join(line.strip() for line in paragraph)
+            if _is_text_heading(paragraph):
+                yield from builder.heading(text)
+            else:
+                builder.add(text)
+    yield from builder.end()
+
+
+def _markdown_text(lines):
+    """Plain text of a Markdown paragraph."""
+    text_lines = []
+    for line in lines:
+        if _MD_REFERENCE_RE.match(line):
+            continue
+        for pattern, replacement in _MD_INLINE:
+            line = pattern.sub(replacement, line)
+        if line.strip():
+            text_lines.append(line.strip())
+    return html.unescape(" ".join(text_lines))
+
+
+def _markdown_blocks(f, metadata):
+    """
+    Yields ('heading', level, text) and ('text', None, text) for each block
+    of a Markdown file, reading it line by line.
+    """
+    lines = iter(f)
+    first = next(lines, None)
+    if first is None:
+        return
+
+    # YAML front matter: only title and author are read
+    if first.strip() == '---':
+        for line in lines:
+            if line.strip() in ('---', '...'):
+                break
+            match = _MD_FRONT_MATTER_RE.match(line.strip())
+            if match and metadata is not None:
+                metadata[match.group(1).lower()] = match.group(2).strip('\'"')
+        first = None
+
+    paragraph = []
+    # Lines of the fenced code block being read, kept as they are
+    code = None
+
+    def flush():
+        # A paragraph underlined with === or --- is a setext heading
+        if len(paragraph) >= 2 and _MD_SETEXT_RE.match(paragraph[-1]):
+            level = 1 if paragraph[-1].strip()[0] == '=' else 2
+            block = ('heading', level, _markdown_text(paragraph[:-1]))
+        else:
+            block = ('text', None, _markdown_text(paragraph))
+        paragraph.clear()
+        return block
+
+    def all_lines():
+        if first is not None:
+            yield first
+        yield from lines
+
+    for line in all_lines():
+        line = line.rstrip('\n')
+        if _MD_FENCE_RE.match(line):
+            # Code is kept as text; only the fences go
+            if code is None:
+                if paragraph:
+                    yield flush()
+                code = []
+            else:
+                yield ('text', None, " ".join(code))
+                code = None
+            continue
+        if code is not None:
+            if line.strip():
+                code.append(line.strip())
+            continue
+
+        if paragraph and _MD_SETEXT_RE.match(line):
+            paragraph.append(line)
+            yield flush()
+            continue
+        atx = _MD_ATX_RE.match(line)
+        if atx or not line.strip() or _MD_RULE_RE.match(line):
+            if paragraph:
+                yield flush()
+            if atx:
+                yield ('heading', len(atx.group(1)), _markdown_text([atx.group(2)]))
+            continue
+        paragraph.append(line)
+    if paragraph:
+        yield flush()
+    if code:
+        yield ('text', None, " ".join(code))
+
+
+def stream_chapters_from_markdown(path, skip_toc=False, metadata=None):
+    """
+    Yields the chapters of a Markdown file, split on level 1 and 2 headings.
+    Deeper headings stay in the text; markup is stripped.
+    metadata: Optional dict, filled in from YAML front matter (title,
+              author) or else given the file name as title.
+    """
+    if metadata is not None:
+        metadata['title'] = os.path.splitext(os.path.basename(path))[0]
+
+    builder = _ChapterBuilder(skip_toc)
+    with _open_text(path) as f:
+        for kind, level, text in _markdown_blocks(f, metadata):
+            if kind == 'heading' and level <= 2:
+                yield from builder.heading(text)
+            else:
+                builder.add(text)
+    yield from builder.end()
+
+
+class _HtmlChapterParser(HTMLParser):
+    """
+    Splits HTML fed to it in chunks into chapters at h1/h2 headings, with
+    the same drop rules as EPUB documents. Finished chapters collect in
+    `ready`.
+    """
+    def __init__(self, builder, metadata):
+        super().__init__(convert_charrefs=True)
+        self.builder = builder
+        self.metadata = metadata
+        self.ready = []
+        # (tag, nesting depth) of the dropped element being skipped
+        self.dropped = None
+        self.in_head = False
+        self.title_parts = None
+        self.heading_parts = None
+        # Text arrives in pieces split at chunk boundaries; a text node is
+        # complete at the next tag
+        self.text_parts = []
+
+    def flush_text(self):
+        text = "".join(self.text_parts).strip()
+        self.text_parts = []
+        if not text:
+            return
+        if self.heading_parts is not None:
+            self.heading_parts.append(text)
+        else:
+            self.builder.add(text)
+
+    def handle_starttag(self, tag, attrs):
+        self.flush_text()
+        if self.dropped is not None:
+            if tag == self.dropped[0]:
+                self.dropped = (tag, self.dropped[1] + 1)
+            return
+        attrs = dict(attrs)
+        if tag in _HTML_VOID_TAGS:
+            if tag == 'meta' and self.in_head and (attrs.get('name') or '').lower() == 'author':
+                self._set_metadata('author', attrs.get('content'))
+            return
+        if is_dropped_element(tag, attrs.get('class'), attrs.get('id')):
+            self.dropped = (tag, 1)
+        elif tag == 'head':
+            self.in_head = True
+        elif tag == 'title' and self.in_head:
+            self.title_parts = []
+        elif tag == 'body':
+            self.in_head = False
+        elif tag in _HTML_CHAPTER_TAGS and self.heading_parts is None:
+            self.heading_parts = []
+
+    def handle_endtag(self, tag):
+        self.flush_text()
+        if self.dropped is not None:
+            if tag == self.dropped[0]:
+                depth = self.dropped[1] - 1
+                self.dropped = (tag, depth) if depth else None
+            return
+        if tag == 'head':
+            self.in_head = False
+        elif tag == 'title' and self.title_parts is not None:
+            self._set_metadata('title', " ".join("".join(self.title_parts).split()))
+            self.title_parts = None
+        elif tag in _HTML_CHAPTER_TAGS and self.heading_parts is not None:
+            title = " ".join(" ".join(self.heading_parts).split())
+            self.heading_parts = None
+            self.ready.extend(self.builder.heading(title or None))
+
+    def handle_data(self, data):
+        if self.dropped is not None:
+            return
+        if self.title_parts is not None:
+            self.title_parts.append(data)
+        elif not self.in_head:
+            self.text_parts.append(data)
+
+    def handle_comment(self, data):
+        self.flush_text()
+
+    def _set_metadata(self, key, value):
+        if self.metadata is not None and value:
+            self.metadata.setdefault(key, value)
+
+
+def stream_chapters_from_html(path, skip_toc=False, metadata=None):
+    """
+    Yields the chapters of a standalone HTML file, split on h1/h2 headings.
+    Scripts, styles and image-related elements are dropped like in EPUBs.
+    metadata: Optional dict, filled in from <title> and <meta name="author">.
+    """
+    builder = _ChapterBuilder(skip_toc, separator=" ")
+    parser = _HtmlChapterParser(builder, metadata)
+    with _open_text(path) as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_CHARS), ""):
+            parser.feed(chunk)
+            yield from parser.ready
+            parser.ready.clear()
+    parser.close()
+    parser.flush_text()
+    yield from parser.ready
+    yield from builder.end()
+
+
+def stream_chapters(path, skip_toc=False, metadata=None):
+    """
+    Yields the chapters of a plain text, Markdown or HTML file, picking the
+    reader by file extension.
+    metadata: Optional dict, filled in with whatever title and author the
+              file gives.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension in TEXT_EXTENSIONS:
+        return stream_chapters_from_text(path, skip_toc, metadata)
+    if extension in MARKDOWN_EXTENSIONS:
+        return stream_chapters_from_markdown(path, skip_toc, metadata)
+    if extension in HTML_EXTENSIONS:
+        return stream_chapters_from_html(path, skip_toc, metadata)
+    raise ValueError(f"Unsupported file format: {extension}")
+
+
+def list_chapters_from_text(path, skip_toc=False):
+    """
+    Reads all chapters of a plain text, Markdown or HTML file.
+    Returns (chapters, metadata) like list_chapters_from_epub().
+    """
+    metadata = {}
+    chapters = list(stream_chapters(path, skip_toc, metadata))
+    pack_chapters(chapters)
+    return chapters, metadata
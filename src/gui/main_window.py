@@ -11,6 +11,8 @@ from src.gui.widgets.text_editor import ChapterEditor
 from src.gui.widgets.metadata_panel import MetadataPanel
 from src.gui.widgets.pronunciation_dialog import PronunciationDialog
 from src.gui.workers import ExtractionWorker, SynthesisWorker, MetadataWorker, WordDetectionWorker
+from src.core.render_cache import RenderCache
+from src.core.readers import SUPPORTED_EXTENSIONS
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -22,9 +24,13 @@ class MainWindow(QMainWindow):
         self.current_file = None
         self.chapters = []
         self.worker = None
+        self.extraction_worker = None
         self.metadata = {}
         self.metadata_worker = None
         self.pronunciation_corrections = {}  # word -> phonetic_spelling
+        self.render_cache = None  # Rendered sentence audio for the loaded book
+        # Caches of earlier books, kept until the conversion using them ends
+        self.retired_render_caches = []
         
         self.setup_ui()
 
@@ -168,7 +174,7 @@ class MainWindow(QMainWindow):
 
     def browse_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select eBook", "", "eBook Files (*.epub *.pdf);;All Files (*)"
+            self, "Select eBook", "", f"eBook Files ({' '.join('*' + ext for ext in SUPPORTED_EXTENSIONS)});;All Files (*)"
         )
         if file_path:
             self.handle_file_drop(file_path)
@@ -178,20 +184,34 @@ class MainWindow(QMainWindow):
         self.log(f"Loading file: {file_path}")
         self.drop_zone.label.setText("Loading chapters...")
         
-        # Start extraction
-        self.worker = ExtractionWorker(file_path)
-        self.worker.finished.connect(self.on_extraction_finished)
-        self.worker.error.connect(self.on_worker_error)
-        self.worker.start()
+        # Start extraction. The previous book's worker may still be
+        # caching it in the background.
+        self.stop_extraction()
+        self.extraction_worker = ExtractionWorker(file_path)
+        self.extraction_worker.finished.connect(self.on_extraction_finished)
+        self.extraction_worker.error.connect(self.on_worker_error)
+        self.extraction_worker.start()
+
+    def stop_extraction(self):
+        """Stops a running extraction worker, including background caching."""
+        if self.extraction_worker is not None and self.extraction_worker.isRunning():
+            # Its results are no longer wanted
+            self.extraction_worker.blockSignals(True)
+            self.extraction_worker.requestInterruption()
+            self.extraction_worker.wait()
 
     def on_extraction_finished(self, chapters, metadata):
         self.chapters = chapters
         self.metadata = metadata
+        # Rendered audio from the previous book can't be reused
+        if self.render_cache is not None:
+            self.retired_render_caches.append(self.render_cache)
+        self.render_cache = RenderCache()
+        self.release_render_caches()
         self.chapter_list.set_chapters(chapters)
         self.log(f"Extracted {len(chapters)} chapters.")
         self.log(f"Title: {metadata.get('title', 'Unknown')}")
         self.drop_zone.label.setText(f"Loaded:\n{os.path.basename(self.current_file)}")
-        self.worker = None
         
         # Enable pronunciation check button
         self.btn_pronunciations.setEnabled(True)
@@ -233,6 +253,8 @@ class MainWindow(QMainWindow):
     def on_chapter_text_updated(self, index, new_text):
         if 0 <= index < len(self.chapters):
             self.chapters[index].content = new_text
+            # Edited text must be cleaned and segmented again
+            self.chapters[index].prepared = None
             # Update char count in list
             self.chapter_list.set_chapters(self.chapters) # Refresh list to show new counts
             # Re-select the item
@@ -280,16 +302,26 @@ class MainWindow(QMainWindow):
         self.btn_convert.setStyleSheet("background-color: #f44747;") # Red for cancel
         self.progress_bar.setValue(0)
         
+        # Title and author as entered in the metadata panel, else as extracted
+        panel_metadata = self.metadata_panel.get_metadata()
+        metadata = dict(getattr(self, 'metadata', {}))
+        for key in ('title', 'author'):
+            if panel_metadata.get(key):
+                metadata[key] = panel_metadata[key]
+
         # Start synthesis
         self.worker = SynthesisWorker(
             selected_chapters, 
             output_path, 
             settings['voice'], 
             settings['speed'],
-            metadata=getattr(self, 'metadata', {}),
+            metadata=metadata,
             sentence_pause=settings.get('sentence_pause', 0.4),
             comma_pause=settings.get('comma_pause'),
-            pronunciation_corrections=self.pronunciation_corrections
+            pronunciation_corrections=self.pronunciation_corrections,
+            sessions=settings.get('sessions', 1),
+            render_cache=self.render_cache,
+            cover_path=panel_metadata.get('cover_path')
         )
         self.worker.progress_update.connect(self.update_progress)
         self.worker.eta_update.connect(self.lbl_eta.setText)
@@ -338,6 +370,7 @@ class MainWindow(QMainWindow):
         self.reset_ui_state()
         self.progress_bar.setFormat("Done!")
         self.worker = None
+        self.release_render_caches()
         QMessageBox.information(self, "Success", "Audiobook created successfully!")
 
     def on_conversion_cancelled(self, partial_file_path):
@@ -347,6 +380,7 @@ class MainWindow(QMainWindow):
             
         self.reset_ui_state()
         self.worker = None
+        self.release_render_caches()
         
         # Prompt user
         reply = QMessageBox.question(
@@ -375,10 +409,36 @@ class MainWindow(QMainWindow):
         self.log(f"Error: {error_msg}")
         self.reset_ui_state()
         self.worker = None
+        self.release_render_caches()
         # Don't show popup if just cancelled (handled via log)
         if "cancelled" not in error_msg.lower():
             QMessageBox.critical(self, "Error", error_msg)
 
+    def release_render_caches(self):
+        """
+        Deletes the render caches of earlier books, unless a conversion is
+        still running: it may be writing to and reading from one of them.
+        """
+        if self.worker is not None and self.worker.isRunning():
+            return
+        for cache in self.retired_render_caches:
+            cache.close()
+        self.retired_render_caches = []
+
+    def closeEvent(self, event):
+        self.stop_extraction()
+        if self.worker is not None and self.worker.isRunning():
+            # Stop the conversion before deleting the audio it uses
+            self.worker.blockSignals(True)
+            self.worker.cancel()
+            self.worker.wait()
+        self.worker = None
+        if self.render_cache is not None:
+            self.retired_render_caches.append(self.render_cache)
+            self.render_cache = None
+        self.release_render_caches()
+        super().closeEvent(event)
+
     def reset_ui_state(self):
         self.btn_convert.setText("Convert to Audiobook")
         self.btn_convert.setStyleSheet("") # Reset style
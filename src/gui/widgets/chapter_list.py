@@ -1,5 +1,6 @@
 from PySide6.QtWidgets import QListWidget, QListWidgetItem, QWidget, QVBoxLayout, QCheckBox, QHBoxLayout, QPushButton, QLabel, QProgressBar, QLineEdit
 from PySide6.QtCore import Qt, Signal
+from src.core.extractor import chapter_size_label
 
 class ChapterList(QWidget):
     selection_changed = Signal()
@@ -115,8 +116,8 @@ class ChapterList(QWidget):
             w_layout.addWidget(checkbox)
             w_layout.addWidget(title_edit, stretch=1)
             
-            # Add character count
-            count_label = QLabel(f"{len(chapter.content)} chars")
+            # Add character count (file size until the chapter is loaded)
+            count_label = QLabel(chapter_size_label(chapter))
             count_label.setStyleSheet("color: #aaaaaa; font-size: 11px; background-color: transparent;")
             w_layout.addWidget(count_label)
             
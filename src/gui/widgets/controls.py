@@ -8,6 +8,7 @@ import soundfile as sf
 from src.utils.config import VOICES_BIN_PATH, PREVIEW_TEXT
 from src.core.synthesizer import AudioSynthesizer
 from src.utils.gpu import get_gpu_info
+from src.utils.host_profile import load_host_profile
 
 class PreviewWorker(QThread):
     finished = Signal()
@@ -145,6 +146,14 @@ class Controls(QWidget):
         self.spin_comma_pause.setSingleStep(10)
         layout.addWidget(self.spin_comma_pause)
         
+        # Parallel inference sessions (sharing one copy of the model)
+        layout.addWidget(QLabel("Inference Sessions"))
+        self.spin_sessions = QSpinBox()
+        self.spin_sessions.setRange(1, max(1, os.cpu_count() or 1))
+        self.spin_sessions.setValue(load_host_profile()["sessions"])  # Default: autotuned for this host
+        self.spin_sessions.setToolTip("Run several synthesis sessions in parallel. Helps on many-core CPUs.")
+        layout.addWidget(self.spin_sessions)
+        
         # Voice Preview Button (large green)
         self.btn_preview = QPushButton("Voice Preview")
         self.btn_preview.setMinimumHeight(35)
@@ -279,5 +288,6 @@ class Controls(QWidget):
             "voice": self.voice_data.get(friendly, "af_sky"),
             "speed": self.speed_spin.value(),
             "sentence_pause": sentence_pause,
-            "comma_pause": comma_pause
+            "comma_pause": comma_pause,
+            "sessions": self.spin_sessions.value()
         }
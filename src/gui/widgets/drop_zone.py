@@ -3,6 +3,8 @@ from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QDragEnterEvent, QDropEvent
 import os
 
+from src.core.readers import is_supported
+
 class DropZone(QWidget):
     file_dropped = Signal(str)  # Emits file path
     browse_requested = Signal()
@@ -17,7 +19,7 @@ class DropZone(QWidget):
         layout = QVBoxLayout(self)
         layout.setAlignment(Qt.AlignCenter)
 
-        self.label = QLabel("Drag & Drop PDF or EPUB here\nor click to browse")
+        self.label = QLabel("Drag & Drop an EPUB, PDF, text or HTML file here\nor click to browse")
         self.label.setAlignment(Qt.AlignCenter)
         self.label.setStyleSheet("color: #858585; font-size: 16px; font-weight: bold;")
         
@@ -51,7 +53,7 @@ class DropZone(QWidget):
             urls = event.mimeData().urls()
             if len(urls) == 1:
                 file_path = urls[0].toLocalFile()
-                if file_path.lower().endswith(('.pdf', '.epub')):
+                if is_supported(file_path):
                     event.acceptProposedAction()
                     self.setStyleSheet("QWidget#DropZone { border-color: #007acc; background-color: #2a2d2e; }")
                     return
@@ -5,66 +5,91 @@ import tempfile
 import shutil
 import torch
 import numpy as np
-from src.core.extractor import extract_chapters_from_pdf, extract_chapters_from_epub
-from src.core.cleaner import clean_text, segment_text
+from src.core.extractor import LazyChapter, joined_text
+from src.core.readers import list_chapters
+from src.core.extraction_cache import ExtractionCache
+from src.core.text_prep import CleanedContentLoader, clean_chapters, prepare_chapters
 from src.core.synthesizer import AudioSynthesizer
-from src.core.audio_builder import M4BBuilder
+from src.core.audio_builder import ChapterEncoder, M4BBuilder
 from src.utils.audio_utils import trim_silence, create_silence
 from src.core.metadata import search_metadata, download_and_process_cover
+from src.utils.config import M4B_ASSEMBLY_MODE
+from src.utils.host_profile import load_host_profile
 
 class ExtractionWorker(QThread):
     finished = Signal(list, dict) # Emits (chapters, metadata)
     error = Signal(str)
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, use_cache=True):
         super().__init__()
         self.file_path = file_path
+        self.use_cache = use_cache
 
     def run(self):
+        cache = ExtractionCache() if self.use_cache else None
         try:
-            if self.file_path.lower().endswith(".pdf"):
-                chapters, metadata = extract_chapters_from_pdf(self.file_path)
-            elif self.file_path.lower().endswith(".epub"):
-                # Don't skip TOC here, let user decide in GUI
-                chapters, metadata = extract_chapters_from_epub(self.file_path, skip_toc=False)
-            else:
-                raise ValueError("Unsupported file format")
+            if cache is not None:
+                key = ExtractionCache.key(self.file_path, "cleaned")
+                cached = cache.load(key)
+                if cached is not None:
+                    self.finished.emit(*cached)
+                    return
+
+            # Don't skip TOC here, let user decide in GUI
+            chapters, metadata = list_chapters(self.file_path, skip_toc=False)
             
-            # Clean chapter content immediately so user sees cleaned text in GUI
+            # Clean chapter content immediately so user sees cleaned text in GUI.
+            # The chapter heading is stripped too, since we narrate
+            # "Chapter X. Title." separately. Chapters that haven't been
+            # loaded yet are cleaned when their content is first accessed.
+            loaded = []
             for chapter in chapters:
-                chapter.content = clean_text(chapter.content)
-                
-                # Strip chapter title from body - it's always the first line/segment
-                # Since we narrate "Chapter X. Title." separately, remove the title from body
-                import re
-                
-                content = chapter.content
-                title_clean = clean_text(chapter.title).lower().strip()
-                
-                # The title is typically the first sentence or first line
-                # Check if content starts with something that looks like a title
-                
-                # Try to find and remove the title from the beginning
-                # First, check if it starts with "Chapter X" pattern
-                content = re.sub(r'^Chapter\s+\d+[:.]*\s*', '', content, flags=re.IGNORECASE)
-                
-                # Now check if remaining content starts with the chapter title
-                # by comparing first ~100 chars
-                first_chunk = content[:min(len(content), 150)].lower()
-                
-                # If the title appears in the first chunk, remove everything up to end of title
-                if title_clean and title_clean in first_chunk:
-                    idx = first_chunk.find(title_clean)
-                    content = content[idx + len(title_clean):].strip()
-                
-                # Clean up leading punctuation and whitespace
-                content = re.sub(r'^[.,;:\-\s]+', '', content).strip()
-                
+                if isinstance(chapter, LazyChapter) and not chapter.is_loaded:
+                    chapter.loader = CleanedContentLoader(chapter.loader, chapter.title)
+                else:
+                    loaded.append(chapter)
+            for chapter, content in zip(loaded, clean_chapters(loaded)):
                 chapter.content = content
+
+            # Snapshot for the cache before the user can edit anything
+            rows = [
+                (
+                    chapter.title,
+                    chapter.loader if isinstance(chapter, LazyChapter) and not chapter.is_loaded else chapter.content,
+                    chapter.order,
+                    chapter.is_toc,
+                    chapter.removed_chars
+                )
+                for chapter in chapters
+            ]
+            snapshot = dict(metadata)
             
             self.finished.emit(chapters, metadata)
         except Exception as e:
             self.error.emit(str(e))
+            return
+
+        if cache is not None:
+            self.fill_cache(cache, key, rows, snapshot)
+
+    def fill_cache(self, cache, key, rows, metadata):
+        """
+        Extracts the chapters not loaded yet and caches the whole book, after
+        the chapter list has been shown. Loaders are called directly, so
+        chapters the user may already be editing are left alone.
+        Stops early if interruption is requested.
+        """
+        try:
+            book = []
+            for title, content, order, is_toc, removed_chars in rows:
+                if self.isInterruptionRequested():
+                    return
+                if callable(content):
+                    content = content()
+                book.append((title, content, order, is_toc, removed_chars))
+            cache.store(key, book, metadata)
+        except Exception as e:
+            print(f"Could not cache extracted book: {e}")
 
 class MetadataWorker(QThread):
     """Worker thread for fetching book metadata from online sources."""
@@ -111,16 +136,15 @@ class WordDetectionWorker(QThread):
     def run(self):
         try:
             from src.utils.pronunciation import find_difficult_words
-            import pysbd
+            from src.core.segmenter import segment_sentences
             
-            # Combine all chapter text
-            all_text = "\n\n".join([chapter.content for chapter in self.chapters])
+            # Combine all chapter text, decoding the shared book text in one go
+            all_text = joined_text(self.chapters, "\n\n")
             
             self.status.emit("Segmenting text into sentences...")
             
             # Segment into sentences for progress tracking
-            segmenter = pysbd.Segmenter(language="en", clean=False)
-            sentences = segmenter.segment(all_text)
+            sentences = segment_sentences(all_text)
             total_sentences = len(sentences)
             
             self.status.emit(f"Scanning {total_sentences} sentences for difficult words...")
@@ -170,7 +194,6 @@ class WordDetectionWorker(QThread):
         except Exception as e:
             self.error.emit(str(e))
 
-
 class SynthesisWorker(QThread):
     progress_update = Signal(int, int) # current, total
     eta_update = Signal(str) # "MM:SS remaining"
@@ -181,7 +204,7 @@ class SynthesisWorker(QThread):
     error = Signal(str)
     cancelled = Signal(str) # Emits partial file path when cancelled
 
-    def __init__(self, chapters, output_path, voice, speed, metadata=None, sentence_pause=0.4, comma_pause=None, pronunciation_corrections=None):
+    def __init__(self, chapters, output_path, voice, speed, metadata=None, sentence_pause=0.4, comma_pause=None, pronunciation_corrections=None, sessions=None, render_cache=None, assembly=M4B_ASSEMBLY_MODE, cover_path=None):
         super().__init__()
         self.chapters = chapters
         self.output_path = output_path
@@ -191,16 +214,67 @@ class SynthesisWorker(QThread):
         self.sentence_pause = sentence_pause
         self.comma_pause = comma_pause
         self.pronunciation_corrections = pronunciation_corrections or {}
+        # Audio from earlier conversions of this book, reused for unchanged sentences
+        self.render_cache = render_cache
+        # "parallel" or "single" M4B assembly (see M4B_ASSEMBLY_MODE); the
+        # GUI assembles "inprocess" books in parallel too
+        self.assembly = assembly
+        # Cover art muxed into the M4B
+        self.cover_path = cover_path
+        
+        # Unset performance settings come from this host's autotuned profile
+        profile = load_host_profile()
+        self.sessions = sessions or profile["sessions"]
+        self.session_threads = profile["threads"]
+        self.max_chars = profile["max_chars"]
         self._is_cancelled = False
 
     def cancel(self):
         self._is_cancelled = True
 
+    def _split_phrases(self, sentence):
+        """
+        Splits a sentence into (phrase, pause_after) units. With a custom comma
+        pause each comma phrase is synthesized separately so the pause length
+        can be controlled; otherwise the sentence is a single unit.
+        """
+        if self.comma_pause is None:
+            return [(sentence, False)]
+        
+        import re
+        parts = re.split(r'(,)', sentence)
+        
+        phrases = []
+        current_phrase = ""
+        
+        for part in parts:
+            current_phrase += part
+            if ',' in part or part == parts[-1]: # End of phrase or end of sentence
+                if not current_phrase.strip():
+                    continue
+                
+                # Comma phrases (but not the very end) get a custom pause after them
+                phrases.append((current_phrase, ',' in part and part != parts[-1]))
+                current_phrase = ""
+        
+        return phrases
+
+    def _tags(self):
+        """Title, author and cover art for the M4B, as given in the metadata."""
+        return dict(
+            title=self.metadata.get('title') or os.path.splitext(os.path.basename(self.output_path))[0],
+            author=self.metadata.get('author') or "OpenNarrator",
+            cover_image_path=self.cover_path
+        )
+
     def run(self):
         temp_dir = tempfile.mkdtemp()
         all_audio_files = []
         chapter_metadata = []
         current_timestamp = 0.0
+        session_pool = None
+        # Encodes each chapter while the next ones are synthesized
+        encoder = ChapterEncoder(temp_dir) if self.assembly != "single" else None
         
         start_time = time.time()
         total_chapters = len(self.chapters)
@@ -209,6 +283,12 @@ class SynthesisWorker(QThread):
             # Initialize Synthesizer
             self.log_message.emit("Initializing synthesizer...")
             synthesizer = AudioSynthesizer()
+            engine = synthesizer
+            if self.sessions > 1:
+                from src.core.session_pool import InferenceSessionPool
+                session_pool = InferenceSessionPool(synthesizer, sessions=self.sessions, threads_per_session=self.session_threads)
+                engine = session_pool
+                self.log_message.emit(f"Using {self.sessions} inference sessions with {session_pool.threads_per_session} threads each")
             
             # 1. Synthesize Intro Announcement
             if self.metadata.get('title'):
@@ -232,25 +312,34 @@ class SynthesisWorker(QThread):
                     
                     all_audio_files.append(output_wav)
                     current_timestamp += duration
+                    if encoder is not None:
+                        # Part of the book, but not a chapter
+                        encoder.submit(None, [output_wav], duration)
                 except Exception as e:
                     self.log_message.emit(f"Error synthesizing intro: {e}")
 
-            # Pre-calculate total work for accurate progress
+            # Clean & segment each chapter once (in parallel, and only if its
+            # content changed since the last run). The prepared text drives
+            # progress and is what the loop below synthesizes.
             self.log_message.emit("Analyzing text for progress calculation...")
-            all_sentences = []
-            for chapter in self.chapters:
-                if self._is_cancelled: break
-                text = clean_text(chapter.content)
-                segs = segment_text(text)
-                if segs:
-                    all_sentences.extend([(chapter, seg) for seg in segs])
+            prepared_chapters = prepare_chapters(
+                self.chapters, max_chars=self.max_chars, is_cancelled=lambda: self._is_cancelled
+            )
+            if prepared_chapters is None:
+                # Resets the window like any other stop, without an error popup
+                self.error.emit("Conversion cancelled.")
+                return
             
-            total_sentences_count = len(all_sentences)
-            if total_sentences_count == 0:
+            # Progress is weighted by characters, since a long sentence
+            # takes proportionally longer to synthesize than a short one
+            total_chars = sum(sum(prepared.char_counts) for prepared in prepared_chapters)
+            if total_chars == 0:
                 self.error.emit("No text found to synthesize.")
                 return
 
-            sentences_processed = 0
+            chars_processed = 0
+            if self.render_cache is not None:
+                self.render_cache.reset_stats()
             
             for i, chapter in enumerate(self.chapters):
                 if self._is_cancelled:
@@ -258,139 +347,137 @@ class SynthesisWorker(QThread):
                     
                 self.log_message.emit(f"Processing Chapter {i+1}/{total_chapters}: {chapter.title}")
                 
-                # Clean & Segment (Redundant but fast enough)
-                text = clean_text(chapter.content)
-                
-                # Strip chapter title from body if it appears at the start
-                # to avoid narrating it twice
-                chapter_title_clean = clean_text(chapter.title)
-                if text.lower().startswith(chapter_title_clean.lower()):
-                    text = text[len(chapter_title_clean):].strip()
-                    # Remove leading punctuation if any
-                    text = text.lstrip('.,;:-').strip()
-                
-                sentences = segment_text(text)
+                prepared = prepared_chapters[i]
+                sentences = prepared.segments
                 
                 if not sentences:
                     continue
                     
                 chapter_start_time = current_timestamp
+                chapter_first_file = len(all_audio_files)
                 
                 # Narrate chapter title first
                 chapter_num = i + 1
                 title_text = f"Chapter {chapter_num}. {chapter.title}."
+                title_key = None
+                cached = None
+                if self.render_cache is not None:
+                    title_key = self.render_cache.key(title_text, self.voice, self.speed, self.sentence_pause, kind="title")
+                    cached = self.render_cache.get(title_key)
                 try:
-                    self.log_message.emit(f"Narrating title: {title_text}")
-                    audio, sample_rate = synthesizer.synthesize_segment(
-                        title_text, voice_name=self.voice, speed=self.speed
-                    )
-                    
-                    # Add pause after title
-                    if self.sentence_pause > 0:
-                        silence = create_silence(self.sentence_pause * 2, sample_rate)  # Double pause after title
-                        audio = np.concatenate([audio, silence])
-                    
-                    duration = len(audio) / sample_rate
-                    output_wav = os.path.join(temp_dir, f"ch{i}_title.wav")
-                    synthesizer.save_audio(audio, sample_rate, output_wav)
+                    if cached is not None:
+                        output_wav, duration = cached
+                    else:
+                        self.log_message.emit(f"Narrating title: {title_text}")
+                        audio, sample_rate = synthesizer.synthesize_segment(
+                            title_text, voice_name=self.voice, speed=self.speed
+                        )
+                        
+                        # Add pause after title
+                        if self.sentence_pause > 0:
+                            silence = create_silence(self.sentence_pause * 2, sample_rate)  # Double pause after title
+                            audio = np.concatenate([audio, silence])
+                        
+                        duration = len(audio) / sample_rate
+                        if title_key is not None:
+                            output_wav = self.render_cache.path_for(title_key)
+                        else:
+                            output_wav = os.path.join(temp_dir, f"ch{i}_title.wav")
+                        synthesizer.save_audio(audio, sample_rate, output_wav)
+                        if title_key is not None:
+                            self.render_cache.add(title_key, output_wav, duration)
                     
                     all_audio_files.append(output_wav)
                     current_timestamp += duration
                 except Exception as e:
                     self.log_message.emit(f"Error synthesizing chapter title: {e}")
                 
-                # Synthesize body sentences
+                # Apply pronunciation corrections and split each sentence
+                # into the units we send to the synthesis engine. Sentences
+                # rendered before with identical settings are reused.
+                jobs = []
                 for j, sentence in enumerate(sentences):
-                    if self._is_cancelled:
-                        break
-                        
                     if not sentence.strip():
                         continue
+                    if self.pronunciation_corrections:
+                        from src.utils.pronunciation import apply_pronunciation_corrections
+                        sentence = apply_pronunciation_corrections(sentence, self.pronunciation_corrections)
+                    key = None
+                    cached = None
+                    if self.render_cache is not None:
+                        key = self.render_cache.key(sentence, self.voice, self.speed, self.sentence_pause, self.comma_pause)
+                        cached = self.render_cache.get(key)
+                    sentence_phrases = self._split_phrases(sentence) if cached is None else []
+                    jobs.append((j, sentence, sentence_phrases, key, cached))
+                
+                phrases = [phrase for _, _, sentence_phrases, _, _ in jobs for phrase, _ in sentence_phrases]
+                results = engine.synthesize_segments(phrases, voice_name=self.voice, speed=self.speed)
+                
+                # Synthesize body sentences
+                for j, sentence, sentence_phrases, key, cached in jobs:
+                    if self._is_cancelled:
+                        results.close()
+                        break
                         
                     try:
-                        # Apply pronunciation corrections (inside try block)
-                        if self.pronunciation_corrections:
-                            from src.utils.pronunciation import apply_pronunciation_corrections
-                            sentence = apply_pronunciation_corrections(sentence, self.pronunciation_corrections)
-                        
-                        # Advanced Prosody Logic
-                        final_audio = None
-                        sample_rate = 24000
-                        
-                        if self.comma_pause is not None:
-                            # Split by comma to control pause duration
-                            import re
-                            parts = re.split(r'(,)', sentence)
-                            
+                        # Take all of this sentence's results before any processing, so
+                        # an error below can't leave them to the following sentences
+                        phrase_results = [next(results) for _ in sentence_phrases]
+                        if cached is not None:
+                            output_wav, duration = cached
+                        else:
+                            # Advanced Prosody Logic
                             phrase_audios = []
-                            current_phrase = ""
+                            sample_rate = 24000
                             
-                            for part in parts:
-                                current_phrase += part
-                                if ',' in part or part == parts[-1]: # End of phrase or end of sentence
-                                    if not current_phrase.strip():
-                                        continue
-                                        
-                                    # Synthesize phrase
-                                    audio, sample_rate = synthesizer.synthesize_segment(
-                                        current_phrase, 
-                                        voice_name=self.voice, 
-                                        speed=self.speed
-                                    )
-                                    
+                            for (phrase, pause_after), (audio, sample_rate) in zip(sentence_phrases, phrase_results):
+                                if self.comma_pause is not None:
                                     # Trim model's default silence
                                     audio = trim_silence(audio, sample_rate=sample_rate)
-                                    
-                                    phrase_audios.append(audio)
-                                    
-                                    # Add custom comma pause if it was a comma phrase (and not the very end)
-                                    if ',' in part and part != parts[-1]:
-                                        silence = create_silence(self.comma_pause, sample_rate)
-                                        phrase_audios.append(silence)
-                                        
-                                    current_phrase = ""
+                                phrase_audios.append(audio)
+                                
+                                # Add custom comma pause after comma phrases
+                                if pause_after:
+                                    silence = create_silence(self.comma_pause, sample_rate)
+                                    phrase_audios.append(silence)
                             
-                            if phrase_audios:
-                                final_audio = np.concatenate(phrase_audios)
-                        
-                        else:
-                            # Standard synthesis
-                            final_audio, sample_rate = synthesizer.synthesize_segment(
-                                sentence, 
-                                voice_name=self.voice, 
-                                speed=self.speed
-                            )
-                        
-                        if final_audio is None or len(final_audio) == 0:
-                             # Fallback if advanced logic failed to produce audio
-                             final_audio, sample_rate = synthesizer.synthesize_segment(
-                                sentence, 
-                                voice_name=self.voice, 
-                                speed=self.speed
-                            )
+                            final_audio = np.concatenate(phrase_audios) if phrase_audios else None
+                            
+                            if final_audio is None or len(final_audio) == 0:
+                                 # Fallback if advanced logic failed to produce audio
+                                 final_audio, sample_rate = synthesizer.synthesize_segment(
+                                    sentence, 
+                                    voice_name=self.voice, 
+                                    speed=self.speed
+                                )
 
-                        # Add Sentence Pause
-                        if self.sentence_pause > 0:
-                            silence = create_silence(self.sentence_pause, sample_rate)
-                            final_audio = np.concatenate([final_audio, silence])
-                        
-                        duration = len(final_audio) / sample_rate
-                        output_wav = os.path.join(temp_dir, f"ch{i}_seg{j:04d}.wav")
-                        synthesizer.save_audio(final_audio, sample_rate, output_wav)
+                            # Add Sentence Pause
+                            if self.sentence_pause > 0:
+                                silence = create_silence(self.sentence_pause, sample_rate)
+                                final_audio = np.concatenate([final_audio, silence])
+                            
+                            duration = len(final_audio) / sample_rate
+                            if key is not None:
+                                output_wav = self.render_cache.path_for(key)
+                            else:
+                                output_wav = os.path.join(temp_dir, f"ch{i}_seg{j:04d}.wav")
+                            synthesizer.save_audio(final_audio, sample_rate, output_wav)
+                            if key is not None:
+                                self.render_cache.add(key, output_wav, duration)
                         
                         all_audio_files.append(output_wav)
                         current_timestamp += duration
                         
                         # Update Global Progress
-                        sentences_processed += 1
-                        percent = int((sentences_processed / total_sentences_count) * 100)
+                        chars_processed += prepared.char_counts[j]
+                        percent = int((chars_processed / total_chars) * 100)
                         self.progress_update.emit(i, percent) # Emit global percent
                         
-                        # Calculate ETA based on sentences
+                        # Calculate ETA based on characters
                         elapsed = time.time() - start_time
-                        avg_time_per_sentence = elapsed / sentences_processed
-                        remaining_sentences = total_sentences_count - sentences_processed
-                        eta_seconds = int(avg_time_per_sentence * remaining_sentences)
+                        avg_time_per_char = elapsed / chars_processed
+                        remaining_chars = total_chars - chars_processed
+                        eta_seconds = int(avg_time_per_char * remaining_chars)
                         
                         mins, secs = divmod(eta_seconds, 60)
                         self.eta_update.emit(f"ETA: {mins}m {secs}s")
@@ -400,6 +487,12 @@ class SynthesisWorker(QThread):
                 
                 chapter_end_time = current_timestamp
                 chapter_metadata.append((chapter.title, chapter_start_time, chapter_end_time))
+                if encoder is not None:
+                    encoder.submit(chapter.title, all_audio_files[chapter_first_file:], chapter_end_time - chapter_start_time)
+            
+            if self.render_cache is not None and self.render_cache.hits:
+                total_segments = self.render_cache.hits + self.render_cache.misses
+                self.log_message.emit(f"Reused {self.render_cache.hits} of {total_segments} segments from the previous render")
             
             
             if self._is_cancelled:
@@ -408,9 +501,11 @@ class SynthesisWorker(QThread):
                     try:
                         self.log_message.emit("Building partial audiobook...")
                         builder = M4BBuilder()
-                        builder.combine_audio_chunks(all_audio_files, self.output_path, chapters=chapter_metadata)
-                        title = os.path.splitext(os.path.basename(self.output_path))[0]
-                        builder.add_metadata(self.output_path, title=title, author="OpenNarrator")
+                        tags = self._tags()
+                        if encoder is not None:
+                            encoder.finish(self.output_path, **tags)
+                        else:
+                            builder.combine_audio_chunks(all_audio_files, self.output_path, chapters=chapter_metadata, **tags)
                         self.cancelled.emit(self.output_path)  # Emit path for user to decide
                     except Exception as e:
                         self.log_message.emit(f"Error building partial file: {e}")
@@ -430,27 +525,34 @@ class SynthesisWorker(QThread):
             
             builder = M4BBuilder()
             
-            # Create progress callback for M4B assembly
-            def m4b_progress_callback(percent):
+            # Create progress callback for M4B assembly, fed from FFmpeg's own progress
+            def m4b_progress_callback(percent, speed, eta_seconds):
                 self.m4b_progress_update.emit(percent)
-                if percent > 0:
+                if eta_seconds is None:
+                    # No encode speed yet; estimate from elapsed time
                     elapsed = time.time() - m4b_start_time
-                    eta_seconds = int((elapsed / percent) * (100 - percent))
+                    eta_seconds = int((elapsed / percent) * (100 - percent)) if percent > 0 else None
+                if eta_seconds is not None:
                     mins, secs = divmod(eta_seconds, 60)
-                    self.m4b_eta_update.emit(f"ETA: {mins}m {secs}s")
+                    self.m4b_eta_update.emit(f"ETA: {mins}m {secs}s ({speed:.0f}x)")
             
-            builder.combine_audio_chunks(
-                all_audio_files, 
-                self.output_path, 
-                chapters=chapter_metadata,
-                progress_callback=m4b_progress_callback
-            )
+            # Chapters, tags and cover art all go in with the audio, in one pass
+            tags = self._tags()
+            if encoder is not None:
+                # Chapter marks come from the encoded chapters themselves
+                encoder.finish(self.output_path, progress_callback=m4b_progress_callback, **tags)
+            else:
+                builder.combine_audio_chunks(
+                    all_audio_files, 
+                    self.output_path, 
+                    chapters=chapter_metadata,
+                    progress_callback=m4b_progress_callback,
+                    total_duration=current_timestamp,
+                    **tags
+                )
             
             self.m4b_progress_update.emit(100)
             
-            title = os.path.splitext(os.path.basename(self.output_path))[0]
-            builder.add_metadata(self.output_path, title=title, author="OpenNarrator")
-            
             self.log_message.emit(f"Successfully saved to {self.output_path}")
             
             # Explicitly clean up synthesizer to free GPU memory
@@ -473,6 +575,10 @@ class SynthesisWorker(QThread):
         except Exception as e:
             self.error.emit(str(e))
         finally:
+            if encoder is not None:
+                encoder.close()
+            if session_pool is not None:
+                session_pool.close()
             # Final safety check
             if os.path.exists(temp_dir):
                 try:
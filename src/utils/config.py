@@ -16,3 +16,53 @@ VOICES_BIN_PATH = os.path.join(VOICES_DIR, 'voices-v1.0.bin')
 
 # Voice preview sample text
 PREVIEW_TEXT = "They were careless people, Tom and Daisy. they smashed up things and creatures and then retreated back into their money or their vast carelessness or whatever it was that kept them together, and let other people clean up the mess they had made."
+
+def get_config_dir():
+    """Per-user directory for settings and machine-specific data."""
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+        return os.path.join(base, 'OpenNarrator')
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(base, 'opennarrator')
+
+CONFIG_DIR = get_config_dir()
+PROFILES_DIR = os.path.join(CONFIG_DIR, 'profiles')
+
+def get_cache_dir():
+    """Per-user directory for data that can be rebuilt at any time."""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.environ.get('APPDATA') or os.path.expanduser('~')
+        return os.path.join(base, 'OpenNarrator', 'Cache')
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'opennarrator')
+
+CACHE_DIR = get_cache_dir()
+# Extracted books, keyed by file contents; least recently used are evicted
+EXTRACTION_CACHE_DIR = os.path.join(CACHE_DIR, 'extraction')
+EXTRACTION_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Rendered sentence audio kept for the loaded book, across voices and
+# settings; the render in progress is always kept whole
+RENDER_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# M4B assembly: "parallel" encodes each chapter to AAC in its own FFmpeg
+# process as soon as it is synthesized, then joins them with a stream copy;
+# "single" encodes the whole book in one FFmpeg pass at the end;
+# "inprocess" (CLI only, needs PyAV) encodes and muxes the audio inside the
+# process as it is synthesized, with no FFmpeg binary and no WAV files
+M4B_ASSEMBLY_MODE = "parallel"
+
+# Built-in sample used by the autotuner: a mix of short and long sentences
+AUTOTUNE_SAMPLE_TEXT = (
+    "It was a bright cold day in April, and the clocks were striking thirteen. "
+    "The hallway smelt of boiled cabbage and old rag mats. "
+    "At one end of it a coloured poster, too large for indoor display, had been tacked to the wall. "
+    "Outside, even through the shut window-pane, the world looked cold. "
+    "Down in the street little eddies of wind were whirling dust and torn paper into spirals, "
+    "and though the sun was shining and the sky a harsh blue, there seemed to be no colour in anything, "
+    "except the posters that were plastered everywhere. "
+    "He moved over to the window. "
+    "Behind him the radio was still babbling away about pig-iron and the overfulfilment of the Ninth Three-Year Plan. "
+    "The ministry of truth was startlingly different from any other object in sight. "
+    "It was an enormous pyramidal structure of glittering white concrete, soaring up, terrace after terrace, three hundred metres into the air."
+)
@@ -0,0 +1,49 @@
+"""
+Per-host performance profile.
+Written by the autotuner and read by the synthesizer, CLI and GUI workers
+so each machine runs with the thread, session and segment settings that
+measured fastest on it.
+"""
+
+import json
+import os
+import re
+import socket
+
+from src.utils.config import PROFILES_DIR
+
+# Settings used when a host has not been tuned yet
+DEFAULT_PROFILE = {
+    "threads": None,     # Intra-op threads per session (None = library default)
+    "sessions": 1,       # In-process inference sessions
+    "max_chars": 400,    # segment_text() maximum segment length
+}
+
+
+def get_host_profile_path():
+    hostname = re.sub(r'[^\w.-]', '_', socket.gethostname()) or "localhost"
+    return os.path.join(PROFILES_DIR, f"{hostname}.json")
+
+
+def load_host_profile():
+    """
+    Returns the tuned profile for this host, falling back to
+    DEFAULT_PROFILE for anything missing or unreadable.
+    """
+    profile = dict(DEFAULT_PROFILE)
+    try:
+        with open(get_host_profile_path(), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        profile.update({key: data[key] for key in DEFAULT_PROFILE if key in data})
+    except (OSError, ValueError):
+        pass
+    return profile
+
+
+def save_host_profile(profile):
+    """Writes the profile for this host and returns the file path."""
+    path = get_host_profile_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+    return path
@@ -0,0 +1,45 @@
+"""
+Helper for fanning CPU-bound work out to a process pool.
+"""
+
+import multiprocessing
+import os
+
+
+def map_processes(func, tasks, work, min_work, processes=None):
+    """
+    Returns [func(task) for task in tasks], computed across a process pool
+    when there is enough work to pay for starting one.
+    work: Size of the job (e.g. total characters), compared to min_work.
+    processes: Worker processes (default: one per CPU).
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(tasks))
+
+    if processes <= 1 or work < min_work:
+        return [func(task) for task in tasks]
+
+    # Spawn, not fork: callers run in GUI threads next to torch's thread pools
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes) as pool:
+        return pool.map(func, tasks, chunksize=1)
+
+
+def imap_processes(func, tasks, work, min_work, processes=None):
+    """
+    Like map_processes(), but yields results in order as they become
+    available instead of waiting for all of them.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(tasks))
+
+    if processes <= 1 or work < min_work:
+        for task in tasks:
+            yield func(task)
+        return
+
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes) as pool:
+        yield from pool.imap(func, tasks)
@@ -8,10 +8,10 @@ import requests
 from typing import List, Dict, Tuple, Optional
 
 
-import pysbd
-
 import enchant
 
+from src.core.segmenter import segment_sentences
+
 # Initialize g2p-en for fallback pronunciation generation
 try:
     from g2p_en import G2p
@@ -47,9 +47,7 @@ def find_difficult_words(text: str, verbose: bool = False) -> List[str]:
     
     difficult_words = set()
     
-    # Use pysbd for better sentence segmentation
-    segmenter = pysbd.Segmenter(language="en", clean=False)
-    sentences = segmenter.segment(text)
+    sentences = segment_sentences(text)
     
     for sentence in sentences:
         words = sentence.split()
@@ -92,9 +90,7 @@ def _find_difficult_words_fallback(text: str, verbose: bool = False) -> List[str
     """
     difficult_words = set()
     
-    # Use pysbd for better sentence segmentation
-    segmenter = pysbd.Segmenter(language="en", clean=False)
-    sentences = segmenter.segment(text)
+    sentences = segment_sentences(text)
     
     for sentence in sentences:
         words = sentence.split()
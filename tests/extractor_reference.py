@@ -0,0 +1,82 @@
+"""
+Frozen copy of the original multi-pass extract_document_text().
+Used as the oracle for the differential tests and the benchmark of the
+single-pass walk in src/core/extractor.py. Do not modify.
+"""
+import re
+from bs4 import BeautifulSoup
+
+from src.core.extractor import HTML_PARSER
+
+def extract_document_text(body_content, toc_title, item_name, parser=HTML_PARSER):
+    """
+    Extracts (title, text) from the body of one EPUB spine document.
+    toc_title: The document's title in the table of contents, if any.
+    item_name: Fallback title when the document has no heading.
+    """
+    soup = BeautifulSoup(body_content, parser)
+    
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+    
+    # Remove image-related elements (captions, figures, etc.)
+    # These won't be present in the audiobook
+    for element in soup.find_all(['figure', 'figcaption', 'caption', 'img']):
+        element.decompose()
+    
+    # Remove elements with image-related classes
+    for element in soup.find_all(class_=re.compile(r'(image|figure|caption|illustration|photo|picture)', re.I)):
+        element.decompose()
+    
+    # Remove elements with image-related ids
+    for element in soup.find_all(id=re.compile(r'(image|figure|caption|illustration|photo|picture)', re.I)):
+        element.decompose()
+    
+    # Try to find a title
+    title = ""
+    title_element = None
+    
+    # 1. Check TOC title first (most reliable)
+    if toc_title is not None:
+        title = toc_title
+        # Find the element matching this title to remove it
+        # We look for h1, h2, h3 with matching text
+        for tag in ['h1', 'h2', 'h3']:
+            for header in soup.find_all(tag):
+                if title.lower() in header.get_text().strip().lower():
+                    title_element = header
+                    break
+            if title_element:
+                break
+    
+    # 2. Fallback to HTML headings
+    if not title:
+        h1 = soup.find('h1')
+        if h1:
+            title = h1.get_text().strip()
+            title_element = h1
+        elif soup.find('h2'):
+            h2 = soup.find('h2')
+            title = h2.get_text().strip()
+            title_element = h2
+    
+    # Remove the title element from the body if found
+    if title_element:
+        title_element.decompose()
+    
+    # 3. Fallback to item name
+    if not title:
+        title = item_name
+
+    # Get text with proper spacing
+    # Use space separator to avoid breaking words
+    chapter_text = soup.get_text(separator=' ', strip=True)
+    
+    # Normalize excessive whitespace while preserving paragraph breaks
+    # Replace multiple spaces with single space
+    chapter_text = re.sub(r' +', ' ', chapter_text)
+    # Clean up any remaining artifacts
+    chapter_text = chapter_text.strip()
+
+    return title, chapter_text
@@ -0,0 +1,250 @@
+import hashlib
+import io
+import os
+import shutil
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import soundfile as sf
+from mutagen.mp4 import MP4, MP4Cover
+from PIL import Image
+
+from src.core.audio_builder import (
+    AAC_FRAME_SAMPLES, ChapterEncoder, M4BBuilder, adts_samples, progress_report, read_progress
+)
+
+
+def find_ffmpeg():
+    path = shutil.which("ffmpeg")
+    if path is None:
+        try:
+            import imageio_ffmpeg
+            path = imageio_ffmpeg.get_ffmpeg_exe()
+        except (ImportError, RuntimeError):
+            pass
+    return path
+
+
+FFMPEG = find_ffmpeg()
+
+# Stands in for FFmpeg: prints -progress blocks for 40 s of audio at 8x,
+# a warning on stderr, and fails if asked to write to a "fail" path
+FAKE_FFMPEG = """#!{python}
+import sys
+output = sys.argv[-1]
+print("[aac] a warning", file=sys.stderr, flush=True)
+if "fail" in output:
+    print("Conversion failed!", file=sys.stderr)
+    sys.exit(1)
+for i, seconds in enumerate((0, 10, 20, 30, 40)):
+    speed = "N/A" if i == 0 else "8.0x"
+    print(f"out_time_us={{seconds * 1000000}}\\nout_time=00:00:{{seconds:02d}}.000000\\nspeed={{speed}}", flush=True)
+    print("progress=" + ("end" if seconds == 40 else "continue"), flush=True)
+open(output, "wb").close()
+"""
+
+
+class TestProgress(unittest.TestCase):
+    def test_parse_blocks(self):
+        stream = io.StringIO(
+            "frame=0\nout_time_ms=5000000\nout_time=00:00:05.000000\nspeed=N/A\nprogress=continue\n"
+            "out_time_us=N/A\nout_time=00:01:30.500000\nspeed=2.5x\nprogress=continue\n"
+            "out_time_us=120000000\nspeed=3x\nprogress=end\n"
+        )
+        first, second, last = read_progress(stream)
+
+        # No speed reported yet: measured from elapsed time
+        self.assertEqual(progress_report(first, 100, elapsed=2), (5, 2.5, 38))
+        self.assertEqual(progress_report(second, 100, elapsed=2), (90, 2.5, 3))
+        self.assertEqual(progress_report(last, 100, elapsed=40), (100, 3.0, 0))
+        # Percent needs a total
+        self.assertIsNone(progress_report(second, None, elapsed=2))
+
+
+def adts_frame(payload_bytes, blocks=1):
+    """An ADTS header (24 kHz, mono, no CRC) followed by a dummy payload."""
+    length = 7 + payload_bytes
+    header = bytes([
+        0xFF, 0xF1, (1 << 6) | (6 << 2), (1 << 6) | (length >> 11),
+        (length >> 3) & 0xFF, ((length & 0x07) << 5) | 0x1F, 0xFC | (blocks - 1)
+    ])
+    return header + b"\x00" * payload_bytes
+
+
+class TestAdts(unittest.TestCase):
+    def test_counts_frames(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "a.aac")
+            with open(path, "wb") as f:
+                f.write(adts_frame(3) + adts_frame(200) + adts_frame(0, blocks=2))
+            self.assertEqual(adts_samples(path), (4 * AAC_FRAME_SAMPLES, 24000))
+
+            with open(path, "wb") as f:
+                f.write(adts_frame(3) + b"junk" + adts_frame(3))
+            with self.assertRaises(ValueError):
+                adts_samples(path)
+
+
+class TestM4BBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.ffmpeg = os.path.join(self.tmpdir.name, "ffmpeg")
+        with open(self.ffmpeg, "w") as f:
+            f.write(FAKE_FFMPEG.format(python=sys.executable))
+        os.chmod(self.ffmpeg, os.stat(self.ffmpeg).st_mode | stat.S_IEXEC)
+        self.audio_files = [os.path.join(self.tmpdir.name, f"seg{i}.wav") for i in range(2)]
+        for path in self.audio_files:
+            open(path, "wb").close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_reports_encode_progress(self):
+        reports = []
+        output = os.path.join(self.tmpdir.name, "book.m4b")
+        M4BBuilder(self.ffmpeg).combine_audio_chunks(
+            self.audio_files, output, chapters=[("One", 0, 20), ("Two", 20, 40)],
+            progress_callback=lambda *report: reports.append(report)
+        )
+
+        self.assertTrue(os.path.exists(output))
+        self.assertEqual([percent for percent, _, _ in reports], [0, 25, 50, 75, 100])
+        self.assertEqual(reports[2][1:], (8.0, 2))
+        self.assertEqual(reports[-1][2], 0)
+        # Temporary files are gone
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ["book.m4b", "ffmpeg", "seg0.wav", "seg1.wav"])
+
+    def test_failure_keeps_stderr(self):
+        with self.assertRaises(subprocess.CalledProcessError) as raised:
+            M4BBuilder(self.ffmpeg).combine_audio_chunks(
+                self.audio_files, os.path.join(self.tmpdir.name, "fail.m4b"), progress_callback=lambda *_: None,
+                total_duration=40
+            )
+        self.assertIn("Conversion failed!", raised.exception.stderr)
+        self.assertIn("a warning", raised.exception.stderr)
+
+
+@unittest.skipUnless(FFMPEG, "needs ffmpeg")
+class TestChapterEncoder(unittest.TestCase):
+    def test_chapter_marks_from_samples(self):
+        sample_rate = 24000
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # An untitled intro, then three chapters of two files each
+            segments = []
+            for n, seconds in enumerate([0.5, 1.25, 2.0, 0.8]):
+                files = []
+                for part in range(1 if n == 0 else 2):
+                    path = os.path.join(tmpdir, f"{n}-{part}.wav")
+                    samples = int(seconds * sample_rate) + 37 * part
+                    sf.write(path, np.sin(np.arange(samples) * 0.05).astype("float32") * 0.3, sample_rate)
+                    files.append(path)
+                segments.append((f"Chapter {n}" if n else None, files))
+
+            encoder = ChapterEncoder(tmpdir, FFMPEG, processes=2)
+            for title, files in segments:
+                encoder.submit(title, files)
+            output = os.path.join(tmpdir, "book.m4b")
+            reports = []
+            chapters = encoder.finish(output, progress_callback=lambda *report: reports.append(report))
+            encoder.close()
+
+            self.assertEqual([title for title, _, _ in chapters], ["Chapter 1", "Chapter 2", "Chapter 3"])
+            # Contiguous, on AAC frame boundaries, each a little longer than its audio
+            for (_, start, end), (_, files) in zip(chapters, segments[1:]):
+                self.assertEqual(round(start * sample_rate) % AAC_FRAME_SAMPLES, 0)
+                self.assertEqual(round(end * sample_rate) % AAC_FRAME_SAMPLES, 0)
+                audio = sum(sf.info(path).duration for path in files)
+                self.assertTrue(audio < end - start < audio + 3 * AAC_FRAME_SAMPLES / sample_rate)
+            self.assertEqual([end for _, _, end in chapters[:-1]], [start for _, start, _ in chapters[1:]])
+
+            self.assertAlmostEqual(MP4(output).info.length, chapters[-1][2], places=3)
+            self.assertEqual(reports[-1][0], 100)
+            # Only the book and its inputs are left
+            self.assertFalse([name for name in os.listdir(tmpdir) if not name.endswith((".wav", ".m4b"))])
+
+
+def top_level_atoms(path):
+    """(type, offset, size) of each top-level MP4 atom."""
+    atoms = []
+    with open(path, "rb") as f:
+        offset = 0
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return atoms
+            size, kind = struct.unpack(">I4s", header)
+            if size == 1:
+                size = struct.unpack(">Q", f.read(8))[0]
+            atoms.append((kind, offset, size))
+            offset += size
+            f.seek(offset)
+
+
+def mdat_digest(path):
+    _, offset, size = next(atom for atom in top_level_atoms(path) if atom[0] == b"mdat")
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return offset, hashlib.sha256(f.read(size)).hexdigest()
+
+
+@unittest.skipUnless(FFMPEG, "needs ffmpeg")
+class TestSinglePassMux(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.audio_files = []
+        for n in range(3):
+            path = os.path.join(self.tmpdir.name, f"{n}.wav")
+            sf.write(path, np.zeros(24000, dtype="float32"), 24000)
+            self.audio_files.append(path)
+        self.cover = os.path.join(self.tmpdir.name, "cover.jpg")
+        Image.new("RGB", (64, 64), (200, 30, 30)).save(self.cover)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def check_tags(self, path, title, author, cover_format):
+        tags = MP4(path).tags
+        self.assertEqual(tags["\xa9nam"], [title])
+        self.assertEqual(tags["\xa9alb"], [title])
+        self.assertEqual(tags["\xa9ART"], [author])
+        self.assertEqual(tags["covr"][0].imageformat, cover_format)
+
+    def test_tags_and_cover_in_the_mux(self):
+        title = "A Book; with = signs"
+        single = os.path.join(self.tmpdir.name, "single.m4b")
+        M4BBuilder(FFMPEG).combine_audio_chunks(
+            self.audio_files, single, chapters=[("One", 0, 1), ("Two #2", 1, 3)],
+            title=title, author="Jane Doe", cover_image_path=self.cover
+        )
+        self.check_tags(single, title, "Jane Doe", MP4Cover.FORMAT_JPEG)
+        self.assertEqual([chapter.title for chapter in MP4(single).chapters], ["One", "Two #2"])
+
+        encoder = ChapterEncoder(self.tmpdir.name, FFMPEG)
+        encoder.submit("One", self.audio_files[:1])
+        encoder.submit("Two", self.audio_files[1:])
+        parallel = os.path.join(self.tmpdir.name, "parallel.m4b")
+        encoder.finish(parallel, title=title, author="Jane Doe", cover_image_path=self.cover)
+        encoder.close()
+        self.check_tags(parallel, title, "Jane Doe", MP4Cover.FORMAT_JPEG)
+        self.assertEqual(len(MP4(parallel).chapters), 2)
+
+    def test_tag_update_leaves_audio_alone(self):
+        path = os.path.join(self.tmpdir.name, "book.m4b")
+        M4BBuilder(FFMPEG).combine_audio_chunks(self.audio_files, path, title="Old", author="Someone")
+        before = mdat_digest(path)
+
+        png = os.path.join(self.tmpdir.name, "cover.png")
+        Image.new("RGB", (256, 256), (0, 90, 200)).save(png)
+        M4BBuilder(FFMPEG).add_metadata(path, title="A New, Longer Title", author="Jane Doe", cover_image_path=png)
+
+        self.check_tags(path, "A New, Longer Title", "Jane Doe", MP4Cover.FORMAT_PNG)
+        self.assertEqual(mdat_digest(path), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from mutagen.mp4 import MP4, MP4Cover
+from PIL import Image
+
+from src.core.av_builder import AV_AVAILABLE, AvM4BWriter
+
+if AV_AVAILABLE:
+    import av
+
+
+@unittest.skipUnless(AV_AVAILABLE, "needs PyAV")
+class TestAvM4BWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "book.m4b")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_chapters_tags_and_cover(self):
+        cover = os.path.join(self.tmpdir.name, "cover.jpg")
+        Image.new("RGB", (64, 64), (200, 30, 30)).save(cover)
+
+        # An intro outside any chapter, then chapters of uneven lengths
+        with AvM4BWriter(self.path, 24000, title="A Book", author="Jane Doe", cover_image_path=cover) as writer:
+            writer.write(np.zeros(12000, dtype=np.float32))
+            for title, seconds in (("One", 1.5), ("Two", 0.25), ("Three", 2)):
+                writer.start_chapter(title)
+                for _ in range(3):
+                    writer.write(np.zeros(int(24000 * seconds / 3), dtype=np.float32))
+            chapters = writer.close()
+
+        self.assertEqual(chapters, [("One", 0.5, 2.0), ("Two", 2.0, 2.25), ("Three", 2.25, 4.25)])
+        with av.open(self.path) as container:
+            marks = [(chapter["metadata"]["title"], float(chapter["start"] * chapter["time_base"]),
+                      float(chapter["end"] * chapter["time_base"])) for chapter in container.chapters()]
+        # MP4 chapter tracks have no gaps, so the first chapter takes in the intro
+        self.assertEqual(marks, [("One", 0.0, 2.0)] + chapters[1:])
+
+        tags = MP4(self.path).tags
+        self.assertEqual(tags["\xa9nam"], ["A Book"])
+        self.assertEqual(tags["\xa9ART"], ["Jane Doe"])
+        self.assertEqual(tags["covr"][0].imageformat, MP4Cover.FORMAT_JPEG)
+
+    def test_rejects_other_sample_rates(self):
+        with AvM4BWriter(self.path, 24000) as writer:
+            with self.assertRaises(ValueError):
+                writer.write(np.zeros(100, dtype=np.float32), 22050)
+
+
+if __name__ == "__main__":
+    unittest.main()
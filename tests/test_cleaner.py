@@ -0,0 +1,137 @@
+import glob
+import os
+import random
+import unittest
+
+from src.core.cleaner import clean_text, clean_text_stream, segment_text, segment_text_stream
+from tests.cleaner_reference import clean_text as reference_clean_text
+
+# Fragments that exercise every cleaning rule, including the awkward
+# interactions (touching abbreviations, footnote/number collisions)
+FRAGMENTS = [
+    "Dr.", "Mr.", "Mrs.", "Ms.", "Prof.", "Gen.", "Sgt.", "Lt.", "Col.", "Cpt.",
+    "St.", "vs.", "etc.", "e.g.", "i.e.", "no.", "No.", "vol.", "Vol.", "p.", "pp.",
+    "However", "however", "Therefore", "still", "Thus,", "Hence.", "Otherwise!", "Indeed:",
+    "June 21, 2015", "March 3", "December 12 1999", "12/25/2024", "13/01/2020", "1/2/3",
+    "$5.99", "£10", "€3.50", "$1,000", "1,234,567", "12,34", "75%", "3.5 %", "100%",
+    "[1]", "[23]", "(4)", "(12)", "word1", "\"quote\"2", "end 7", ". 8 It", ", 9 A",
+    "—", "–", ":", ";", "...", "..", "--", "---", "__", "***", "##", "~~", "==",
+    "“smart”", "‘single’", "'", "\"", " - ", "-", "(", ")",
+    "@", "&", "*", "#", "é", "naïve", "Ωmega", "\n", "\n\n", "\t", "  ",
+    "The", "quick", "brown", "fox", "jumps", "over", "a", "lazy", "dog", "It", "A",
+    ".", ",", "?", "!", "'s", "don't", "1", "22", "333", "4444",
+]
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "Dr.St.",
+    "i.e.g.",
+    "e.g.i.e.",
+    "pp.p.",
+    "*__*",
+    "([1]2)",
+    "Mr.Mrs.Ms.",
+    "St.Dr. Smith",
+    "However,however however.",
+    "No.no.No.",
+    "$5.999 and $.99",
+    "It cost $1,000,000 (3) today 5",
+    "Chapter 1\n\nIt was a dark night. 2 And then:—nothing…",
+]
+
+
+def random_corpus(seed, count, length):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, length)):
+            parts.append(rng.choice(FRAGMENTS))
+            parts.append(rng.choice([" ", " ", " ", "", "\n"]))
+        texts.append("".join(parts))
+    return texts
+
+
+class TestCleanTextMatchesReference(unittest.TestCase):
+    def assertSameOutput(self, text):
+        self.assertEqual(clean_text(text), reference_clean_text(text), msg=repr(text))
+
+    def test_edge_cases(self):
+        for text in EDGE_CASES:
+            self.assertSameOutput(text)
+
+    def test_random_corpus(self):
+        for text in random_corpus(seed=1234, count=3000, length=40):
+            self.assertSameOutput(text)
+
+    def test_sample_books(self):
+        try:
+            from src.core.extractor import extract_chapters_from_epub
+        except ImportError:
+            self.skipTest("extraction dependencies not installed")
+
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        books = glob.glob(os.path.join(root, "samples", "*.epub"))
+        if not books:
+            self.skipTest("no sample EPUB in samples/")
+
+        for book in books:
+            chapters, _ = extract_chapters_from_epub(book)
+            for chapter in chapters:
+                self.assertSameOutput(chapter.content)
+
+
+class TestCleanerProfiler(unittest.TestCase):
+    def test_profiled_output_matches(self):
+        from src.core.cleaner_profiler import CleanerProfiler
+
+        profiler = CleanerProfiler()
+        texts = random_corpus(seed=5, count=50, length=40)
+        for i, text in enumerate(texts):
+            self.assertEqual(profiler.clean(text, label=f"text {i}"), clean_text(text))
+
+        profile = profiler.to_dict()
+        self.assertEqual(profile["texts"], len(texts))
+        rules = {rule["rule"]: rule for rule in profile["rules"]}
+        self.assertGreater(rules["abbreviations"]["matches"], 0)
+        self.assertGreater(rules["footnotes"]["net_bytes_removed"], 0)
+        seconds = [rule["seconds"] for rule in profile["rules"]]
+        self.assertEqual(seconds, sorted(seconds, reverse=True))
+        self.assertIn("transition_words", profiler.report())
+
+
+class TestCleanTextStream(unittest.TestCase):
+    def test_matches_clean_text(self):
+        # Tiny chunk sizes put a boundary next to nearly every rule
+        texts = random_corpus(seed=99, count=300, length=60)
+        text = "\n".join(texts)
+        expected = clean_text(text)
+        for chunk_size in (8, 32, 100, 1000):
+            chunks = list(clean_text_stream(text, chunk_size=chunk_size))
+            self.assertEqual(" ".join(chunks), expected, msg=f"chunk_size={chunk_size}")
+
+    def test_iterable_source(self):
+        pages = random_corpus(seed=7, count=200, length=30)
+        chunks = list(clean_text_stream(iter(pages), chunk_size=50))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(" ".join(chunks), clean_text("".join(pages)))
+
+    def test_unsafe_boundary_not_split(self):
+        # The date rule swallows the paragraph break after "21,"
+        text = "It was June 21,\n\nThe end."
+        self.assertEqual(" ".join(clean_text_stream(text, chunk_size=4)), clean_text(text))
+
+    def test_segments_match_on_prose(self):
+        text = "\n\n".join(
+            f"Paragraph {i} starts here. Dr. Smith said it was fine! Was it? "
+            f"However the weather turned and everyone went home early."
+            for i in range(50)
+        )
+        expected = segment_text(clean_text(text), max_chars=60)
+        streamed = list(segment_text_stream(clean_text_stream(text, chunk_size=200), max_chars=60))
+        self.assertEqual([s.strip() for s in streamed], [s.strip() for s in expected])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import os
+import pickle
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from ebooklib import epub
+
+from src.core.epub_reader import list_chapters_from_epub
+from src.core import extractor
+from src.core.extractor import chapter_size_label, extract_chapters_from_epub
+from src.core.text_prep import load_chapters
+
+
+def write_book(path):
+    book = epub.EpubBook()
+    book.set_identifier("test-book")
+    book.set_title("Test Book")
+    book.add_author("Jane Doe")
+
+    pages = [
+        ("cover.xhtml", "Cover", '<img src="cover.jpg" alt="cover"/>'),
+        ("contents.xhtml", "Contents", "<h1>Contents</h1><p>One. Two.</p>"),
+        ("ch1.xhtml", "Chapter 1: Arrival",
+         "<h1>Chapter 1: Arrival</h1><p>It rained &amp; rained.</p><figure><figcaption>Rain</figcaption></figure>"),
+        ("ch2.xhtml", None, "<h2>The <em>Storm</em></h2><p>Thunder rolled.</p><script>var x = 1;</script>"),
+        ("ch3.xhtml", None, "<p>No heading here.</p>"),
+        # Documents with no text left after extraction, listed by neither
+        ("part2.xhtml", "Part Two", "<h1>Part Two</h1>"),
+        ("fig.xhtml", None, "<figure><img src=\"cover.jpg\"/><figcaption>A map</figcaption></figure>"),
+        ("plate.xhtml", None, '<div class="illustration"><p>Plate 1</p></div>'),
+    ]
+    items, toc = [], []
+    for name, toc_title, body in pages:
+        item = epub.EpubHtml(title=toc_title or name, file_name=name, content=f"<html><body>{body}</body></html>")
+        book.add_item(item)
+        items.append(item)
+        if toc_title:
+            toc.append(epub.Link(name, toc_title, name))
+
+    book.toc = toc
+    book.add_item(epub.EpubImage(uid="cover-image", file_name="cover.jpg", media_type="image/jpeg", content=b"\xff\xd8" * 1000))
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = items
+    epub.write_epub(path, book)
+
+
+def write_series_book(path, chapters=5):
+    """A book whose every document repeats a running header and a series blurb."""
+    book = epub.EpubBook()
+    book.set_identifier("series-book")
+    book.set_title("Series Book")
+
+    items = []
+    for n in range(1, chapters + 1):
+        body = (
+            '<p class="running-head">The Long Voyage — Book One</p>'
+            f"<h1>Chapter {n}</h1>"
+            f"<p>The ship sailed on for day {n}.</p><p>Yes.</p><p>Nobody spoke.</p>"
+            '<p class="orn">* * *</p>'
+            f"<p>Night fell over the sea, {n} times over.</p><p>Yes.</p>"
+            "<p>The crew slept below.</p><p>The wind rose.</p>"
+            '<div class="series"><p>Look out for Book Two of The Long Voyage, coming soon.</p></div>'
+        )
+        item = epub.EpubHtml(title=f"Chapter {n}", file_name=f"ch{n}.xhtml", content=f"<html><body>{body}</body></html>")
+        book.add_item(item)
+        items.append(item)
+
+    book.toc = [epub.Link(item.file_name, item.title, item.file_name) for item in items]
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = items
+    epub.write_epub(path, book)
+
+
+class TestEpubReader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmpdir.name, "book.epub")
+        write_book(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_matches_full_extraction(self):
+        expected, expected_metadata = extract_chapters_from_epub(self.path)
+        chapters, metadata = list_chapters_from_epub(self.path)
+
+        self.assertEqual(metadata, expected_metadata)
+        self.assertEqual(
+            [(c.title, c.order, c.is_toc) for c in chapters],
+            [(c.title, c.order, c.is_toc) for c in expected]
+        )
+        self.assertNotIn("Part Two", [c.title for c in chapters])
+        self.assertFalse(any(c.is_loaded for c in chapters))
+        self.assertEqual([c.content for c in chapters], [c.content for c in expected])
+        self.assertTrue(all(c.content for c in chapters))
+        self.assertTrue(all(c.is_loaded for c in chapters))
+
+    def test_pool_and_parser_match_sequential(self):
+        with patch.object(extractor, "HTML_PARSER", "html.parser"):
+            expected, _ = extract_chapters_from_epub(self.path, processes=1)
+
+        # Force the pool even for this small book
+        with patch.object(extractor, "PARALLEL_MIN_BYTES", 0):
+            chapters, _ = extract_chapters_from_epub(self.path, processes=2)
+        self.assertEqual(chapters, expected)
+
+        lazy, _ = list_chapters_from_epub(self.path)
+        with patch("src.core.text_prep.PARALLEL_MIN_BYTES", 0):
+            load_chapters(lazy, processes=2)
+        self.assertTrue(all(c.is_loaded for c in lazy))
+        self.assertEqual([c.content for c in lazy], [c.content for c in expected])
+
+    def test_reads_only_documents_it_needs(self):
+        read = []
+        original_read = zipfile.ZipFile.read
+
+        def recording_read(archive, name, *args, **kwargs):
+            read.append(name.filename if isinstance(name, zipfile.ZipInfo) else name)
+            return original_read(archive, name, *args, **kwargs)
+
+        with patch.object(zipfile.ZipFile, "read", recording_read):
+            chapters, _ = extract_chapters_from_epub(self.path, processes=1)
+        self.assertTrue(chapters)
+        self.assertFalse([name for name in read if name.endswith(".jpg")])
+
+    def test_skip_toc(self):
+        chapters, _ = list_chapters_from_epub(self.path, skip_toc=True)
+        self.assertNotIn("Contents", [c.title for c in chapters])
+
+    def test_drops_repeated_boilerplate(self):
+        path = os.path.join(self.tmpdir.name, "series.epub")
+        write_series_book(path)
+
+        chapters, _ = extract_chapters_from_epub(path, processes=1)
+        self.assertEqual(len(chapters), 5)
+        for chapter in chapters:
+            self.assertNotIn("Book One", chapter.content)
+            self.assertNotIn("Book Two", chapter.content)
+            self.assertNotIn("* * *", chapter.content)
+            # Dialogue that repeats mid-chapter is kept
+            self.assertEqual(chapter.content.count("Yes."), 2)
+            self.assertIn("boilerplate", chapter_size_label(chapter))
+
+        # The lazy listing reports and removes the same
+        lazy, _ = list_chapters_from_epub(path)
+        self.assertEqual([c.removed_chars for c in lazy], [c.removed_chars for c in chapters])
+        self.assertTrue(all(c.removed_chars > 0 for c in lazy))
+        self.assertEqual([c.content for c in lazy], [c.content for c in chapters])
+
+        # Too few documents to tell boilerplate apart
+        short = os.path.join(self.tmpdir.name, "short.epub")
+        write_series_book(short, chapters=2)
+        chapters, _ = extract_chapters_from_epub(short, processes=1)
+        self.assertTrue(all("Book One" in c.content and not c.removed_chars for c in chapters))
+
+    def test_listing_matches_extraction_with_either_parser(self):
+        path = os.path.join(self.tmpdir.name, "series.epub")
+        write_series_book(path)
+        for parser in {extractor.HTML_PARSER, "html.parser"}:
+            with patch.object(extractor, "HTML_PARSER", parser):
+                lazy, _ = list_chapters_from_epub(path)
+                listed = [c.removed_chars for c in lazy]
+                load_chapters(lazy, processes=1)
+                chapters, _ = extract_chapters_from_epub(path, processes=1)
+            self.assertTrue(all(removed > 0 for removed in listed), msg=parser)
+            self.assertEqual(listed, [c.removed_chars for c in chapters], msg=parser)
+            self.assertEqual([c.content for c in lazy], [c.content for c in chapters], msg=parser)
+
+    def test_compare_and_repr_without_loading(self):
+        chapters, _ = list_chapters_from_epub(self.path)
+        again, _ = list_chapters_from_epub(self.path)
+        self.assertEqual(chapters, again)
+        self.assertNotEqual(chapters[1], again[2])
+        self.assertIn("size=", repr(chapters[1]))
+        self.assertFalse(any(c.is_loaded for c in chapters + again))
+
+        load_chapters(chapters + again, processes=1)
+        self.assertEqual(chapters, again)
+        self.assertIn("content=", repr(chapters[1]))
+
+    def test_lazy_chapter_pickles(self):
+        chapters, _ = list_chapters_from_epub(self.path)
+        chapter = pickle.loads(pickle.dumps(chapters[1]))
+        self.assertFalse(chapter.is_loaded)
+        self.assertEqual(chapter.content, chapters[1].content)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from src.core import extraction_cache
+from src.core.extraction_cache import ExtractionCache
+from src.core.extractor import Chapter
+
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ExtractionCache(directory=os.path.join(self.tmpdir.name, "cache"))
+        self.book = os.path.join(self.tmpdir.name, "book.epub")
+        with open(self.book, "wb") as f:
+            f.write(b"book contents")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        chapters = [
+            Chapter(title="Contents", content="One. Two.", order=2, is_toc=True),
+            Chapter(title="Chapter 1", content="It rained — all night.", order=3),
+        ]
+        metadata = {"title": "Test Book", "author": "Jane Doe"}
+        key = ExtractionCache.key(self.book, "raw")
+        self.assertIsNone(self.cache.load(key))
+
+        self.cache.store(key, chapters, metadata)
+        self.assertEqual(self.cache.load(key), (chapters, metadata))
+
+    def test_key_depends_on_contents_version_and_variant(self):
+        key = ExtractionCache.key(self.book, "raw")
+        self.assertNotEqual(key, ExtractionCache.key(self.book, "cleaned"))
+        with patch.object(extraction_cache, "EXTRACTOR_VERSION", -1):
+            self.assertNotEqual(key, ExtractionCache.key(self.book, "raw"))
+
+        with open(self.book, "ab") as f:
+            f.write(b"!")
+        self.assertNotEqual(key, ExtractionCache.key(self.book, "raw"))
+
+    def test_corrupt_entry_is_a_miss(self):
+        key = ExtractionCache.key(self.book, "raw")
+        self.cache.store(key, [], {})
+        with open(self.cache.path_for(key), "r+b") as f:
+            f.seek(8)
+            f.write(b"garbage")
+        self.assertIsNone(self.cache.load(key))
+
+    def test_evicts_least_recently_used(self):
+        chapters = [Chapter(title="Chapter 1", content=os.urandom(2000).hex(), order=1)]
+        self.cache.store("a", chapters, {})
+        self.cache.store("b", chapters, {})
+        size = os.path.getsize(self.cache.path_for("a"))
+
+        # "a" is used after "b", so "b" goes first
+        past = time.time() - 60
+        os.utime(self.cache.path_for("a"), (past, past))
+        os.utime(self.cache.path_for("b"), (past - 10, past - 10))
+        self.assertIsNotNone(self.cache.load("a"))
+
+        self.cache.max_bytes = 2 * size
+        self.cache.store("c", chapters, {})
+        self.assertIsNone(self.cache.load("b"))
+        self.assertIsNotNone(self.cache.load("a"))
+        self.assertIsNotNone(self.cache.load("c"))
+
+
+if __name__ == "__main__":
+    unittest.main()
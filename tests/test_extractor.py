@@ -0,0 +1,123 @@
+import glob
+import os
+import random
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from ebooklib import epub
+
+from src.core import extractor
+from src.core.epub_reader import read_package
+from src.core.extractor import Chapter, chapter_size_label, extract_document_text, joined_text, pack_chapters
+from tests.extractor_reference import extract_document_text as reference_extract_document_text
+
+# Markup that exercises every drop rule and the title matching, including
+# the awkward cases (nested headings, emptied headings, drops inside headings)
+FRAGMENTS = [
+    "<h1>Title</h1>", "<h1></h1>", "<h1> </h1>", "<h1><img/></h1>", "<h1><!--c--></h1>",
+    "<h2>Sub <em>x</em></h2>", "<h2></h2>", "<h3>Three</h3>", "<h1>Outer<h2>Inner</h2></h1>",
+    "<h3><span class=\"image\">z</span>Three</h3>", "<figure><h1>in fig</h1></figure>",
+    "<p class=\"photo-credit\">cred</p>", "<p class=\"a PICTURE\">p</p>", "<p class=\"\">q</p>",
+    "<div id=\"fig1\">f</div>", "<div id=\"Figure-2\">f</div>", "<p id=\"\">e</p>",
+    "<script>x</script>", "<style>y</style>", "<caption>cap</caption>", "<figcaption>fc</figcaption>",
+    "<table><caption>c</caption><tr><td>cell</td></tr></table>",
+    "<!-- c -->", "<![CDATA[cd]]>", "<ruby>k<rt>r</rt></ruby>", "<template>t</template>",
+    "<p>text  with   spaces</p>", "<span>Title</span>", "loose text", "&amp; &nbsp;", "\n",
+]
+TOC_TITLES = [None, "", "Title", "title", "Sub x", "Three", "Inner", "nothing"]
+
+
+def random_documents(seed, count, length):
+    """(body, toc title, item name) for random documents built from FRAGMENTS."""
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        body = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, length)))
+        documents.append((f"<html><body>{body}</body></html>".encode(), rng.choice(TOC_TITLES), "item.xhtml"))
+    return documents
+
+
+def book_documents(epub_path):
+    """(body, toc title, item name) for each spine document of an EPUB."""
+    package = read_package(epub_path)
+    documents = []
+    with zipfile.ZipFile(epub_path) as archive:
+        for _, item_name, zip_name, _ in package.documents:
+            body = epub.EpubHtml(content=archive.read(zip_name)).get_body_content()
+            documents.append((body, package.toc_map.get(item_name), item_name))
+    return documents
+
+
+class TestDocumentTextMatchesReference(unittest.TestCase):
+    def assertSameOutput(self, documents):
+        for parser in {extractor.HTML_PARSER, "html.parser"}:
+            original = extractor.HTML_PARSER
+            extractor.HTML_PARSER = parser
+            try:
+                for body, toc_title, item_name in documents:
+                    self.assertEqual(
+                        extract_document_text(body, toc_title, item_name),
+                        reference_extract_document_text(body, toc_title, item_name, parser),
+                        msg=(parser, toc_title, body)
+                    )
+            finally:
+                extractor.HTML_PARSER = original
+
+    def test_random_documents(self):
+        self.assertSameOutput(random_documents(seed=1234, count=1500, length=8))
+
+    def test_sample_books(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        books = glob.glob(os.path.join(root, "samples", "*.epub"))
+        if not books:
+            self.skipTest("no sample EPUB in samples/")
+
+        for book in books:
+            documents = book_documents(book)
+            # Every heading and no heading at all, whatever the TOC says
+            self.assertSameOutput(
+                documents + [(body, title, name) for body, _, name in documents for title in (None, "")]
+            )
+
+
+class TestBookText(unittest.TestCase):
+    def make_chapters(self):
+        texts = ["It rained — all night.", "", "Café “noir” 😀", "Plain ASCII."]
+        return [Chapter(title=f"Part {i}", content=text, order=i + 1) for i, text in enumerate(texts)]
+
+    def test_packed_chapters_keep_their_text(self):
+        chapters = self.make_chapters()
+        expected = [(c.title, c.content) for c in chapters]
+        store = pack_chapters(chapters)
+
+        self.assertEqual([(c.title, c.content) for c in chapters], expected)
+        self.assertEqual(chapters, self.make_chapters())
+        self.assertEqual(joined_text(chapters), "\n\n".join(text for _, text in expected))
+        self.assertEqual(store.nbytes, len("\n\n".join(text for _, text in expected).encode("utf-8")))
+
+    def test_char_count_without_decoding(self):
+        chapters = self.make_chapters()
+        expected = [len(c.content) for c in chapters]
+        store = pack_chapters(chapters)
+        with patch.object(store, "text", side_effect=AssertionError("decoded")):
+            self.assertEqual([c.char_count for c in chapters], expected)
+            self.assertEqual(chapter_size_label(chapters[2]), f"{expected[2]} chars")
+
+    def test_edits_are_copy_on_write(self):
+        chapters = self.make_chapters()
+        pack_chapters(chapters)
+        key = chapters[2].source_key
+
+        chapters[2].content = "Edited."
+        self.assertEqual(chapters[2].content, "Edited.")
+        self.assertNotEqual(chapters[2].source_key, key)
+        self.assertEqual([c.content for c in chapters[:2] + chapters[3:]],
+                         [c.content for c in self.make_chapters()[:2] + self.make_chapters()[3:]])
+        # Runs either side of the edited chapter are still joined correctly
+        self.assertEqual(joined_text(chapters), "\n\n".join(c.content for c in chapters))
+        self.assertEqual(joined_text(chapters[::-1], " | "), " | ".join(c.content for c in chapters[::-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+import generate_corpus
+from generate_corpus import CorpusSpec, write_epub, write_pdf
+from src.core.epub_reader import list_chapters_from_epub
+from src.core.extractor import extract_chapters_from_epub, extract_chapters_from_pdf
+
+
+class TestGenerateCorpus(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.spec = CorpusSpec(seed=7, scale=0.05, chapters=4, image_size=32, footnote_rate=0.2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def write(self, writer, spec, name):
+        path = os.path.join(self.tmpdir.name, name)
+        writer(spec, path)
+        with open(path, 'rb') as f:
+            return path, f.read()
+
+    def test_same_seed_same_bytes(self):
+        for writer, extension in ((write_epub, "epub"), (write_pdf, "pdf")):
+            _, first = self.write(writer, self.spec, f"a.{extension}")
+            _, second = self.write(writer, self.spec, f"b.{extension}")
+            self.assertEqual(first, second)
+
+        other = CorpusSpec(seed=8, scale=0.05, chapters=4, image_size=32)
+        _, first = self.write(write_epub, self.spec, "a.epub")
+        _, second = self.write(write_epub, other, "c.epub")
+        self.assertNotEqual(first, second)
+
+    def test_epub_chapters(self):
+        path, _ = self.write(write_epub, self.spec, "book.epub")
+        chapters, metadata = extract_chapters_from_epub(path, processes=1)
+        titles = generate_corpus.chapter_titles(self.spec)
+
+        self.assertEqual(metadata["title"], "Synthetic Book 7 (0.05x)")
+        self.assertEqual([c.title for c in chapters if c.title.startswith("Chapter")], titles)
+        text = "\n".join(c.content for c in chapters)
+        for feature in ("“", "Notes"):
+            self.assertIn(feature, text)
+        # Image captions are dropped, running heads are boilerplate
+        self.assertNotIn("Figure 1.1", text)
+        self.assertTrue(all(c.removed_chars for c in chapters if c.title in titles))
+
+        lazy, _ = list_chapters_from_epub(path)
+        self.assertEqual([c.content for c in lazy], [c.content for c in chapters])
+
+    def test_pdf_chapters(self):
+        titles = generate_corpus.chapter_titles(self.spec)
+        for outline in (True, False):
+            spec = CorpusSpec(**{**self.spec.__dict__, "outline": outline})
+            path, _ = self.write(write_pdf, spec, "book.pdf")
+            chapters, _ = extract_chapters_from_pdf(path)
+            self.assertEqual([c.title for c in chapters if not c.is_toc], titles)
+            self.assertIn("[1]", chapters[-1].content)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import fitz
+
+from src.core import pdf_reader
+from src.core.extractor import extract_chapters_from_pdf
+from src.core.pdf_reader import extract_pdf_pages, list_chapters_from_pdf
+
+WORDS = "the river ran past old stone houses while rain fell softly on quiet streets".split()
+
+
+def paragraph(seed, count=50):
+    words = [WORDS[(seed * 7 + i * 3) % len(WORDS)] for i in range(count)]
+    return " ".join(words).capitalize() + "."
+
+
+def write_book(path, outline):
+    """A title page, then four chapters; chapter 3 starts mid-page."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 200), "A Test Book", fontsize=36)
+    page.insert_text((72, 260), "by Jane Doe", fontsize=12)
+
+    toc = []
+    y = None
+    for number in range(1, 5):
+        if y is None or y > 500:
+            page = doc.new_page()
+            y = 72
+        title = f"Chapter {number}"
+        page.insert_text((72, y + 24), title, fontsize=24)
+        toc.append([1, title, doc.page_count])
+        y += 50
+        for seed in range(2 if number == 2 else 4):
+            if y > 650:
+                page = doc.new_page()
+                y = 72
+            page.insert_textbox(fitz.Rect(72, y, 520, y + 110), paragraph(number * 10 + seed), fontsize=11)
+            y += 120
+        if number != 2:
+            y = None
+
+    if outline:
+        doc.set_toc(toc)
+    # Running header and page number on every page but the title page
+    for page in list(doc)[1:]:
+        page.insert_text((250, 40), "A TEST BOOK", fontsize=9)
+        page.insert_text((300, 810), str(page.number + 1), fontsize=9)
+
+    doc.set_metadata({"title": "A Test Book", "author": "Jane Doe"})
+    doc.save(path)
+    doc.close()
+
+
+class TestPdfReader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.paths = {}
+        for outline in (True, False):
+            cls.paths[outline] = os.path.join(cls.tmpdir.name, f"book_{outline}.pdf")
+            write_book(cls.paths[outline], outline)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def check_chapters(self, chapters):
+        self.assertEqual([c.title for c in chapters],
+                         ["Front Matter", "Chapter 1", "Chapter 2", "Chapter 3", "Chapter 4"])
+        self.assertTrue(chapters[0].is_toc)
+        self.assertFalse(any(c.is_loaded for c in chapters))
+
+        self.assertIn("A Test Book", chapters[0].content)
+        for number, chapter in enumerate(chapters[1:], start=1):
+            self.assertTrue(chapter.content.startswith(f"Chapter {number}\n"), chapter.content[:40])
+            self.assertIn(paragraph(number * 10 + 1)[:40], chapter.content.replace("\n", " "))
+            self.assertNotIn(f"Chapter {number + 1}", chapter.content)
+            self.assertNotIn("A TEST BOOK", chapter.content)
+            self.assertFalse(any(line.strip().isdigit() for line in chapter.content.splitlines()))
+
+    def test_outline(self):
+        chapters, metadata = list_chapters_from_pdf(self.paths[True])
+        self.assertEqual(metadata, {"title": "A Test Book", "author": "Jane Doe"})
+        self.check_chapters(chapters)
+
+    def test_font_size_headings(self):
+        chapters, _ = list_chapters_from_pdf(self.paths[False])
+        self.check_chapters(chapters)
+
+    def test_extract_chapters_from_pdf(self):
+        chapters, _ = extract_chapters_from_pdf(self.paths[False])
+        self.assertEqual(len(chapters), 5)
+        self.assertTrue(all(isinstance(c.content, str) and c.content for c in chapters))
+
+    def test_parallel_page_ranges(self):
+        path = self.paths[True]
+        serial = list(extract_pdf_pages(path, processes=1))
+        with fitz.open(path) as doc:
+            self.assertEqual(len(serial), doc.page_count)
+        self.assertIn("A Test Book", serial[0])
+        self.assertFalse(any("A TEST BOOK" in page for page in serial))
+
+        # Force the pool and several ranges even for this small document
+        with patch.object(pdf_reader, "PARALLEL_MIN_PAGES", 0), patch.object(pdf_reader, "PAGES_PER_TASK", 2):
+            self.assertEqual(list(extract_pdf_pages(path, processes=2)), serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
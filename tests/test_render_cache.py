@@ -0,0 +1,82 @@
+import os
+import unittest
+
+from src.core.render_cache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = RenderCache()
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_key_depends_on_render_settings(self):
+        key = RenderCache.key("Hello there.", "af_sarah", 1.0, 0.4, None)
+        self.assertEqual(key, RenderCache.key("Hello there.", "af_sarah", 1, 0.4, None))
+        self.assertNotEqual(key, RenderCache.key("Hello there!", "af_sarah", 1.0, 0.4, None))
+        self.assertNotEqual(key, RenderCache.key("Hello there.", "af_sky", 1.0, 0.4, None))
+        self.assertNotEqual(key, RenderCache.key("Hello there.", "af_sarah", 1.1, 0.4, None))
+        self.assertNotEqual(key, RenderCache.key("Hello there.", "af_sarah", 1.0, 0.5, None))
+        self.assertNotEqual(key, RenderCache.key("Hello there.", "af_sarah", 1.0, 0.4, 0.1))
+        self.assertNotEqual(key, RenderCache.key("Hello there.", "af_sarah", 1.0, 0.4, None, kind="title"))
+
+    def test_hits_and_misses(self):
+        key = RenderCache.key("Hello there.", "af_sarah", 1.0)
+        self.assertIsNone(self.cache.get(key))
+
+        path = self.cache.path_for(key)
+        with open(path, "wb") as f:
+            f.write(b"RIFF")
+        self.cache.add(key, path, 1.5)
+        self.assertEqual(self.cache.get(key), (path, 1.5))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        # Entries whose file disappeared are misses
+        os.remove(path)
+        self.assertIsNone(self.cache.get(key))
+
+    def test_evicts_least_recently_used(self):
+        cache = RenderCache(max_bytes=250)
+        try:
+            keys = [RenderCache.key(f"Sentence {n}.", "af_sarah", 1.0) for n in range(3)]
+            for key in keys[:2]:
+                with open(cache.path_for(key), "wb") as f:
+                    f.write(b"x" * 100)
+                cache.add(key, cache.path_for(key), 1.0)
+
+            # A new render: the first sentence is reused, the second is not
+            cache.reset_stats()
+            cache.get(keys[0])
+            with open(cache.path_for(keys[2]), "wb") as f:
+                f.write(b"x" * 100)
+            cache.add(keys[2], cache.path_for(keys[2]), 1.0)
+
+            self.assertIsNotNone(cache.get(keys[0]))
+            self.assertIsNone(cache.get(keys[1]))
+            self.assertFalse(os.path.exists(cache.path_for(keys[1])))
+            self.assertEqual(cache.size, 200)
+
+            # Audio of the render in progress is kept even past max_bytes
+            key = RenderCache.key("Sentence 3.", "af_sarah", 1.0)
+            with open(cache.path_for(key), "wb") as f:
+                f.write(b"x" * 100)
+            cache.add(key, cache.path_for(key), 1.0)
+            self.assertEqual(len(cache), 3)
+        finally:
+            cache.close()
+
+    def test_clear(self):
+        key = RenderCache.key("Hello there.", "af_sarah", 1.0)
+        path = self.cache.path_for(key)
+        with open(path, "wb") as f:
+            f.write(b"RIFF")
+        self.cache.add(key, path, 1.5)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.isdir(self.cache.directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import threading
+import unittest
+
+from src.core.segmenter import segment_sentences, get_pysbd_segmenter
+
+SAMPLES = [
+    "",
+    "   ",
+    "No terminator at all",
+    "He left. Then she came. It rained all night.",
+    "He left. then she came.",
+    "Stop! he said. Why? Nobody knew.",
+    'She said "Stop." Then she left.',
+    "It is 5 p.m. now. The U.S. Army came. Mr. Smith waved.",
+    "J. K. Rowling wrote it. 1. First item. 2. Second item.",
+    "See e.g. the appendix. (It helps.) Then read on.",
+    "Wait... what? Fine.",
+    "First paragraph ends here.\n\nSecond paragraph starts here. And ends.",
+]
+
+
+class TestSegmentSentences(unittest.TestCase):
+    def test_matches_pysbd(self):
+        pysbd_segmenter = get_pysbd_segmenter('en')
+        for text in SAMPLES:
+            self.assertEqual(segment_sentences(text), pysbd_segmenter.segment(text), msg=repr(text))
+
+    def test_preserves_text(self):
+        text = " ".join(SAMPLES[3:] * 20)
+        self.assertEqual("".join(segment_sentences(text)), text)
+
+    def test_segmenter_is_cached(self):
+        self.assertIs(get_pysbd_segmenter('en'), get_pysbd_segmenter('en'))
+
+    def test_segmenter_per_thread(self):
+        other = []
+        thread = threading.Thread(target=lambda: other.append(get_pysbd_segmenter('en')))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], get_pysbd_segmenter('en'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from src.core.extractor import Chapter
+from src.core import text_prep
+from src.core.text_prep import clean_chapters, prepare_chapters, strip_chapter_heading
+from src.utils.parallel import map_processes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules a text-preparation worker should never need
+HEAVY_MODULES = ("torch", "kokoro", "PySide6")
+
+
+def make_chapters(count):
+    chapters = []
+    for i in range(count):
+        body = " ".join(f"Sentence {j} of part {i}, said Dr. Smith on June {j % 28 + 1}, 2015." for j in range(40))
+        chapters.append(Chapter(title=f"Part {i}", content=f"Chapter {i + 1}: Part {i}. {body}", order=i + 1))
+    return chapters
+
+
+def heavy_modules(_):
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+class TestTextPrep(unittest.TestCase):
+    def test_pool_matches_serial(self):
+        chapters = make_chapters(6)
+        serial_clean = clean_chapters(chapters, processes=1)
+        serial_prepared = prepare_chapters(make_chapters(6), max_chars=120, processes=1)
+
+        # Force the pool even for this small book
+        with patch.object(text_prep, "PARALLEL_MIN_CHARS", 0):
+            self.assertEqual(clean_chapters(chapters, processes=3), serial_clean)
+            self.assertEqual(prepare_chapters(chapters, max_chars=120, processes=3), serial_prepared)
+
+        self.assertEqual(len(serial_prepared), len(chapters))
+        for prepared in serial_prepared:
+            self.assertTrue(all(len(segment) <= 120 for segment in prepared.segments))
+            self.assertEqual(prepared.char_counts, [len(segment) for segment in prepared.segments])
+
+    def test_strip_chapter_heading(self):
+        self.assertEqual(strip_chapter_heading("Chapter 3: The Storm. It rained.", "The Storm"), "It rained.")
+        self.assertEqual(strip_chapter_heading("It rained.", "The Storm"), "It rained.")
+
+    def test_prepare_strips_title(self):
+        chapter = Chapter(title="The Storm", content="The Storm. It rained all night.", order=1)
+        self.assertEqual(prepare_chapters([chapter], processes=1)[0].segments, ["It rained all night."])
+        self.assertEqual(prepare_chapters([chapter], strip_titles=False, processes=1)[0].segments,
+                         ["The Storm. ", "It rained all night."])
+
+    def test_prepared_text_is_cached_until_content_changes(self):
+        chapter = make_chapters(1)[0]
+        first = prepare_chapters([chapter], processes=1)[0]
+        self.assertIs(prepare_chapters([chapter], processes=1)[0], first)
+
+        # Different settings or edited content prepare it again
+        self.assertIsNot(prepare_chapters([chapter], max_chars=100, processes=1)[0], first)
+        chapter.content = "Edited text. Two sentences."
+        self.assertEqual(prepare_chapters([chapter], max_chars=100, processes=1)[0].segments,
+                         ["Edited text. ", "Two sentences."])
+
+    def test_cancel_stops_between_chapters(self):
+        chapters = make_chapters(4)
+        # Cancelled once the second chapter is done
+        self.assertIsNone(prepare_chapters(
+            chapters, processes=1, is_cancelled=lambda: chapters[1].prepared is not None
+        ))
+        # Chapters prepared before the cancel keep their result
+        self.assertEqual([c.prepared is not None for c in chapters], [True, True, False, False])
+        self.assertEqual(len(prepare_chapters(chapters, processes=1)), 4)
+
+
+
+class TestWorkerImports(unittest.TestCase):
+    def test_spawned_worker_skips_torch(self):
+        self.assertEqual(map_processes(heavy_modules, [None, None], 1, 0, processes=2), [[], []])
+
+    def test_entry_points_import_lightly(self):
+        # A spawned worker runs the parent's main script as __mp_main__
+        code = (
+            "import runpy, sys; runpy.run_path(sys.argv[1], run_name='__mp_main__'); "
+            f"print('loaded:', *[name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+        )
+        for script in ("main.py", os.path.join("src", "cli.py")):
+            result = subprocess.run(
+                [sys.executable, "-c", code, os.path.join(ROOT, script)],
+                cwd=ROOT, capture_output=True, text=True, check=True
+            )
+            self.assertEqual(result.stdout.splitlines()[-1], "loaded:", msg=script)
+
+
+if __name__ == "__main__":
+    unittest.main()
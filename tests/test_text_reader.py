@@ -0,0 +1,168 @@
+import os
+import tempfile
+import types
+import unittest
+from unittest.mock import patch
+
+from src.core import text_reader
+from src.core.readers import list_chapters
+from src.core.text_reader import stream_chapters
+
+TEXT_BOOK = """The Long Voyage
+by Jane Doe
+
+Contents
+
+CHAPTER I
+The Harbour
+
+The ship left the harbour at dawn. The crew
+had been up all night.
+
+Nobody spoke of the storm.
+
+CHAPTER II
+
+Night fell over the sea.
+"""
+
+MARKDOWN_BOOK = """---
+title: "The Long Voyage"
+author: Jane Doe
+---
+
+# The Long Voyage
+
+A tale of the sea.
+
+## Chapter 1: The Harbour
+
+The ship left **the harbour** at [dawn](https://example.com).
+The crew had been _up all night_.
+
+![A ship](ship.png)
+
+### A Quiet Morning
+
+```
+* * *
+```
+
+Chapter 2: Night
+----------------
+
+Night fell over the sea &amp; the crew slept.
+"""
+
+HTML_BOOK = """<!DOCTYPE html>
+<html><head><title>The Long Voyage</title><meta name="author" content="Jane Doe">
+<style>p { color: red; }</style></head>
+<body>
+<p class="front">A tale of the sea.</p>
+<h2>Chapter 1: The Harbour</h2>
+<p>The ship left the harbour at dawn &amp; the crew had been up all night.</p>
+<figure><img src="ship.png"><figcaption>A ship</figcaption></figure>
+<!-- a comment -->
+<script>var x = "<h2>Not a heading</h2>";</script>
+<h2>Chapter 2: <em>Night</em></h2>
+<div class="illustration"><p>Map of the sea</p></div>
+<p>Night fell over the sea.</p><br><p>The crew slept.</p>
+</body></html>
+"""
+
+
+class TestTextReader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_plain_text(self):
+        path = self.write("voyage.txt", TEXT_BOOK)
+        metadata = {}
+        chapters = stream_chapters(path, metadata=metadata)
+        # Chapters are produced one at a time
+        self.assertIsInstance(chapters, types.GeneratorType)
+        chapters = list(chapters)
+
+        self.assertEqual([(c.title, c.order, c.is_toc) for c in chapters], [
+            ("Front Matter", 1, True),
+            ("CHAPTER I The Harbour", 2, False),
+            ("CHAPTER II", 3, False),
+        ])
+        self.assertEqual(chapters[1].content,
+                         "The ship left the harbour at dawn. The crew had been up all night.\n\nNobody spoke of the storm.")
+        self.assertEqual(metadata, {"title": "voyage"})
+
+        chapters, _ = list_chapters(path, skip_toc=True)
+        self.assertEqual([c.title for c in chapters], ["CHAPTER I The Harbour", "CHAPTER II"])
+
+    def test_no_headings(self):
+        path = self.write("notes.txt", "Just one\nparagraph.\n")
+        chapters = list(stream_chapters(path))
+        self.assertEqual([(c.title, c.content, c.is_toc) for c in chapters], [("Full Text", "Just one paragraph.", False)])
+
+    def test_prose_is_not_a_heading(self):
+        path = self.write("plan.txt", (
+            "Chapter 1: The Plan\n\n"
+            "Part two of the plan was simple, she thought.\n\n"
+            "Introduction over, the captain turned to the crew.\n\n"
+            "Chapter 2. Ashore\n\n"
+            "Book three\nwas on the table.\n\n"
+            "Part mild\n\n"
+            "Book mid-sentence, he stopped.\n\n"
+            "Epilogue\n\nThey went home.\n"
+        ))
+        chapters = list(stream_chapters(path))
+        self.assertEqual([c.title for c in chapters], ["Chapter 1: The Plan", "Chapter 2. Ashore", "Epilogue"])
+        self.assertEqual(chapters[0].content,
+                         "Part two of the plan was simple, she thought.\n\n"
+                         "Introduction over, the captain turned to the crew.")
+        self.assertTrue(chapters[1].content.endswith("Part mild\n\nBook mid-sentence, he stopped."))
+
+    def test_markdown(self):
+        path = self.write("voyage.md", MARKDOWN_BOOK)
+        chapters, metadata = list_chapters(path)
+
+        self.assertEqual(metadata, {"title": "The Long Voyage", "author": "Jane Doe"})
+        self.assertEqual([c.title for c in chapters], ["The Long Voyage", "Chapter 1: The Harbour", "Chapter 2: Night"])
+        self.assertEqual(chapters[1].content,
+                         "The ship left the harbour at dawn. The crew had been up all night.\n\nA Quiet Morning\n\n* * *")
+        self.assertEqual(chapters[2].content, "Night fell over the sea & the crew slept.")
+
+    def test_markdown_emphasis_needs_a_boundary(self):
+        path = self.write("sums.md", "# Sums\n\nWork out 2*3*4 and snake_case_name, then *stop*.\n")
+        chapters, _ = list_chapters(path)
+        self.assertEqual(chapters[0].content, "Work out 2*3*4 and snake_case_name, then stop.")
+
+    def test_html(self):
+        path = self.write("voyage.html", HTML_BOOK)
+        expected = [
+            ("Front Matter", "A tale of the sea."),
+            ("Chapter 1: The Harbour", "The ship left the harbour at dawn & the crew had been up all night."),
+            ("Chapter 2: Night", "Night fell over the sea. The crew slept."),
+        ]
+        chapters, metadata = list_chapters(path)
+        self.assertEqual(metadata, {"title": "The Long Voyage", "author": "Jane Doe"})
+        self.assertEqual([(c.title, c.content) for c in chapters], expected)
+
+        # Text split across read chunks comes out the same
+        with patch.object(text_reader, "READ_CHUNK_CHARS", 7):
+            chapters = list(stream_chapters(path))
+        self.assertEqual([(c.title, c.content) for c in chapters], expected)
+
+    def test_unsupported(self):
+        path = self.write("voyage.rtf", "{\\rtf1}")
+        with self.assertRaises(ValueError):
+            list_chapters(path)
+
+
+if __name__ == "__main__":
+    unittest.main()